@@ -0,0 +1,240 @@
+# admission.py
+import os
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+import metrics
+import scheduling
+
+logger = logging.getLogger(__name__)
+
+# Documents processed at the same time per process. OCR is CPU bound, so
+# running more at once than there are cores only makes every request slower.
+MAX_CONCURRENT_DOCUMENTS = int(os.environ.get('MAX_CONCURRENT_DOCUMENTS', os.cpu_count() or 1))
+
+# Documents of each priority class allowed to wait for a slot; further ones
+# of that class are rejected with 429
+MAX_QUEUED_DOCUMENTS = int(os.environ.get('MAX_QUEUED_DOCUMENTS', 2 * MAX_CONCURRENT_DOCUMENTS))
+
+# Slots bulk documents can never take, so interactive uploads don't queue
+# behind a night's re-verification (only when there is more than one slot)
+INTERACTIVE_RESERVED_SLOTS = int(os.environ.get('INTERACTIVE_RESERVED_SLOTS', 1))
+
+# Longest a document waits for a slot before it is rejected with 503
+ADMISSION_TIMEOUT = float(os.environ.get('ADMISSION_TIMEOUT', 10))
+
+# Time a request has from arrival to its result, waiting included (0 disables)
+REQUEST_DEADLINE_SECONDS = float(os.environ.get('REQUEST_DEADLINE_SECONDS', 60))
+
+# Seconds clients are told to wait before retrying a rejected request
+RETRY_AFTER_SECONDS = int(os.environ.get('RETRY_AFTER_SECONDS', 5))
+
+# Upfront limits, checked before any page is rendered
+MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 20 * 1024 * 1024))
+# Long enough for multi-page land deeds (typically up to 40 pages)
+MAX_PDF_PAGES = int(os.environ.get('MAX_PDF_PAGES', 60))
+# At the OCR render DPI; an A4 page at 200 DPI is about 3.9 million pixels
+MAX_PAGE_PIXELS = int(os.environ.get('MAX_PAGE_PIXELS', 25_000_000))
+# Uploaded images are downscaled before OCR, this only stops decompression bombs
+MAX_IMAGE_PIXELS = int(os.environ.get('MAX_IMAGE_PIXELS', 100_000_000))
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar('deadline', default=None)
+# Set for work that has already been accepted (jobs, batch files): it waits
+# for a slot for as long as its deadline allows instead of being turned away
+_queued: contextvars.ContextVar = contextvars.ContextVar('queued', default=False)
+
+class Rejected(Exception):
+    """A request the service turns away; carries the HTTP status to answer with"""
+    status_code = 503
+    reason = 'rejected'
+
+    def __init__(self, message: str, retry_after: Optional[int] = RETRY_AFTER_SECONDS):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def response(self) -> Dict[str, Any]:
+        return {
+            "error": str(self),
+            "isValid": False,
+            "confidence": 0,
+            "details": {"errors": [str(self)]}
+        }
+
+    def headers(self) -> Dict[str, str]:
+        return {'Retry-After': str(self.retry_after)} if self.retry_after is not None else {}
+
+class QueueFull(Rejected):
+    status_code = 429
+    reason = 'queue_full'
+
+class AdmissionTimeout(Rejected):
+    reason = 'admission_timeout'
+
+class DeadlineExceeded(Rejected):
+    reason = 'deadline'
+
+class LimitExceeded(Rejected):
+    """The document itself is too large; retrying won't help"""
+    status_code = 413
+    reason = 'limit'
+
+    def __init__(self, message: str):
+        super().__init__(message, retry_after=None)
+
+class Limiter:
+    """Counting semaphore with a bounded number of waiters.
+
+    Interactive documents are admitted ahead of waiting bulk ones, and bulk
+    documents leave reserved_slots free for interactive traffic. Every
+    priority class has its own max_waiting, so a bulk backlog can't fill
+    the queue and get interactive uploads rejected.
+    """
+
+    def __init__(self, max_active: int = MAX_CONCURRENT_DOCUMENTS,
+                 max_waiting: int = MAX_QUEUED_DOCUMENTS,
+                 reserved_slots: int = INTERACTIVE_RESERVED_SLOTS):
+        self.max_active = max(1, max_active)
+        self.max_waiting = max(0, max_waiting)
+        self.reserved_slots = min(max(0, reserved_slots), self.max_active - 1)
+        self.active = 0
+        self.waiting = {priority: 0 for priority in scheduling.PRIORITY_WEIGHTS}
+        # Waiters of queued work (see start_queued), which don't count against max_waiting
+        self.queued = {priority: 0 for priority in scheduling.PRIORITY_WEIGHTS}
+        self._changed = threading.Condition()
+
+    def _can_start(self, priority: str) -> bool:
+        if priority == 'bulk':
+            return (self.active < self.max_active - self.reserved_slots
+                    and not any(self.waiting[other] or self.queued[other]
+                                for other in self.waiting if other != 'bulk'))
+        return self.active < self.max_active
+
+    @contextmanager
+    def slot(self, timeout: float = ADMISSION_TIMEOUT) -> Iterator[None]:
+        """Hold one of the slots, waiting at most timeout (and the request's deadline) for it.
+
+        Queued work waits until its deadline (or indefinitely without one) and
+        is never rejected for a full queue.
+        """
+        priority = scheduling.current_priority()
+        queued = _queued.get()
+        remaining = time_left()
+        if queued:
+            timeout = remaining
+        elif remaining is not None:
+            timeout = min(timeout, remaining)
+        start = time.perf_counter()
+        with self._changed:
+            if not self._can_start(priority):
+                waiters = self.queued if queued else self.waiting
+                if not queued and self.waiting[priority] >= self.max_waiting:
+                    raise reject(QueueFull(
+                        f"Server busy: {self.waiting[priority]} {priority} documents already waiting"
+                    ))
+                waiters[priority] += 1
+                metrics.ADMISSION_QUEUED.labels(priority=priority).inc()
+                try:
+                    admitted = self._changed.wait_for(
+                        lambda: self._can_start(priority),
+                        timeout=max(timeout, 0) if timeout is not None else None
+                    )
+                finally:
+                    waiters[priority] -= 1
+                    metrics.ADMISSION_QUEUED.labels(priority=priority).dec()
+                    # Bulk waiters may have been holding back for this one
+                    self._changed.notify_all()
+                if not admitted:
+                    error = (DeadlineExceeded if queued or (remaining is not None and remaining <= timeout)
+                             else AdmissionTimeout)
+                    raise reject(error(f"Server busy: no capacity within {timeout:.1f} s"))
+            self.active += 1
+        metrics.ADMISSION_WAIT_SECONDS.labels(priority=priority).observe(time.perf_counter() - start)
+        metrics.ADMISSION_ACTIVE.inc()
+        try:
+            yield
+        finally:
+            metrics.ADMISSION_ACTIVE.dec()
+            with self._changed:
+                self.active -= 1
+                self._changed.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._changed:
+            return {
+                "active": self.active,
+                "waiting": dict(self.waiting),
+                "queued": dict(self.queued),
+                "maxActive": self.max_active,
+                "maxWaiting": self.max_waiting,
+                "reservedSlots": self.reserved_slots
+            }
+
+def reject(error: Rejected) -> Rejected:
+    """Count and log a rejection; returns the error for the caller to raise"""
+    metrics.REJECTIONS.labels(reason=error.reason).inc()
+    logger.warning(f"Rejected request: {str(error)}")
+    return error
+
+def start_deadline(seconds: float = REQUEST_DEADLINE_SECONDS) -> contextvars.Token:
+    """Give the current request (or job) seconds from now to finish"""
+    return _deadline.set(time.monotonic() + seconds if seconds > 0 else None)
+
+def end_deadline(token: contextvars.Token):
+    _deadline.reset(token)
+
+def start_queued() -> contextvars.Token:
+    """Mark the current job or batch file as accepted work that waits for a slot"""
+    return _queued.set(True)
+
+def end_queued(token: contextvars.Token):
+    _queued.reset(token)
+
+def time_left() -> Optional[float]:
+    """Seconds left before the current request's deadline, None without one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def check_deadline(stage: str):
+    """Raise DeadlineExceeded when the current request has run out of time"""
+    remaining = time_left()
+    if remaining is not None and remaining <= 0:
+        raise reject(DeadlineExceeded(f"Request deadline exceeded during {stage}"))
+
+def check_document(page_count: int, page_sizes: Iterable[Tuple[float, float]], dpi: int):
+    """Reject documents with too many pages, or pages too large to render, up front.
+
+    page_sizes are the pages' (width, height) in PDF points, only read once
+    the page count is known to be within the limit.
+    """
+    if page_count > MAX_PDF_PAGES:
+        raise reject(LimitExceeded(
+            f"Document has {page_count} pages, at most {MAX_PDF_PAGES} are allowed"
+        ))
+    scale = dpi / 72
+    for page_number, (width, height) in enumerate(page_sizes, start=1):
+        pixels = int(width * scale) * int(height * scale)
+        if pixels > MAX_PAGE_PIXELS:
+            raise reject(LimitExceeded(
+                f"Page {page_number} is too large ({pixels} pixels at {dpi} DPI, "
+                f"at most {MAX_PAGE_PIXELS} are allowed)"
+            ))
+
+def check_image(frame_count: int, frame_sizes: Iterable[Tuple[int, int]]):
+    """Reject images with too many frames (multi-page TIFFs) or too many pixels, up front"""
+    if frame_count > MAX_PDF_PAGES:
+        raise reject(LimitExceeded(
+            f"Image has {frame_count} pages, at most {MAX_PDF_PAGES} are allowed"
+        ))
+    for frame, (width, height) in enumerate(frame_sizes, start=1):
+        if width * height > MAX_IMAGE_PIXELS:
+            raise reject(LimitExceeded(
+                f"Image page {frame} is too large ({width * height} pixels, "
+                f"at most {MAX_IMAGE_PIXELS} are allowed)"
+            ))
+
+# Shared limiter in front of document processing
+limiter = Limiter()
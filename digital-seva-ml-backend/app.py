@@ -1,100 +1,610 @@
 # app.py
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, request, jsonify, g, url_for
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
 from flask_cors import CORS
+import io
 import os
+import time
 import logging
-from werkzeug.utils import secure_filename
-import pytesseract
-import pdf2image
+import pdfplumber
+import pypdfium2 as pdfium
 import tempfile
-from pathlib import Path
+import threading
+import warnings
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from document_validators import DOCUMENT_VALIDATORS
-import cv2
-import numpy as np
+from document_classifier import document_classifier, AUTO_DOCUMENT_TYPE
+from normalized_text import NormalizedText
+from ocr_engine import ocr_engine, preload as preload_ocr_modules, OCR_DPI
+from preprocessing import PREPROCESSING_PROFILES, profile_for, escalation_ladder
+from ocr_cache import ocr_cache, document_hash
+import metrics
+import tracing
+import admission
+import scheduling
+from jobs import job_queue, JobQueueFull, JOB_DEADLINE_SECONDS
+from responses import ResponseOptions, shape_result, json_provider, gzip_response
 import re
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
+# pdfminer (used by pdfplumber) logs every parsed token at DEBUG level
+logging.getLogger('pdfminer').setLevel(logging.WARNING)
+
+# Uploads are kept in memory and only spill to a temporary file above this size.
+# The spill directory defaults to tmpfs so large uploads still never hit disk.
+UPLOAD_SPOOL_MAX_BYTES = int(os.environ.get('UPLOAD_SPOOL_MAX_BYTES', 16 * 1024 * 1024))
+UPLOAD_SPOOL_DIR = os.environ.get(
+    'UPLOAD_SPOOL_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None
+)
+
+class SpooledRequest(Request):
+    """Request that buffers uploaded files in memory instead of on disk"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        return tempfile.SpooledTemporaryFile(
+            max_size=UPLOAD_SPOOL_MAX_BYTES, dir=UPLOAD_SPOOL_DIR, mode='rb+'
+        )
+
+    def _load_form_data(self):
+        # Parsing the multipart body is where the upload is received and buffered
+        with metrics.UPLOAD_SECONDS.time(), tracing.span('upload'):
+            super()._load_form_data()
 
 # Initialize Flask app
 app = Flask(__name__)
-CORS(app)
+app.request_class = SpooledRequest
+# Bounds every body, including chunked uploads that send no Content-Length
+app.config['MAX_CONTENT_LENGTH'] = admission.MAX_UPLOAD_BYTES
+# orjson when available, responses can carry tens of KB of OCR text
+app.json = json_provider(app)
+# Lets browser clients read the trace headers
+CORS(app, expose_headers=[tracing.REQUEST_ID_HEADER, "Server-Timing"])
+
+@app.before_request
+def start_trace():
+    g.request_id = tracing.new_request_id(request.headers.get(tracing.REQUEST_ID_HEADER))
+    g.trace_token = tracing.start_trace(g.request_id)
+    g.deadline_token = admission.start_deadline()
+
+@app.before_request
+def check_upload_size():
+    # Werkzeug enforces MAX_CONTENT_LENGTH while the body streams in; this only
+    # gives the rejection our JSON body, before the views' catch-all turns it into a 500
+    try:
+        if request.content_length is not None:
+            if request.content_length > admission.MAX_UPLOAD_BYTES:
+                raise RequestEntityTooLarge()
+        elif request.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            # Chunked uploads have no length up front, read the body here. A plain
+            # body cut off at the limit reads as complete, one more byte tells
+            request.get_data(parse_form_data=True)
+            request.stream.read(1)
+    except RequestEntityTooLarge:
+        error = admission.reject(admission.LimitExceeded(
+            f"Upload too large, at most {admission.MAX_UPLOAD_BYTES} bytes are allowed"
+        ))
+        return jsonify({"error": str(error)}), error.status_code
+
+@app.after_request
+def finish_trace(response):
+    trace = tracing.current_trace()
+    if trace is None:
+        return response
+    if g.get('trace_streamed'):
+        # The work happens while the body streams, which records the trace at its end
+        response.headers[tracing.REQUEST_ID_HEADER] = trace.request_id
+        return response
+    if request.endpoint != 'metrics_endpoint':
+        metrics.REQUEST_SECONDS.labels(
+            endpoint=request.endpoint or 'unknown', status=response.status_code
+        ).observe(trace.elapsed)
+    response.headers[tracing.REQUEST_ID_HEADER] = trace.request_id
+    response.headers['Server-Timing'] = trace.server_timing()
+    tracing.log_if_slow(
+        trace, method=request.method, path=request.path, status=response.status_code
+    )
+    return response
+
+@app.before_request
+def start_priority():
+    # Back-office callers send X-Priority: bulk; everything else is interactive
+    try:
+        g.priority_token = scheduling.start_priority(
+            request.headers.get(scheduling.PRIORITY_HEADER) or request.args.get('priority')
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.teardown_request
+def end_trace(exc):
+    if 'trace_token' in g:
+        tracing.end_trace(g.pop('trace_token'))
+    if 'deadline_token' in g:
+        admission.end_deadline(g.pop('deadline_token'))
+    if 'priority_token' in g:
+        scheduling.end_priority(g.pop('priority_token'))
 
-# Configure upload folder and allowed extensions
-UPLOAD_FOLDER = 'uploads'
-ALLOWED_EXTENSIONS = {'pdf'}
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+@app.after_request
+def compress_response(response):
+    # Registered after finish_trace so it runs first and is part of the total
+    return gzip_response(response, request.headers.get('Accept-Encoding', ''))
 
-# Create uploads folder if it doesn't exist
-Path(UPLOAD_FOLDER).mkdir(parents=True, exist_ok=True)
+# Warm-up of the OCR pool at startup:
+#   'background' imports the OCR libraries, starts the pool and primes every
+#                worker in a background thread when the app is loaded
+#   'preload'    only imports the OCR libraries at load time (for gunicorn
+#                --preload, so workers inherit them) and leaves the rest to
+#                start_warm_up(), to be called from gunicorn's post_fork hook
+#   'off'        everything is initialised by the first request that needs OCR
+WARM_UP = os.environ.get('WARM_UP', 'background')
 
-# Configure Tesseract path
-pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'  # Windows
+_warm_up_state: Dict[str, Any] = {"status": "idle"}
+_warm_up_lock = threading.Lock()
+
+# Configure allowed extensions
+ALLOWED_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png', 'webp', 'tif', 'tiff'}
+
+# Leading bytes of the image formats OCR'd directly, without a PDF render
+# (WebP is a RIFF container and is recognised separately)
+IMAGE_SIGNATURES = (b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'II*\x00', b'MM\x00*')
+
+# Minimum number of word characters a page's embedded text layer must carry
+# before it is trusted over OCR (scanned PDFs usually have none at all)
+TEXT_LAYER_MIN_CHARS = int(os.environ.get('TEXT_LAYER_MIN_CHARS', 40))
+# Maximum share of unmapped glyphs such as "(cid:123)" tolerated in a text layer
+TEXT_LAYER_MAX_CID_RATIO = float(os.environ.get('TEXT_LAYER_MAX_CID_RATIO', 0.1))
+
+# Scanned pages are fed to the validator as they are OCR'd and OCR stops once
+# the document validates with at least this confidence
+EARLY_EXIT_CONFIDENCE = float(os.environ.get('EARLY_EXIT_CONFIDENCE', 0.75))
+
+# Most pages that are OCR'd for single-page ID cards (the rest are usually
+# the back side or blank pages of the scan)
+OCR_PAGE_BUDGETS = {
+    'Aadhar Card': 2,
+    'PAN Card': 1,
+    'Voter ID': 2,
+}
+
+# Most files accepted by a single /verify/batch request
+BATCH_MAX_FILES = int(os.environ.get('BATCH_MAX_FILES', 10))
+
+# Time the files of a /verify/batch request have, counted from the request's start;
+# they are processed a few at a time, so it is longer than a single upload's (0 disables)
+BATCH_DEADLINE_SECONDS = float(os.environ.get('BATCH_DEADLINE_SECONDS', 600))
+
+# Called as processing advances, e.g. progress('page', page=3) (see jobs.Job.update)
+Progress = Callable[..., None]
+
+def _page_progress(progress: Optional[Progress]):
+    """on_page callback for ocr_engine.ocr_pages that reports to progress"""
+    if progress is None:
+        return None
+    return lambda page_number, result: progress('page', page=page_number)
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def process_pdf(file) -> str:
-    """Process PDF file and extract text"""
+def extract_text_layer(pdf_data: bytes) -> Optional[List[Dict[str, Any]]]:
+    """Return the embedded text and size of every page, or None if the PDF can't be parsed"""
+    try:
+        pages = []
+        with pdfplumber.open(io.BytesIO(pdf_data)) as pdf:
+            for page in pdf.pages:
+                pages.append({
+                    "text": page.extract_text() or "",
+                    "size": (float(page.width), float(page.height))
+                })
+                # Drop the parsed layout objects as soon as the page is read
+                page.close()
+        return pages
+    except Exception as e:
+        logger.warning(f"Could not read text layer, falling back to OCR: {str(e)}")
+        return None
+
+def has_usable_text_layer(text: str) -> bool:
+    """Decide whether a page's embedded text is good enough to skip OCR"""
+    cid_count = len(re.findall(r'\(cid:\d+\)', text))
+    text = re.sub(r'\(cid:\d+\)', '', text)
+    word_chars = len(re.findall(r'\w', text))
+    if word_chars < TEXT_LAYER_MIN_CHARS:
+        return False
+    return cid_count / (word_chars + cid_count) <= TEXT_LAYER_MAX_CID_RATIO
+
+def is_image(data: bytes) -> bool:
+    """Whether an upload is a JPEG, PNG, WebP or TIFF image rather than a PDF"""
+    return data.startswith(IMAGE_SIGNATURES) or (data[:4] == b'RIFF' and data[8:12] == b'WEBP')
+
+def read_image_pages(image_data: bytes) -> List[Dict[str, Any]]:
+    """One pending page per frame of an uploaded image, checked against the upfront limits"""
+    from PIL import Image
+    # PIL refuses to open images past twice its own limit, before the checks
+    # below could answer 413; align the limit with ours
+    Image.MAX_IMAGE_PIXELS = admission.MAX_IMAGE_PIXELS
+    sizes = []
     try:
-        # Save file temporarily
-        filename = secure_filename(file.filename)
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], f"temp_{filename}")
-        file.save(temp_path)
+        with warnings.catch_warnings():
+            # Between the limit and twice it PIL only warns, check_image rejects those
+            warnings.simplefilter('ignore', Image.DecompressionBombWarning)
+            img = Image.open(io.BytesIO(image_data))
+    except Image.DecompressionBombError as e:
+        raise admission.reject(admission.LimitExceeded(f"Image is too large: {str(e)}"))
+    with img:
+        # Multi-page TIFFs (e.g. from office scanners) have a frame per page
+        frame_count = getattr(img, 'n_frames', 1)
+        
+        def frame_sizes():
+            for frame in range(frame_count):
+                img.seek(frame)
+                sizes.append(img.size)
+                yield img.size
+        
+        admission.check_image(frame_count, frame_sizes())
+    return [{"text": "", "size": None, "imageSize": size, "source": "pending"} for size in sizes]
 
-        try:
-            # Convert PDF to images
-            images = pdf2image.convert_from_path(temp_path)
-            extracted_text = ""
-            
-            for img in images:
-                # Convert PIL Image to OpenCV format
-                opencv_img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-                
-                # Image preprocessing pipeline
-                # 1. Resize if too small
-                height, width = opencv_img.shape[:2]
-                if height < 1000:
-                    scale = 1000/height
-                    opencv_img = cv2.resize(opencv_img, None, fx=scale, fy=scale)
-                
-                # 2. Convert to grayscale
-                gray = cv2.cvtColor(opencv_img, cv2.COLOR_BGR2GRAY)
-                
-                # 3. Apply adaptive thresholding
-                binary = cv2.adaptiveThreshold(
-                    gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                    cv2.THRESH_BINARY, 11, 2
-                )
-                
-                # 4. Denoise
-                denoised = cv2.fastNlMeansDenoising(binary)
-                
-                # 5. Apply different preprocessing techniques and combine results
-                text1 = pytesseract.image_to_string(denoised, lang='eng+hin')
-                text2 = pytesseract.image_to_string(gray, lang='eng+hin')
-                
-                # Combine texts (this helps catch text that might be missed by one method)
-                extracted_text += text1 + "\n" + text2 + "\n"
+def count_pdf_pages(pdf_data: bytes) -> int:
+    """Count the pages of a PDF held in memory"""
+    pdf = pdfium.PdfDocument(pdf_data)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+def check_pdf_limits(pdf_data: bytes):
+    """Apply the page count and page size limits before any page is rendered"""
+    pdf = pdfium.PdfDocument(pdf_data)
+    try:
+        page_count = len(pdf)
+        admission.check_document(
+            page_count, (pdf.get_page_size(index) for index in range(page_count)), OCR_DPI
+        )
+    finally:
+        pdf.close()
+
+@dataclass
+class ExtractionResult:
+    """Text extracted from an uploaded document"""
+    text: str
+    document_hash: str
+    pages: List[Dict[str, Any]]
+    profile: str
+    from_cache: bool = False
+    validation: Optional[Dict[str, Any]] = None
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def processing_details(self) -> Dict[str, Any]:
+        """How each page was read, for measuring the accuracy/latency trade-off"""
+        return {
+            "profile": self.profile,
+            "fromCache": self.from_cache,
+            "pages": [
+                {
+                    "source": page["source"],
+                    "profiles": page.get("profiles", []),
+                    "confidence": page.get("confidence"),
+                    "backend": page.get("backend")
+                }
+                for page in self.pages
+            ]
+        }
+
+def join_page_texts(pages: List[Dict[str, Any]]) -> str:
+    """Combine per-page text into the single string the validators expect"""
+    extracted_text = "\n".join(page["text"] for page in pages)
+    
+    # Clean up extracted text
+    extracted_text = re.sub(r'\s+', ' ', extracted_text)  # Remove extra whitespace
+    return extracted_text.strip()
+
+def read_pages(pdf_data: bytes) -> List[Dict[str, Any]]:
+    """Read every page's text layer and mark the pages that still need OCR"""
+    with tracing.span('textLayer'):
+        pages = extract_text_layer(pdf_data)
+    
+    if pages is None:
+        # Unparseable text layer: render and OCR every page
+        pages = [{"text": "", "size": None} for _ in range(count_pdf_pages(pdf_data))]
+    
+    for page_number, page in enumerate(pages, start=1):
+        if has_usable_text_layer(page["text"]):
+            logger.debug(f"Page {page_number}: using embedded text layer")
+            page["source"] = "textLayer"
+        else:
+            logger.debug(f"Page {page_number}: no usable text layer, needs OCR")
+            page["text"] = ""
+            page["source"] = "pending"
+    return pages
+
+def validation_confidence(result: Dict[str, Any]) -> float:
+    """Confidence reported by a validator (validators use either key)"""
+    return result.get('confidenceScore', result.get('confidence', 0)) or 0
+
+def is_confidently_valid(result: Optional[Dict[str, Any]]) -> bool:
+    # Some validators answer errors (e.g. empty text) with isValid, never stop early on those
+    return (result is not None and result['isValid'] and 'error' not in result
+            and validation_confidence(result) >= EARLY_EXIT_CONFIDENCE)
+
+def ocr_pending_pages(pdf_data: bytes, pages: List[Dict[str, Any]], profile: str,
+                      validator=None, page_budget: int = None,
+                      progress: Optional[Progress] = None) -> Optional[Dict[str, Any]]:
+    """OCR pages that have no text yet and return the latest validation result.
+
+    Without a validator every pending page is OCR'd at once. With one, pages
+    are OCR'd in page order, one pool-sized window at a time, and OCR stops
+    as soon as the document validates confidently or the page budget is used.
+    """
+    pending = [
+        page_number for page_number, page in enumerate(pages, start=1)
+        if page["source"] == "pending" and (page_budget is None or page_number <= page_budget)
+    ]
+    # Until some page has text there is nothing to validate, and an empty
+    # document must not end OCR before it has started
+    has_text = any(page["text"].strip() for page in pages)
+    validation = (validator.validate_within_budget(join_page_texts(pages))
+                  if validator and (has_text or not pending) else None)
+    window_size = ocr_engine.max_workers if validator else len(pending)
+    
+    # Scanned pages are OCR'd in parallel on the shared worker pool,
+    # streamed a few at a time to stay within the memory budget
+    while pending and not is_confidently_valid(validation):
+        window, pending = pending[:window_size], pending[window_size:]
+        with tracing.span('ocr'):
+            ocr_results = ocr_document_pages(
+                pdf_data, window, pages, escalation_ladder(profile), progress
+            )
+        for page_number, ocr_result in ocr_results.items():
+            pages[page_number - 1].update(ocr_result, source="ocr")
+        if validator:
+            validation = validator.validate_within_budget(join_page_texts(pages))
+    
+    if pending:
+        logger.debug(f"Early exit: skipped OCR of pages {pending}")
+    return validation
+
+def escalate_pages(pdf_data: bytes, pages: List[Dict[str, Any]], profile: str,
+                   progress: Optional[Progress] = None) -> bool:
+    """Re-OCR pages with the next, costlier profile; returns False if none is left"""
+    by_profiles = {}
+    for page_number, page in enumerate(pages, start=1):
+        if page["source"] != "ocr":
+            continue
+        remaining = tuple(
+            p for p in escalation_ladder(profile) if p not in page.get("profiles", [])
+        )
+        if remaining:
+            by_profiles.setdefault(remaining, []).append(page_number)
+    if not by_profiles:
+        return False
+    
+    for profiles, page_numbers in by_profiles.items():
+        logger.debug(f"Escalating pages {page_numbers} to the {profiles[0]} profile")
+        if progress is not None:
+            progress('escalate', pages=page_numbers, profile=profiles[0])
+        with tracing.span('ocr', escalation=True):
+            ocr_results = ocr_document_pages(pdf_data, page_numbers, pages, list(profiles), progress)
+        for page_number, ocr_result in ocr_results.items():
+            page = pages[page_number - 1]
+            # Keep the earlier text too, one pass may catch what the other missed
+            page["text"] = page["text"] + "\n" + ocr_result["text"]
+            page["confidence"] = max(page.get("confidence", 0.0), ocr_result["confidence"])
+            page["profiles"] = page.get("profiles", []) + ocr_result["profiles"]
+    return True
+
+def ocr_document_pages(data: bytes, page_numbers: List[int], pages: List[Dict[str, Any]],
+                       profiles: List[str], progress: Optional[Progress] = None
+                       ) -> Dict[int, Dict[str, Any]]:
+    """OCR pages of an uploaded PDF, or frames of an uploaded image, on the worker pool"""
+    if pages[0].get("imageSize"):
+        return ocr_engine.ocr_image_pages(
+            data, page_numbers,
+            {page_number: tuple(pages[page_number - 1]["imageSize"]) for page_number in page_numbers},
+            profiles=profiles, on_page=_page_progress(progress)
+        )
+    return ocr_engine.ocr_pages(
+        data, page_numbers, _page_sizes(pages), profiles=profiles,
+        on_page=_page_progress(progress)
+    )
+
+def _count_ocr_pages(pages: List[Dict[str, Any]]) -> int:
+    return sum(1 for page in pages if page["source"] == "ocr")
+
+def _page_sizes(pages: List[Dict[str, Any]]) -> Dict[int, Any]:
+    return {
+        page_number: page["size"]
+        for page_number, page in enumerate(pages, start=1)
+        if page.get("size")
+    }
+
+def process_pdf(file, validator=None, profile: str = None,
+                page_budget: int = None, progress: Optional[Progress] = None) -> ExtractionResult:
+    """Process an uploaded PDF or image and extract text.
+
+    Images (JPEG, PNG, WebP, TIFF) have no text layer: every frame is
+    decoded and OCR'd directly, without rendering.
+
+    Scanned pages are OCR'd with the given preprocessing profile (or the
+    default one). When a validator is given, OCR stops early once the document
+    validates, and pages are only escalated to costlier profiles while it
+    fails validation. page_budget caps how many leading pages are OCR'd.
+    progress is told the page count and every page as it is OCR'd.
+    """
+    try:
+        # Read the upload straight from its in-memory buffer
+        pdf_data = file.read()
+        digest = document_hash(pdf_data)
+        profile = profile or profile_for()
+        
+        # Re-uploads of the same document reuse the text from the first run
+        pages = ocr_cache.get(digest)
+        from_cache = pages is not None
+        metrics.BYTES.inc(len(pdf_data))
+        metrics.CACHE_LOOKUPS.labels(result='hit' if from_cache else 'miss').inc()
+        image_pages = None
+        if not from_cache:
+            if is_image(pdf_data):
+                image_pages = read_image_pages(pdf_data)
+            else:
+                check_pdf_limits(pdf_data)
+        
+        # Only MAX_CONCURRENT_DOCUMENTS documents are read and OCR'd at once,
+        # the others wait for a slot or are turned away
+        with admission.limiter.slot():
+            if from_cache:
+                logger.debug(f"OCR cache hit for {digest}")
+                # Cached entries are shared between requests, escalation must not mutate them
+                pages = [dict(page) for page in pages]
+            elif image_pages is not None:
+                pages = image_pages
+            else:
+                pages = read_pages(pdf_data)
             
-            # Clean up extracted text
-            extracted_text = re.sub(r'\s+', ' ', extracted_text)  # Remove extra whitespace
-            extracted_text = extracted_text.strip()
+            if progress is not None:
+                progress('pages', total=len(pages), done=[
+                    page_number for page_number, page in enumerate(pages, start=1)
+                    if page["source"] != "pending"
+                ])
             
-            logger.debug(f"Extracted text: {extracted_text}")
-            return extracted_text
+            ocr_pages_before = _count_ocr_pages(pages)
+            validation = ocr_pending_pages(pdf_data, pages, profile, validator, page_budget, progress)
+            escalated = False
+            if validator is not None:
+                while not validation['isValid'] and escalate_pages(pdf_data, pages, profile, progress):
+                    escalated = True
+                    validation = validator.validate_within_budget(join_page_texts(pages))
+        extracted_text = join_page_texts(pages)
+        
+        if not from_cache or escalated or _count_ocr_pages(pages) > ocr_pages_before:
+            ocr_cache.put(digest, pages)
+        for page in pages:
+            metrics.PAGES.labels(source=page["source"]).inc()
         
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        tracing.annotate(
+            documentHash=digest,
+            bytes=len(pdf_data),
+            pages=len(pages),
+            ocrPages=_count_ocr_pages(pages),
+            profile=profile,
+            fromCache=from_cache,
+            textLength=len(extracted_text)
+        )
+        logger.debug(
+            f"Extracted {len(extracted_text)} characters from {len(pages)} pages "
+            f"({_count_ocr_pages(pages)} OCR'd)"
+        )
+        return ExtractionResult(
+            text=extracted_text,
+            document_hash=digest,
+            pages=pages,
+            profile=profile,
+            from_cache=from_cache,
+            validation=validation
+        )
     
+    except admission.Rejected:
+        raise
     except Exception as e:
         logger.error(f"Error processing PDF: {str(e)}", exc_info=True)
         raise
     
+def check_upload(file, doc_type: Optional[str], requested_profile: Optional[str]):
+    """Error response for an upload /verify, /jobs or /classify can't process, None if it's fine"""
+    logger.info(f"Processing document type: {doc_type}")
+    
+    if not doc_type:
+        logger.error("Document type not specified")
+        return jsonify({"error": "Document type not specified"}), 400
+    
+    if file.filename == '':
+        logger.error("No selected file")
+        return jsonify({"error": "No selected file"}), 400
+    
+    if not allowed_file(file.filename):
+        logger.error(f"Invalid file type: {file.filename}")
+        return jsonify({"error": "Only PDF and image (JPEG, PNG, WebP, TIFF) files are allowed"}), 400
+    
+    if doc_type != AUTO_DOCUMENT_TYPE and doc_type not in DOCUMENT_VALIDATORS:
+        logger.error(f"Unsupported document type: {doc_type}")
+        return jsonify({
+            "error": f"Unsupported document type: {doc_type}",
+            "isValid": False,
+            "confidence": 0,
+            "details": {"errors": ["Unsupported document type"]}
+        }), 400
+    
+    if requested_profile and requested_profile not in PREPROCESSING_PROFILES:
+        logger.error(f"Unknown preprocessing profile: {requested_profile}")
+        return jsonify({
+            "error": f"Unknown preprocessing profile: {requested_profile}",
+            "availableProfiles": list(PREPROCESSING_PROFILES)
+        }), 400
+    return None
+
+def verify_upload(file, doc_type: str, requested_profile: Optional[str], options: ResponseOptions,
+                  endpoint: str = 'verify', progress: Optional[Progress] = None
+                  ) -> Tuple[Dict[str, Any], int]:
+    """Extract, classify (for documentType=auto) and validate an upload.
+
+    Returns the response body and its status code.
+    """
+    # Process the PDF and extract text
+    logger.info(f"Extracting text from file: {file.filename}")
+    if doc_type == AUTO_DOCUMENT_TYPE:
+        # Type unknown: OCR the document once and validate it as the best ranked type
+        extraction = process_pdf(file, profile=profile_for(None, requested_profile), progress=progress)
+        # Normalised once, shared by the classifier and the chosen validator
+        text = NormalizedText(extraction.text)
+        if progress is not None:
+            progress('classify')
+        with tracing.span('classify'):
+            classification = document_classifier.classify(text)
+        if not classification:
+            logger.error("Could not determine document type")
+            return {
+                "error": "Could not determine document type",
+                "isValid": False,
+                "confidence": 0,
+                "details": {"errors": ["Unknown document type"]},
+                "classification": [],
+                "documentHash": extraction.document_hash
+            }, 422
+        doc_type = classification[0]['documentType']
+        logger.info(f"Classified document as {doc_type}")
+        result = DOCUMENT_VALIDATORS[doc_type].validate_within_budget(text)
+        result['classification'] = classification
+        logger.debug(f"Text normalisation timings: {text.timings}")
+    else:
+        # Validate using appropriate validator, which also decides whether
+        # scanned pages need a costlier OCR pass
+        validator = DOCUMENT_VALIDATORS[doc_type]
+        extraction = process_pdf(
+            file, validator, profile_for(doc_type, requested_profile),
+            page_budget=OCR_PAGE_BUDGETS.get(doc_type), progress=progress
+        )
+        result = extraction.validation
+    
+    tracing.annotate(documentType=doc_type, isValid=result['isValid'])
+    metrics.DOCUMENTS.labels(endpoint=endpoint, document_type=doc_type).inc()
+    metrics.VALIDATIONS.labels(
+        document_type=doc_type, outcome=metrics.validation_outcome(result)
+    ).inc()
+    
+    # Lets the client re-check the same upload against another type via /revalidate
+    result['documentHash'] = extraction.document_hash
+    result['processing'] = extraction.processing_details()
+    
+    logger.info(f"Validation result: {result['isValid']}")
+    return shape_result(result, options, extraction.text), 200
+
 @app.route('/verify', methods=['POST'])
 def verify_document():
     try:
@@ -104,21 +614,295 @@ def verify_document():
         
         file = request.files['file']
         doc_type = request.form.get('documentType')
+        requested_profile = request.form.get('profile')
+        try:
+            options = ResponseOptions.from_request(request.args, request.form)
+        except ValueError as e:
+            logger.error(f"Invalid response options: {str(e)}")
+            return jsonify({"error": str(e)}), 400
+        
+        error = check_upload(file, doc_type, requested_profile)
+        if error is not None:
+            return error
+        
+        result, status = verify_upload(file, doc_type, requested_profile, options)
+        return jsonify(result), status
+    
+    except admission.Rejected as e:
+        return jsonify(e.response()), e.status_code, e.headers()
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        return jsonify({
+            "error": str(e),
+            "isValid": False,
+            "confidence": 0,
+            "details": {"errors": [str(e)]}
+        }), 500
+
+def run_job(job_id: str, data: bytes, filename: str, doc_type: str,
+            requested_profile: Optional[str], options: ResponseOptions, priority: str,
+            progress: Progress) -> Tuple[Dict[str, Any], int]:
+    """Body of a /jobs job, traced like a request under the job's ID"""
+    token = tracing.start_trace(job_id)
+    # The deadline counts from when the job starts running, not from its submission
+    deadline_token = admission.start_deadline(JOB_DEADLINE_SECONDS)
+    priority_token = scheduling.start_priority(priority)
+    # An accepted job waits for a processing slot rather than failing when the server is busy
+    queued_token = admission.start_queued()
+    try:
+        file = FileStorage(io.BytesIO(data), filename=filename)
+        try:
+            result, status = verify_upload(
+                file, doc_type, requested_profile, options, endpoint='jobs', progress=progress
+            )
+        except admission.Rejected as e:
+            result, status = e.response(), e.status_code
+        tracing.log_if_slow(tracing.current_trace(), path='/jobs', status=status)
+        return result, status
+    finally:
+        admission.end_queued(queued_token)
+        scheduling.end_priority(priority_token)
+        admission.end_deadline(deadline_token)
+        tracing.end_trace(token)
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue an upload for verification and return its job ID straight away"""
+    try:
+        if 'file' not in request.files:
+            logger.error("No file provided in request")
+            return jsonify({"error": "No file provided"}), 400
+        
+        file = request.files['file']
+        doc_type = request.form.get('documentType')
+        requested_profile = request.form.get('profile')
+        try:
+            options = ResponseOptions.from_request(request.args, request.form)
+        except ValueError as e:
+            logger.error(f"Invalid response options: {str(e)}")
+            return jsonify({"error": str(e)}), 400
+        
+        error = check_upload(file, doc_type, requested_profile)
+        if error is not None:
+            return error
+        
+        # The request's upload stream is gone once this returns, the job keeps the bytes
+        data = file.read()
+        filename = file.filename
+        priority = scheduling.current_priority()
+        try:
+            job = job_queue.submit(
+                lambda job_id, progress: run_job(
+                    job_id, data, filename, doc_type, requested_profile, options, priority, progress
+                ),
+                document_type=doc_type, filename=filename
+            )
+        except JobQueueFull as e:
+            logger.warning(f"Rejecting job: {str(e)}")
+            return jsonify({"error": "Too many queued jobs, try again later"}), 503, {'Retry-After': '5'}
+        
+        logger.info(f"Queued job {job.id} for {filename}")
+        status_url = url_for('get_job', job_id=job.id)
+        return jsonify({
+            "jobId": job.id,
+            "status": job.status,
+            "statusUrl": status_url,
+            "eventsUrl": url_for('job_events', job_id=job.id)
+        }), 202, {'Location': status_url}
+    
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status of a job, with its /verify response once it has finished"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Server-sent events with the job's progress per page, ending with its result"""
+    last_event_id = request.headers.get('Last-Event-ID', '0')
+    events = job_queue.events(job_id, int(last_event_id) if last_event_id.isdigit() else 0)
+    if events is None:
+        return jsonify({"error": "Job not found"}), 404
+    return Response(events, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Keep reverse proxies (nginx) from buffering the stream
+        'X-Accel-Buffering': 'no'
+    })
+        
+def _verify_batch_file(index: int, data: bytes, filename: str, doc_type: str,
+                       requested_profile: Optional[str], options: ResponseOptions,
+                       deadline: float) -> Tuple[Dict[str, Any], int]:
+    # Runs in its own copy of the request's context: the batch's files queue
+    # for processing slots under the batch deadline instead of being rejected,
+    # and trace their attributes by index instead of overwriting each other's
+    admission.start_deadline(deadline)
+    admission.start_queued()
+    tracing.start_file(index)
+    tracing.annotate(filename=filename)
+    try:
+        file = FileStorage(io.BytesIO(data), filename=filename)
+        return verify_upload(file, doc_type, requested_profile, options, endpoint='verify_batch')
+    except admission.Rejected as e:
+        return e.response(), e.status_code
+    except Exception as e:
+        logger.error(f"Error processing {filename}: {str(e)}", exc_info=True)
+        return {
+            "error": str(e),
+            "isValid": False,
+            "confidence": 0,
+            "details": {"errors": [str(e)]}
+        }, 500
+
+@app.route('/verify/batch', methods=['POST'])
+def verify_batch():
+    """Verify several files in one request, streaming a JSON line per file as it finishes.
+
+    Files are sent as repeated 'files' fields with a matching 'documentTypes'
+    field each (or a single documentType for all of them). All files are
+    processed at once, so their pages share the OCR pool instead of waiting
+    for each other.
+    """
+    try:
+        files = request.files.getlist('files')
+        if not files:
+            logger.error("No files provided in request")
+            return jsonify({"error": "No files provided"}), 400
+        if len(files) > BATCH_MAX_FILES:
+            logger.error(f"Too many files in batch: {len(files)}")
+            return jsonify({"error": f"At most {BATCH_MAX_FILES} files per batch"}), 400
+        
+        doc_types = request.form.getlist('documentTypes')
+        if not doc_types and request.form.get('documentType'):
+            doc_types = [request.form.get('documentType')] * len(files)
+        if len(doc_types) != len(files):
+            logger.error(f"Got {len(doc_types)} document types for {len(files)} files")
+            return jsonify({"error": "Expected one document type per file"}), 400
+        requested_profile = request.form.get('profile')
+        try:
+            options = ResponseOptions.from_request(request.args, request.form)
+        except ValueError as e:
+            logger.error(f"Invalid response options: {str(e)}")
+            return jsonify({"error": str(e)}), 400
+        
+        for index, (file, doc_type) in enumerate(zip(files, doc_types)):
+            error = check_upload(file, doc_type, requested_profile)
+            if error is not None:
+                response, status = error
+                body = response.get_json()
+                body["index"] = index
+                return jsonify(body), status
+        
+        # The uploads are read now, the request is gone while the results stream
+        uploads = [(file.read(), file.filename, doc_type) for file, doc_type in zip(files, doc_types)]
+        tracing.annotate(batchFiles=len(uploads))
+        # What is left of the batch deadline when the files start
+        deadline = (max(BATCH_DEADLINE_SECONDS - tracing.current_trace().elapsed, 0.001)
+                    if BATCH_DEADLINE_SECONDS > 0 else 0)
+        executor = ThreadPoolExecutor(max_workers=len(uploads), thread_name_prefix='batch')
+        futures = {
+            # Each file runs in a copy of this context so its spans join the request's trace
+            executor.submit(
+                contextvars.copy_context().run, _verify_batch_file,
+                index, data, filename, doc_type, requested_profile, options, deadline
+            ): (index, filename)
+            for index, (data, filename, doc_type) in enumerate(uploads)
+        }
+        executor.shutdown(wait=False)
         
-        logger.info(f"Processing document type: {doc_type}")
+        trace = tracing.current_trace()
+        g.trace_streamed = True
+        
+        def results():
+            try:
+                for future in as_completed(futures):
+                    index, filename = futures[future]
+                    result, status = future.result()
+                    yield app.json.dumps({
+                        "index": index,
+                        "filename": filename,
+                        "status": status,
+                        "result": result
+                    }) + "\n"
+            finally:
+                # Only now is the batch done (or the client gone): record its real duration
+                metrics.REQUEST_SECONDS.labels(endpoint='verify_batch', status=200).observe(trace.elapsed)
+                tracing.log_if_slow(trace, method='POST', path='/verify/batch', status=200)
+        
+        return Response(results(), mimetype='application/x-ndjson')
+    
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/classify', methods=['POST'])
+def classify_document():
+    """Rank the likely document types of an upload without validating it"""
+    try:
+        if 'file' not in request.files:
+            logger.error("No file provided in request")
+            return jsonify({"error": "No file provided"}), 400
+        
+        file = request.files['file']
+        requested_profile = request.form.get('profile')
+        try:
+            options = ResponseOptions.from_request(request.args, request.form)
+        except ValueError as e:
+            logger.error(f"Invalid response options: {str(e)}")
+            return jsonify({"error": str(e)}), 400
+        
+        # Classifying is the first half of documentType=auto
+        error = check_upload(file, AUTO_DOCUMENT_TYPE, requested_profile)
+        if error:
+            return error
+        
+        extraction = process_pdf(file, profile=profile_for(None, requested_profile))
+        with tracing.span('classify'):
+            classification = document_classifier.classify(extraction.text)
+        metrics.DOCUMENTS.labels(
+            endpoint='classify',
+            document_type=classification[0]['documentType'] if classification else 'unknown'
+        ).inc()
+        
+        # The hash lets the client validate as the chosen type via /revalidate
+        return jsonify(shape_result({
+            "documentTypes": classification,
+            "documentHash": extraction.document_hash,
+            "processing": extraction.processing_details()
+        }, options))
+    
+    except admission.Rejected as e:
+        return jsonify(e.response()), e.status_code, e.headers()
+    except Exception as e:
+        logger.error(f"Error processing request: {str(e)}", exc_info=True)
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/revalidate', methods=['POST'])
+def revalidate_document():
+    """Validate a previously uploaded document again without re-uploading it"""
+    try:
+        payload = request.get_json(silent=True) or request.form
+        digest = payload.get('documentHash')
+        doc_type = payload.get('documentType')
+        try:
+            options = ResponseOptions.from_request(request.args, payload)
+        except ValueError as e:
+            logger.error(f"Invalid response options: {str(e)}")
+            return jsonify({"error": str(e)}), 400
+        
+        if not digest:
+            logger.error("Document hash not specified")
+            return jsonify({"error": "Document hash not specified"}), 400
         
         if not doc_type:
             logger.error("Document type not specified")
             return jsonify({"error": "Document type not specified"}), 400
         
-        if file.filename == '':
-            logger.error("No selected file")
-            return jsonify({"error": "No selected file"}), 400
-        
-        if not allowed_file(file.filename):
-            logger.error(f"Invalid file type: {file.filename}")
-            return jsonify({"error": "Only PDF files are allowed"}), 400
-        
         if doc_type not in DOCUMENT_VALIDATORS:
             logger.error(f"Unsupported document type: {doc_type}")
             return jsonify({
@@ -128,18 +912,39 @@ def verify_document():
                 "details": {"errors": ["Unsupported document type"]}
             }), 400
         
-        # Process the PDF and extract text
-        logger.info(f"Extracting text from file: {file.filename}")
-        extracted_text = process_pdf(file)
+        pages = ocr_cache.get(digest)
+        metrics.CACHE_LOOKUPS.labels(result='hit' if pages is not None else 'miss').inc()
+        if pages is None:
+            logger.error(f"Document not found in cache: {digest}")
+            return jsonify({
+                "error": "Document not found, please upload it again",
+                "isValid": False,
+                "confidence": 0,
+                "details": {"errors": ["Document not found"]}
+            }), 404
         
-        # Validate using appropriate validator
-        logger.info("Validating document...")
-        validator = DOCUMENT_VALIDATORS[doc_type]
-        result = validator.validate(extracted_text)
+        logger.info(f"Revalidating {digest} as {doc_type}")
+        text = join_page_texts(pages)
+        result = DOCUMENT_VALIDATORS[doc_type].validate_within_budget(text)
+        result['documentHash'] = digest
+        # Pages skipped by an early exit or a page budget were never OCR'd and the
+        # cache only keeps text, so the result covers part of the document only
+        pending_pages = [
+            page_number for page_number, page in enumerate(pages, start=1)
+            if page["source"] == "pending"
+        ]
+        if pending_pages:
+            result['incomplete'] = True
+            result['pendingPages'] = pending_pages
+        tracing.annotate(documentType=doc_type, isValid=result['isValid'])
+        metrics.DOCUMENTS.labels(endpoint='revalidate', document_type=doc_type).inc()
+        metrics.VALIDATIONS.labels(
+            document_type=doc_type, outcome=metrics.validation_outcome(result)
+        ).inc()
         
         logger.info(f"Validation result: {result['isValid']}")
-        return jsonify(result)
-                
+        return jsonify(shape_result(result, options, text))
+    
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}", exc_info=True)
         return jsonify({
@@ -148,6 +953,72 @@ def verify_document():
             "confidence": 0,
             "details": {"errors": [str(e)]}
         }), 500
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Expose OCR cache hit/miss counters"""
+    return jsonify(ocr_cache.stats())
         
+@app.route('/queue/stats', methods=['GET'])
+def queue_stats():
+    """Documents admitted and waiting, and page OCR tasks queued, per priority class"""
+    return jsonify({
+        "admission": admission.limiter.stats(),
+        "ocr": ocr_engine.scheduler.stats()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Prometheus metrics of this process (or of all workers in multiprocess mode)"""
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE_LATEST)
+
+def warm_up():
+    """Load the OCR libraries, start the OCR pool and prime every worker"""
+    start = time.perf_counter()
+    try:
+        preload_ocr_modules()
+        details = ocr_engine.warm_up()
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}")
+        _warm_up_state.update(status="failed", error=str(e))
+        return
+    seconds = round(time.perf_counter() - start, 3)
+    _warm_up_state.update(status="ready", seconds=seconds, **details)
+    logger.info(f"Warm-up done in {seconds} s: {details}")
+
+def start_warm_up():
+    """Run warm_up() in a background thread, once per process"""
+    with _warm_up_lock:
+        if _warm_up_state["status"] != "idle":
+            return
+        _warm_up_state["status"] = "warming"
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and its OCR pool can still be rebuilt when a worker dies"""
+    if not ocr_engine.healthy:
+        return jsonify({
+            "status": "failing",
+            "error": f"OCR worker pool broke {ocr_engine.pool_failures} times in a row"
+        }), 503
+    return jsonify({"status": "ok"})
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: the OCR engine is primed (or warm-up is disabled) and the pool is usable"""
+    state = dict(_warm_up_state)
+    ready = state["status"] == "ready" or (WARM_UP == 'off' and state["status"] == "idle")
+    if not ocr_engine.healthy:
+        ready = False
+        state["error"] = f"OCR worker pool broke {ocr_engine.pool_failures} times in a row"
+    state["ready"] = ready
+    return jsonify(state), 200 if ready else 503
+
+if WARM_UP == 'background':
+    start_warm_up()
+elif WARM_UP == 'preload':
+    preload_ocr_modules()
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,357 @@
+# benchmarks/benchmark.py
+"""Run the synthetic corpus through the pipeline and report latency and memory.
+
+    python benchmarks/corpus.py --out benchmarks/corpus
+    python benchmarks/benchmark.py --corpus benchmarks/corpus --json results.json
+    python benchmarks/benchmark.py --json after.json --baseline results.json
+
+Every document is measured twice: stage by stage in this process (text
+layer, render, preprocessing, OCR, validation), and end to end as a
+/verify request through the Flask test client and the OCR pool, whose
+Server-Timing spans are reported too. Results give p50/p95/p99 latency and
+peak RSS per stage, overall and per document type, plus end-to-end
+throughput. The OCR text cache is disabled unless --cache is given, so
+repeated runs measure the same work.
+"""
+import io
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STAGES = ('textLayer', 'render', 'preprocess', 'ocr', 'validate', 'endToEnd')
+
+def percentile(values: List[float], q: float) -> float:
+    """Linearly interpolated percentile (q in 0-100) of a non-empty list"""
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+def summarize(seconds: List[float], rss: List[int]) -> Dict[str, Any]:
+    if not seconds:
+        return {'count': 0}
+    ms = [s * 1000 for s in seconds]
+    return {
+        'count': len(ms),
+        'meanMs': round(sum(ms) / len(ms), 3),
+        'p50Ms': round(percentile(ms, 50), 3),
+        'p95Ms': round(percentile(ms, 95), 3),
+        'p99Ms': round(percentile(ms, 99), 3),
+        'maxMs': round(max(ms), 3),
+        'peakRssMb': round(max(rss) / (1024 * 1024), 1) if rss else None
+    }
+
+def _rss_bytes(pid: int) -> int:
+    with open(f'/proc/{pid}/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+class RSSSampler:
+    """Peak resident memory of this process and its OCR workers while a block runs.
+
+    Polls /proc in a background thread. Where /proc is unavailable the
+    process' lifetime peak (getrusage) is reported instead.
+    """
+
+    def __init__(self, interval: float = 0.002):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _pids() -> List[int]:
+        from ocr_engine import ocr_engine
+        pool = ocr_engine._pool
+        workers = list(getattr(pool, '_processes', None) or {}) if pool else []
+        return [os.getpid()] + workers
+
+    def _sample(self):
+        total = 0
+        for pid in self._pids():
+            try:
+                total += _rss_bytes(pid)
+            except (OSError, ValueError):
+                pass
+        self.peak = max(self.peak, total)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        if os.path.exists('/proc/self/statm'):
+            self._sample()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        else:
+            import resource
+            # ru_maxrss is in KiB on Linux and bytes on macOS
+            scale = 1 if sys.platform == 'darwin' else 1024
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        return False
+
+class Recorder:
+    """Latency and peak RSS samples per (stage, document type)"""
+
+    def __init__(self, rss_interval: float):
+        self.rss_interval = rss_interval
+        self.samples: Dict[str, Dict[str, Dict[str, list]]] = {}
+        self.errors: List[Dict[str, str]] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, doc_type: str, seconds: float, rss: Optional[int] = None):
+        with self._lock:
+            entry = self.samples.setdefault(stage, {}).setdefault(doc_type, {'seconds': [], 'rss': []})
+            entry['seconds'].append(seconds)
+            if rss:
+                entry['rss'].append(rss)
+
+    def measure(self, stage: str, doc_type: str, func, *args):
+        with RSSSampler(self.rss_interval) as sampler:
+            start = time.perf_counter()
+            result = func(*args)
+            elapsed = time.perf_counter() - start
+        self.add(stage, doc_type, elapsed, sampler.peak)
+        return result
+
+    def error(self, document: Dict[str, Any], stage: str, error: Exception):
+        with self._lock:
+            self.errors.append({'file': document['file'], 'stage': stage, 'error': repr(error)})
+
+    def report(self, stages=STAGES) -> Dict[str, Any]:
+        overall = {}
+        per_type: Dict[str, Dict[str, Any]] = {}
+        for stage in list(stages) + sorted(set(self.samples) - set(stages)):
+            by_type = self.samples.get(stage, {})
+            if not by_type:
+                continue
+            overall[stage] = summarize(
+                [s for e in by_type.values() for s in e['seconds']],
+                [r for e in by_type.values() for r in e['rss']]
+            )
+            for doc_type, entry in by_type.items():
+                per_type.setdefault(doc_type, {})[stage] = summarize(entry['seconds'], entry['rss'])
+        return {'stages': overall, 'types': per_type}
+
+def run_stages(document: Dict[str, Any], data: bytes, recorder: Recorder):
+    """Time each pipeline stage of a document in this process"""
+    import app
+    from ocr_engine import render_pdf_page, OCR_DPI
+    from ocr_backends import get_backend
+    from preprocessing import apply_profile, profile_for
+    import numpy as np
+
+    doc_type = document['documentType']
+    pages = recorder.measure('textLayer', doc_type, app.read_pages, data)
+    profile = profile_for(doc_type)
+    for page_number, page in enumerate(pages, start=1):
+        if page['source'] != 'pending':
+            continue
+        try:
+            img = recorder.measure('render', doc_type, render_pdf_page, data, page_number, OCR_DPI)
+            gray = np.array(img.convert('L'))
+            img.close()
+            image = recorder.measure('preprocess', doc_type, apply_profile, gray, profile)
+            text, _ = recorder.measure('ocr', doc_type, get_backend().recognize, image)
+            page['text'] = text
+        except Exception as e:
+            recorder.error(document, 'ocr', e)
+            return
+    validator = app.DOCUMENT_VALIDATORS[doc_type]
+    recorder.measure('validate', doc_type, validator.validate_within_budget, app.join_page_texts(pages))
+
+def _server_timing(header: str) -> Dict[str, float]:
+    """Seconds per span name of a Server-Timing header, page suffixes (.p3) merged"""
+    spans: Dict[str, float] = {}
+    for entry in filter(None, (part.strip() for part in header.split(','))):
+        name, _, params = entry.partition(';')
+        duration = dict(p.split('=', 1) for p in params.split(';') if '=' in p).get('dur')
+        if duration is None or name == 'total':
+            continue
+        name = name.split('.p')[0]
+        spans[name] = spans.get(name, 0.0) + float(duration) / 1000
+    return spans
+
+def run_end_to_end(client, document: Dict[str, Any], data: bytes, recorder: Recorder) -> Optional[bool]:
+    """POST the document to /verify and record its latency and spans"""
+    doc_type = document['documentType']
+    with RSSSampler(recorder.rss_interval) as sampler:
+        start = time.perf_counter()
+        response = client.post(
+            '/verify',
+            data={'documentType': doc_type, 'file': (io.BytesIO(data), document['file'])},
+            content_type='multipart/form-data'
+        )
+        elapsed = time.perf_counter() - start
+    if response.status_code != 200:
+        recorder.error(document, 'endToEnd', RuntimeError(
+            f"HTTP {response.status_code}: {response.get_json().get('error')}"
+        ))
+        return None
+    recorder.add('endToEnd', doc_type, elapsed, sampler.peak)
+    for name, seconds in _server_timing(response.headers.get('Server-Timing', '')).items():
+        recorder.add(f"span.{name}", doc_type, seconds)
+    return response.get_json()['isValid']
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).decode().strip()
+    except Exception:
+        return None
+
+def run(corpus: str, repeat: int = 1, concurrency: int = 1, doc_types=None, variants=None,
+        stages: bool = True, rss_interval: float = 0.002) -> Dict[str, Any]:
+    with open(os.path.join(corpus, 'manifest.json')) as f:
+        manifest = json.load(f)
+    documents = [
+        d for d in manifest['documents']
+        if (not doc_types or d['documentType'] in doc_types) and (not variants or d['variant'] in variants)
+    ]
+    payloads = {}
+    for document in documents:
+        with open(os.path.join(corpus, document['file']), 'rb') as f:
+            payloads[document['file']] = f.read()
+
+    import app
+    from ocr_engine import ocr_engine
+    recorder = Recorder(rss_interval)
+
+    if stages:
+        for _ in range(repeat):
+            for document in documents:
+                try:
+                    run_stages(document, payloads[document['file']], recorder)
+                except Exception as e:
+                    recorder.error(document, 'stages', e)
+
+    client = app.app.test_client()
+    outcomes: Dict[str, Dict[str, int]] = {}
+    jobs = [document for _ in range(repeat) for document in documents]
+
+    def verify(document):
+        try:
+            valid = run_end_to_end(client, document, payloads[document['file']], recorder)
+        except Exception as e:
+            recorder.error(document, 'endToEnd', e)
+            valid = None
+        with recorder._lock:
+            entry = outcomes.setdefault(document['documentType'], {'valid': 0, 'invalid': 0, 'failed': 0})
+            entry['failed' if valid is None else 'valid' if valid else 'invalid'] += 1
+
+    with RSSSampler(rss_interval) as sampler:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(verify, jobs))
+        wall = time.perf_counter() - start
+    ocr_engine.shutdown()
+
+    report = recorder.report()
+    pages = sum(d['pages'] for d in documents) * repeat
+    report['throughput'] = {
+        'documents': len(jobs),
+        'pages': pages,
+        'wallSeconds': round(wall, 3),
+        'documentsPerSecond': round(len(jobs) / wall, 3) if wall else None,
+        'pagesPerSecond': round(pages / wall, 3) if wall else None,
+        'concurrency': concurrency,
+        'peakRssMb': round(sampler.peak / (1024 * 1024), 1)
+    }
+    report['outcomes'] = outcomes
+    report['errors'] = recorder.errors
+    report['meta'] = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'corpus': os.path.abspath(corpus),
+        'corpusSeed': manifest.get('seed'),
+        'repeat': repeat,
+        'config': {
+            key: value for key, value in os.environ.items()
+            if key.startswith(('OCR_', 'REGEX_', 'VALIDATOR_', 'TEXT_LAYER_', 'EARLY_EXIT_'))
+        }
+    }
+    return report
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    t = report['throughput']
+    print(f"{t['documents']} documents, {t['pages']} pages in {t['wallSeconds']} s: "
+          f"{t['documentsPerSecond']} docs/s, {t['pagesPerSecond']} pages/s "
+          f"(concurrency {t['concurrency']}, peak RSS {t['peakRssMb']} MB)")
+    print(f"\n{'stage':<18}{'count':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'RSS MB':>9}")
+    for stage, s in report['stages'].items():
+        line = (f"{stage:<18}{s['count']:>7}{s['p50Ms']:>11.2f}{s['p95Ms']:>11.2f}"
+                f"{s['p99Ms']:>11.2f}{s['peakRssMb'] if s['peakRssMb'] is not None else '-':>9}")
+        before = (baseline or {}).get('stages', {}).get(stage)
+        if before and before.get('p50Ms'):
+            line += f"   p50 {100 * (s['p50Ms'] / before['p50Ms'] - 1):+.1f}%"
+            line += f" p95 {100 * (s['p95Ms'] / before['p95Ms'] - 1):+.1f}%" if before.get('p95Ms') else ""
+        print(line)
+    print(f"\n{'document type':<26}{'docs':>6}{'valid':>7}{'e2e p50 ms':>13}{'e2e p95 ms':>13}")
+    for doc_type, stages in sorted(report['types'].items()):
+        e2e = stages.get('endToEnd', {'count': 0})
+        outcome = report['outcomes'].get(doc_type, {})
+        print(f"{doc_type:<26}{e2e['count']:>6}{outcome.get('valid', 0):>7}"
+              f"{e2e.get('p50Ms', 0):>13.2f}{e2e.get('p95Ms', 0):>13.2f}")
+    if report['errors']:
+        print(f"\n{len(report['errors'])} errors, first: {report['errors'][0]}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus'))
+    parser.add_argument('--repeat', type=int, default=1, help="passes over the corpus")
+    parser.add_argument('--concurrency', type=int, default=1, help="parallel /verify requests")
+    parser.add_argument('--types', help="comma separated document types (default: all)")
+    parser.add_argument('--variants', help="comma separated variants (default: all)")
+    parser.add_argument('--no-stages', action='store_true', help="only measure end to end")
+    parser.add_argument('--cache', action='store_true', help="keep the OCR text cache enabled")
+    parser.add_argument('--rss-interval', type=float, default=0.002, help="seconds between RSS samples")
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    if not args.cache:
+        # Set before the app is imported, the cache reads its limits at import
+        os.environ['OCR_CACHE_MAX_ENTRIES'] = '0'
+        os.environ.pop('OCR_CACHE_DB', None)
+    logging.disable(logging.CRITICAL)
+
+    report = run(
+        args.corpus, args.repeat, args.concurrency,
+        args.types.split(',') if args.types else None,
+        args.variants.split(',') if args.variants else None,
+        not args.no_stages, args.rss_interval
+    )
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,429 @@
+# benchmarks/corpus.py
+"""Generate synthetic PDFs of every document type for the benchmark suite.
+
+    python benchmarks/corpus.py --out benchmarks/corpus --per-variant 2
+    python benchmarks/corpus.py --variants text,scanned --hindi-font /path/NotoSansDevanagari-Regular.ttf
+
+Each document type gets pages with a text layer, scanned-looking image-only
+pages (noise, blur, skew, JPEG artefacts), rotated scans and multi-page
+documents whose extra pages are scans. Hindi lines are added when a
+Devanagari TrueType font is found (or given). A manifest.json lists every
+file with its document type and variant. Needs reportlab (see
+benchmarks/requirements.txt).
+"""
+import io
+import os
+import sys
+import json
+import random
+import logging
+import argparse
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pypdfium2 as pdfium
+from PIL import Image, ImageFilter
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from document_validators import DOCUMENT_VALIDATORS
+
+logger = logging.getLogger(__name__)
+
+VARIANTS = ('text', 'scanned', 'rotated', 'multipage')
+
+# Resolution of the simulated scans
+SCAN_DPI = 150
+
+# Looked up in order when no --hindi-font is given
+HINDI_FONT_CANDIDATES = [
+    '/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf',
+    '/usr/share/fonts/noto/NotoSansDevanagari-Regular.ttf',
+    '/usr/share/fonts/google-noto/NotoSansDevanagari-Regular.ttf',
+    '/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf',
+    '/usr/share/fonts/lohit-devanagari/Lohit-Devanagari.ttf',
+    '/usr/share/fonts/truetype/fonts-deva-extra/gargi.ttf',
+    'C:\\Windows\\Fonts\\Nirmala.ttf',
+    'C:\\Windows\\Fonts\\mangal.ttf',
+]
+
+FIRST_NAMES = ['RAM', 'SITA', 'RAVI', 'PRIYA', 'AMIT', 'SUNITA', 'RAHUL', 'ANITA', 'VIJAY', 'KAVITA']
+LAST_NAMES = ['KUMAR', 'SHARMA', 'PATIL', 'SINGH', 'YADAV', 'DESAI', 'GUPTA', 'JOSHI', 'VERMA', 'REDDY']
+CITIES = [('PUNE', 'MH', 'MAHARASHTRA'), ('LUCKNOW', 'UP', 'UTTAR PRADESH'),
+          ('JAIPUR', 'RJ', 'RAJASTHAN'), ('BHOPAL', 'MP', 'MADHYA PRADESH'),
+          ('PATNA', 'BR', 'BIHAR')]
+BANKS = [('STATE BANK OF INDIA', 'SBIN'), ('PUNJAB NATIONAL BANK', 'PUNB'), ('BANK OF BARODA', 'BARB')]
+MONTHS = ['JANUARY', 'FEBRUARY', 'MARCH', 'APRIL', 'MAY', 'JUNE', 'JULY',
+          'AUGUST', 'SEPTEMBER', 'OCTOBER', 'NOVEMBER', 'DECEMBER']
+
+class Fields:
+    """Random but well-formed field values for one document"""
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.city, self.state_code, self.state = rng.choice(CITIES)
+        self.name = self.person()
+        self.father = f"{rng.choice(FIRST_NAMES)} {self.name.split()[1]}"
+
+    def person(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def digits(self, n: int) -> str:
+        return ''.join(self.rng.choice('0123456789') for _ in range(n))
+
+    def letters(self, n: int) -> str:
+        return ''.join(self.rng.choice('ABCDEFGHIJKLMNOPQRSTUVWXYZ') for _ in range(n))
+
+    def date(self, start_year: int = 1960, end_year: int = 2023) -> str:
+        day = date(start_year, 1, 1) + timedelta(days=self.rng.randrange((end_year - start_year) * 365))
+        return day.strftime('%d/%m/%Y')
+
+    def year(self, start: int = 1980, end: int = 2020) -> int:
+        return self.rng.randint(start, end)
+
+    def rupees(self, low: int, high: int) -> str:
+        """Amount in Indian digit grouping, e.g. 1,20,000"""
+        amount = str(self.rng.randrange(low, high, 1000))
+        head, tail = amount[:-3], amount[-3:]
+        groups = []
+        while len(head) > 2:
+            groups.insert(0, head[-2:])
+            head = head[:-2]
+        if head:
+            groups.insert(0, head)
+        return ','.join(groups + [tail]) if groups else tail
+
+    def address(self) -> str:
+        return f"{self.rng.randint(1, 200)} MG ROAD, {self.city}"
+
+# Lines of the first page of each document type, and Hindi lines drawn below them
+Template = Callable[[Fields], List[str]]
+
+TEMPLATES: Dict[str, Template] = {
+    'Aadhar Card': lambda f: [
+        "GOVERNMENT OF INDIA",
+        "Unique Identification Authority of India",
+        f.name.title(),
+        f"DOB: {f.date()}",
+        f.rng.choice(['MALE', 'FEMALE']),
+        f"{f.rng.randint(2, 9)}{f.digits(3)} {f.digits(4)} {f.digits(4)}",
+    ],
+    'PAN Card': lambda f: [
+        "INCOME TAX DEPARTMENT",
+        "GOVT OF INDIA",
+        "Permanent Account Number",
+        f"{f.letters(3)}P{f.name[0]}{f.digits(4)}{f.letters(1)}",
+        f"Name: {f.name}",
+        f"FATHER'S NAME: {f.father}",
+        f"DATE OF BIRTH {f.date()}",
+        "Signature",
+    ],
+    'Caste Certificate': lambda f: [
+        "CASTE CERTIFICATE",
+        f"This is to certify that {f.name} belongs to the {f.rng.choice(['OBC', 'SC', 'ST'])} category",
+        f"CERTIFICATE NO: {f.digits(3)}/{f.digits(2)}",
+        f"VALID UPTO {f.year(2025, 2035)}",
+        "TEHSILDAR",
+    ],
+    'Ration Card': lambda f: [
+        "RATION CARD",
+        "PUBLIC DISTRIBUTION SYSTEM",
+        f"CARD NO: {f.state_code}/{f.digits(6)}",
+        "BPL",
+        f"ADDRESS: {f.address()}",
+        f"DISTRICT: {f.city}",
+        f"UNITS ALLOTED: {f.rng.randint(1, 8)}",
+        f"INCOME OF FAMILY: RS {f.rng.randrange(20000, 90000, 1000)}",
+        f"DATE OF ISSUE: {f.date(2010)}",
+    ],
+    'Voter ID': lambda f: [
+        "ELECTION COMMISSION OF INDIA",
+        "ELECTOR PHOTO IDENTITY CARD",
+        f"EPIC NO: {f.letters(3)}{f.digits(7)}",
+        f"ELECTOR'S NAME: {f.name}",
+        f"FATHER'S NAME: {f.father}",
+        f"SEX: {f.rng.choice(['MALE', 'FEMALE'])}",
+        f"AGE: {f.rng.randint(18, 90)}",
+        f"ADDRESS: {f.address()}",
+    ],
+    'Driving License': lambda f: [
+        "UNION OF INDIA",
+        "DRIVING LICENCE",
+        f"{f.state_code}{f.rng.randint(1, 50):02d} {f.year(2000, 2022)}{f.digits(7)}",
+        f.city,
+        "SIGNATURE",
+        "THUMB IMPRESSION",
+        "TRANSPORT DEPT",
+        "valid THROUGHOUT INDIA",
+    ],
+    'Income Certificate': lambda f: [
+        "INCOME CERTIFICATE",
+        f"Annual income Rs. {f.rupees(30000, 500000)} per annum",
+        "TEHSILDAR",
+        f"CERTIFICATE NO: {f.digits(5)}",
+        f"DATE: {f.date(2018)}",
+        "DIGITALLY SIGNED",
+    ],
+    'Disability Certificate': lambda f: [
+        "DISABILITY CERTIFICATE",
+        "LOCOMOTOR DISABILITY",
+        "MEDICAL BOARD",
+        f"CERTIFICATE NO: {f.state_code}{f.digits(16)}",
+        f"{f.rng.randint(40, 90)}% PERMANENT DISABILITY",
+        f"EXAMINED SHRI {f.name}, SON OF {f.father}",
+        f"DATE: {f.date(2015)}",
+        f"RESIDENT OF {f.city} {f.state_code} WHOSE",
+    ],
+    'BPL Certificate': lambda f: [
+        "BELOW POVERTY LINE",
+        "BPL CERTIFICATE",
+        f"BPL NO: {f.digits(5)}",
+        "NAGAR NIGAM",
+        f"FAMILY SIZE: {f.rng.randint(2, 9)}",
+    ],
+    'Domicile Certificate': lambda f: [
+        "DOMICILE CERTIFICATE",
+        f"This is to certify that {f.name} is RESIDING SINCE {f.year(1970, 2005)}",
+        f"in the STATE OF {f.state}",
+        "TEHSILDAR",
+    ],
+    'Birth Certificate': lambda f: [
+        "BIRTH CERTIFICATE",
+        f"REGISTRATION NO: {f.year(2000, 2022)}-{f.digits(5)}",
+        f"NAME: {f.name}",
+        f"GENDER: {f.rng.choice(['MALE', 'FEMALE'])}",
+        f"DATE OF BIRTH: {f.date(2000)}",
+        f"PLACE OF BIRTH: {f.city} HOSPITAL",
+        f"FATHER'S NAME: {f.father}",
+        f"MOTHER'S NAME: {f.person()}",
+        "MUNICIPAL CORPORATION",
+    ],
+    'Marriage Certificate': lambda f: [
+        "MARRIAGE CERTIFICATE",
+        f"REGISTRATION NO: {f.digits(5)}",
+        f"DATE OF MARRIAGE: {f.date(2000)}",
+        f"HUSBAND'S NAME: {f.name} RESIDING AT {f.city}",
+        f"WIFE'S NAME: {f.person()} AGE {f.rng.randint(21, 40)}",
+        f"PLACE OF MARRIAGE: {f.city}",
+        f"DATE {f.date(2000)}",
+    ],
+    'Bank Passbook': lambda f: (lambda bank, code: [
+        bank,
+        f"A/C NO: {f.digits(11)}",
+        f"IFSC CODE: {code}0{f.digits(6)}",
+        f"NAME: {f.name}",
+        f"BRANCH: {f.city} MAIN",
+        f"ADDRESS: {f.address()}",
+        f"PIN: {f.rng.randint(1, 8)}{f.digits(5)}",
+        f"PHONE: {f.rng.randint(6, 9)}{f.digits(9)}",
+    ])(*f.rng.choice(BANKS)),
+    'Employment Certificate': lambda f: [
+        "CERTIFICATE OF EMPLOYMENT",
+        f"THIS IS TO CERTIFY THAT {f.name} HAS BEEN EMPLOYED AS "
+        f"{f.rng.choice(['SENIOR ENGINEER', 'ACCOUNTANT', 'CLERK', 'MANAGER'])}",
+        f"FROM {f.rng.choice(MONTHS)} {f.year(2000, 2020)}",
+    ],
+    'Educational Certificates': lambda f: [
+        "DEGREE CERTIFICATE",
+        f"{f.city} UNIVERSITY",
+        f"THIS IS TO CERTIFY THAT {f.name} HAS COMPLETED THE",
+        "BACHELOR OF ENGINEERING COURSE",
+        f"GRADE: {f.rng.choice('ABC')}",
+        f"CERTIFICATE NO: {f.letters(2)}-{f.digits(3)}",
+        f"DATE: {f.date(2005)}",
+        "DURATION: 4 YEARS",
+    ],
+    'Property Documents': lambda f: [
+        "SALE DEED",
+        f"SURVEY NO: {f.rng.randint(1, 999)}/{f.rng.randint(1, 9)}",
+        f"REGISTRATION NO: {f.digits(4)}",
+        f"LOCATED AT {f.city}",
+        f"AREA: {f.rng.randrange(400, 5000, 50)} SQ FT",
+        f"CONSIDERATION: RS {f.rng.randrange(500000, 9000000, 10000)}",
+        f"EXECUTION DATE: {f.date(2000)}",
+    ],
+}
+
+HINDI_LINES: Dict[str, List[str]] = {
+    'Aadhar Card': ["भारत सरकार", "मेरा आधार, मेरी पहचान"],
+    'PAN Card': ["आयकर विभाग", "भारत सरकार"],
+    'Caste Certificate': ["जाति प्रमाण पत्र"],
+    'Ration Card': ["राशन कार्ड", "सार्वजनिक वितरण प्रणाली"],
+    'Voter ID': ["भारत निर्वाचन आयोग", "मतदाता फोटो पहचान पत्र"],
+    'Driving License': ["भारत संघ", "चालन अनुज्ञप्ति"],
+    'Income Certificate': ["आय प्रमाण पत्र"],
+    'Disability Certificate': ["दिव्यांगता प्रमाण पत्र"],
+    'BPL Certificate': ["गरीबी रेखा से नीचे"],
+    'Domicile Certificate': ["मूल निवास प्रमाण पत्र"],
+    'Birth Certificate': ["जन्म प्रमाण पत्र"],
+    'Marriage Certificate': ["विवाह प्रमाण पत्र"],
+    'Bank Passbook': ["पासबुक"],
+    'Employment Certificate': ["रोजगार प्रमाण पत्र"],
+    'Educational Certificates': ["उपाधि प्रमाण पत्र"],
+    'Property Documents': ["विक्रय विलेख"],
+}
+
+# Back side / annexure pages of multi-page documents
+FILLER_LINES = [
+    "This is a computer generated document.",
+    "Verify the authenticity of this document at the office of issue.",
+    "Keep this document safe. Report loss to the issuing authority.",
+    "In case of any discrepancy please contact the helpdesk.",
+]
+
+def find_hindi_font(path: Optional[str] = None) -> Optional[str]:
+    for candidate in ([path] if path else []) + [os.environ.get('BENCHMARK_HINDI_FONT')] + HINDI_FONT_CANDIDATES:
+        if candidate and os.path.isfile(candidate):
+            return candidate
+    return None
+
+def _text_page(c: canvas.Canvas, lines: List[str], hindi: List[str], hindi_font: Optional[str]):
+    width, height = A4
+    y = height - 72
+    if hindi and hindi_font:
+        c.setFont('Hindi', 16)
+        for line in hindi:
+            c.drawString(72, y, line)
+            y -= 26
+    c.setFont('Helvetica', 12)
+    for line in lines:
+        c.drawString(72, y, line)
+        y -= 20
+
+def _text_pdf(lines: List[str], hindi: List[str], hindi_font: Optional[str]) -> bytes:
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    _text_page(c, lines, hindi, hindi_font)
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+def _scan(pdf_data: bytes, rng: random.Random, skew: float) -> bytes:
+    """Rasterise a one page PDF and degrade it like a phone or office scan (JPEG bytes)"""
+    pdf = pdfium.PdfDocument(pdf_data)
+    try:
+        img = pdf[0].render(scale=SCAN_DPI / 72, grayscale=True).to_pil().convert('L')
+    finally:
+        pdf.close()
+    img = img.rotate(skew, resample=Image.BICUBIC, expand=False, fillcolor=255)
+    img = img.filter(ImageFilter.GaussianBlur(rng.uniform(0.3, 0.9)))
+    pixels = np.asarray(img, dtype=np.float32)
+    # Uneven lighting plus sensor noise
+    gradient = np.linspace(0, rng.uniform(10, 40), pixels.shape[1], dtype=np.float32)
+    noise = np.random.default_rng(rng.randrange(2 ** 32)).normal(0, rng.uniform(4, 12), pixels.shape)
+    pixels = np.clip(pixels - gradient + noise, 0, 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, 'JPEG', quality=rng.randint(45, 80))
+    return buffer.getvalue()
+
+def _image_page(c: canvas.Canvas, jpeg: bytes, sideways: bool = False):
+    width, height = A4
+    if sideways:
+        # Scanned in landscape: the page is wider than high and the content turned
+        c.setPageSize((height, width))
+        img = Image.open(io.BytesIO(jpeg)).rotate(90, expand=True)
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=85)
+        jpeg = buffer.getvalue()
+        width, height = height, width
+    c.drawImage(ImageReader(io.BytesIO(jpeg)), 0, 0, width, height)
+
+def build_document(doc_type: str, variant: str, rng: random.Random,
+                   hindi_font: Optional[str] = None) -> Dict[str, Any]:
+    """PDF bytes and description of one synthetic document"""
+    lines = TEMPLATES[doc_type](Fields(rng))
+    hindi = HINDI_LINES.get(doc_type, []) if hindi_font else []
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    pages = 1
+    if variant == 'text':
+        _text_page(c, lines, hindi, hindi_font)
+    elif variant == 'scanned':
+        _image_page(c, _scan(_text_pdf(lines, hindi, hindi_font), rng, rng.uniform(-1.5, 1.5)))
+    elif variant == 'rotated':
+        sideways = rng.random() < 0.5
+        skew = 0.0 if sideways else rng.choice([-1, 1]) * rng.uniform(3, 8)
+        _image_page(c, _scan(_text_pdf(lines, hindi, hindi_font), rng, skew), sideways)
+    elif variant == 'multipage':
+        # Text layer front page followed by scanned annexures
+        _text_page(c, lines, hindi, hindi_font)
+        pages = rng.randint(3, 5)
+        for _ in range(pages - 1):
+            c.showPage()
+            filler = rng.sample(FILLER_LINES, k=len(FILLER_LINES))
+            _image_page(c, _scan(_text_pdf(filler, [], None), rng, rng.uniform(-1.5, 1.5)))
+    else:
+        raise ValueError(f"Unknown variant: {variant}")
+    c.showPage()
+    c.save()
+    return {
+        'data': buffer.getvalue(),
+        'documentType': doc_type,
+        'variant': variant,
+        'pages': pages,
+        'hindi': bool(hindi),
+        'text': lines
+    }
+
+def _slug(doc_type: str) -> str:
+    return doc_type.lower().replace(' ', '-')
+
+def generate(out: str, per_variant: int = 1, variants=VARIANTS, doc_types=None,
+             seed: int = 0, hindi_font: Optional[str] = None) -> Dict[str, Any]:
+    """Write the corpus to out and return its manifest"""
+    os.makedirs(out, exist_ok=True)
+    hindi_font = find_hindi_font(hindi_font)
+    if hindi_font:
+        pdfmetrics.registerFont(TTFont('Hindi', hindi_font))
+    else:
+        logger.warning("No Devanagari font found, documents will have no Hindi text")
+
+    documents = []
+    for doc_type in doc_types or DOCUMENT_VALIDATORS:
+        for variant in variants:
+            for index in range(per_variant):
+                # Seeded per file so a document doesn't change when others are added
+                rng = random.Random(f"{seed}:{doc_type}:{variant}:{index}")
+                document = build_document(doc_type, variant, rng, hindi_font)
+                filename = f"{_slug(doc_type)}-{variant}-{index:03d}.pdf"
+                with open(os.path.join(out, filename), 'wb') as f:
+                    f.write(document.pop('data'))
+                document.update(file=filename, bytes=os.path.getsize(os.path.join(out, filename)))
+                documents.append(document)
+
+    manifest = {
+        'seed': seed,
+        'hindiFont': hindi_font,
+        'variants': list(variants),
+        'documents': documents
+    }
+    with open(os.path.join(out, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus'))
+    parser.add_argument('--per-variant', type=int, default=1, help="documents per type and variant")
+    parser.add_argument('--variants', default=','.join(VARIANTS))
+    parser.add_argument('--types', help="comma separated document types (default: all)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--hindi-font', help="Devanagari TrueType font for the Hindi lines")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    manifest = generate(
+        args.out, args.per_variant, args.variants.split(','),
+        args.types.split(',') if args.types else None, args.seed, args.hindi_font
+    )
+    total_bytes = sum(d['bytes'] for d in manifest['documents'])
+    print(f"Wrote {len(manifest['documents'])} documents ({total_bytes / 1024:.0f} KiB) to {args.out}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+# benchmarks/regex_fuzz.py
+"""Feed adversarial and very long texts to every validator and report the
+worst-case time of each regex pattern.
+
+    python benchmarks/regex_fuzz.py --size 200000 --top 20
+    REGEX_ENGINE=re2 python benchmarks/regex_fuzz.py --json results.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from document_validators import DOCUMENT_VALIDATORS
+from pattern_matcher import PatternSet, record_timings
+
+def _keywords():
+    """Every literal keyword the validators' pattern sets pre-filter on"""
+    keywords = set()
+    for validator in DOCUMENT_VALIDATORS.values():
+        sets = list(getattr(validator, 'matchers', {}).values())
+        if isinstance(getattr(validator, 'required_patterns', None), PatternSet):
+            sets.append(validator.required_patterns)
+        for pattern_set in sets:
+            keywords.update(pattern_set._keyword_patterns)
+    return sorted(keywords)
+
+def adversarial_texts(size: int, seed: int = 0):
+    """Named texts of about size characters that tend to trigger backtracking"""
+    rng = random.Random(seed)
+    keywords = _keywords()
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+    def repeat(unit: str) -> str:
+        return (unit * (size // max(len(unit), 1) + 1))[:size]
+
+    def noise(alphabet: str) -> str:
+        return ''.join(rng.choice(alphabet) for _ in range(size))
+
+    texts = {
+        # Long runs that lazy [A-Z\s]+? captures scan without finding a terminator
+        'upper_run': 'NAME: ' + repeat('A '),
+        'upper_words': repeat('RAM KUMAR '),
+        # Openers repeated with their closing keyword missing
+        'income_no_amount': repeat('INCOME '),
+        'revenue_no_delhi': repeat('REVENUE DEPARTMENT '),
+        'address_run': repeat('ADDRESS: 12 MG ROAD, PUNE/ '),
+        'certify_run': repeat('THIS IS TO CERTIFY THAT '),
+        'percent_run': repeat('45% '),
+        'alnum_run': noise(letters + '0123456789'),
+        'ocr_noise': noise(letters + '0123456789 .,:/-\'|'),
+        'devanagari': repeat('भारत सरकार नाम पिता का नाम '),
+        'keyword_soup': ' '.join(rng.choice(keywords) for _ in range(size // 8))[:size],
+    }
+    return texts
+
+def run(size: int, seed: int = 0):
+    """Worst time per (validator, pattern) over all adversarial texts"""
+    logging.disable(logging.CRITICAL)
+    worst = {}
+    validators = {}
+    for text_name, text in adversarial_texts(size, seed).items():
+        for doc_type, validator in DOCUMENT_VALIDATORS.items():
+            with record_timings() as timings:
+                start = time.perf_counter()
+                validator.validate(text)
+                elapsed = time.perf_counter() - start
+            entry = validators.setdefault(doc_type, {'worst': 0.0, 'text': None})
+            if elapsed > entry['worst']:
+                entry.update(worst=elapsed, text=text_name)
+            for pattern, timing in timings.items():
+                key = (doc_type, pattern)
+                if key not in worst or timing['worst'] > worst[key]['worst']:
+                    worst[key] = {'worst': timing['worst'], 'text': text_name}
+    patterns = [
+        {'documentType': doc_type, 'pattern': pattern,
+         'worstMs': round(data['worst'] * 1000, 3), 'text': data['text']}
+        for (doc_type, pattern), data in worst.items()
+    ]
+    patterns.sort(key=lambda p: -p['worstMs'])
+    return {
+        'engine': os.environ.get('REGEX_ENGINE', 're'),
+        'size': size,
+        'validators': {
+            doc_type: {'worstMs': round(data['worst'] * 1000, 3), 'text': data['text']}
+            for doc_type, data in validators.items()
+        },
+        'patterns': patterns
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--size', type=int, default=100000, help="characters per text")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--top', type=int, default=25, help="patterns to print")
+    parser.add_argument('--json', help="write the full results to this file")
+    args = parser.parse_args()
+
+    results = run(args.size, args.seed)
+    print(f"engine={results['engine']} size={results['size']}")
+    print("\nWorst validate() time per validator")
+    for doc_type, data in sorted(results['validators'].items(), key=lambda i: -i[1]['worstMs']):
+        print(f"  {data['worstMs']:10.1f} ms  {doc_type:<26} ({data['text']})")
+    print(f"\nSlowest {args.top} patterns")
+    for entry in results['patterns'][:args.top]:
+        print(f"  {entry['worstMs']:10.1f} ms  {entry['documentType']:<26} {entry['text']:<18} {entry['pattern'].strip()[:70]}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# document_classifier.py
+import os
+import logging
+from typing import Dict, Any, List, Optional, Union
+from document_validators import BaseDocumentValidator, DOCUMENT_VALIDATORS
+from normalized_text import NormalizedText
+from pattern_matcher import PatternSet
+
+logger = logging.getLogger(__name__)
+
+# documentType value that asks /verify to detect the type itself
+AUTO_DOCUMENT_TYPE = 'auto'
+
+# Number of ranked types returned when the caller doesn't ask for a limit
+CLASSIFY_MAX_RESULTS = int(os.environ.get('CLASSIFY_MAX_RESULTS', 5))
+
+class DocumentClassifier:
+    """Ranks document types by the identifiers found in a text.
+
+    The document identifiers of every validator go into a single PatternSet,
+    so classifying a text is one keyword scan plus the few identifier
+    patterns whose keywords occur, instead of running every validator.
+    """
+
+    def __init__(self, validators: Dict[str, BaseDocumentValidator]):
+        self.document_types = list(validators)
+        patterns = []
+        self._owners: List[str] = []
+        for doc_type, validator in validators.items():
+            for pattern in validator.document_identifiers:
+                patterns.append(pattern)
+                self._owners.append(doc_type)
+        # Identifiers are written in upper case and matched against the upper-cased view
+        self._index = PatternSet(patterns)
+
+    @staticmethod
+    def confidence(identifiers_found: int) -> float:
+        """Each additional identifier halves the remaining doubt"""
+        return 1 - 0.5 ** identifiers_found
+
+    def classify(self, text: Union[str, NormalizedText], limit: Optional[int] = CLASSIFY_MAX_RESULTS) -> List[Dict[str, Any]]:
+        """Document types whose identifiers occur in the text, most likely first"""
+        found: Dict[str, List[Dict[str, Any]]] = {}
+        for hit in self._index.scan(NormalizedText.of(text).upper):
+            found.setdefault(self._owners[hit.index], []).append({
+                "text": hit.group(),
+                "start": hit.start,
+                "end": hit.end
+            })
+
+        ranking = [
+            {
+                "documentType": doc_type,
+                "confidence": self.confidence(len(matches)),
+                "matches": matches
+            }
+            for doc_type, matches in found.items()
+        ]
+        # Ties keep the order of DOCUMENT_VALIDATORS
+        ranking.sort(key=lambda r: (-r["confidence"], self.document_types.index(r["documentType"])))
+        logger.debug(f"Classification: {[(r['documentType'], r['confidence']) for r in ranking]}")
+        return ranking[:limit] if limit else ranking
+
+# Shared classifier used by the Flask app
+document_classifier = DocumentClassifier(DOCUMENT_VALIDATORS)
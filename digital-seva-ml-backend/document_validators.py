@@ -1,111 +1,162 @@
 # document_validators.py
 from abc import ABC, abstractmethod
 import re
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 import logging
-from datetime import datetime
-import pytesseract
-from PIL import Image
-import cv2
-import numpy as np
-import pdf2image
 import os
-from dataclasses import dataclass
-from pathlib import Path
+from pattern_matcher import PatternSet, search, finditer, match_at, match_budget
+from fuzzy_matcher import FuzzyMatcher
+from normalized_text import NormalizedText
+import metrics
+import tracing
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-class BaseDocumentValidator(ABC):
-    def __init__(self):
+# Pattern matching time allowed per validate() call (0 disables the budget)
+VALIDATOR_TIME_BUDGET_MS = int(os.environ.get('VALIDATOR_TIME_BUDGET_MS', 250))
+
+_DEVANAGARI = re.compile(r'[\u0900-\u097F]')
+
+class ValidationResult:
+    """Per-call validation state.
+
+    Validators are shared across threads, so everything a single validate()
+    call accumulates lives here instead of on the validator instance.
+    """
+    __slots__ = ('extracted_text', 'matches', 'validation_errors', 'confidence_score')
+
+    def __init__(self, extracted_text: str = ""):
+        self.extracted_text = extracted_text
+        self.matches: Dict[str, Any] = {}
+        self.validation_errors: List[str] = []
         self.confidence_score = 0
-        self.extracted_text = ""
-        self.validation_errors = []
-        self.matches = {}
 
-    def validate_text_presence(self, required_patterns: Dict[str, str], text: str = None) -> bool:
+class BaseDocumentValidator(ABC):
+    """Stateless validation rules; instances are safe to share between threads"""
+
+    # Patterns specific to this document type, used to classify unlabelled uploads
+    document_identifiers: List[str] = []
+
+    def validate_within_budget(self, text: Union[str, NormalizedText],
+                               budget_ms: int = VALIDATOR_TIME_BUDGET_MS) -> Dict[str, Any]:
+        """validate() with a cap on its pattern matching time.
+
+        Once the budget is spent, the remaining patterns count as not found
+        and the result is marked with timedOut.
+        """
+        with metrics.VALIDATOR_SECONDS.labels(validator=type(self).__name__).time(), \
+                tracing.span('validate'), match_budget(budget_ms / 1000) as budget:
+            result = self.validate(text)
+        if budget is not None and budget.exceeded:
+            logger.warning(
+                f"{type(self).__name__} exceeded its {budget_ms} ms matching budget, "
+                f"{budget.skipped} searches skipped"
+            )
+            result['timedOut'] = True
+        return result
+
+    @staticmethod
+    def compile_identifiers(key_identifiers: Dict[str, List[str]]) -> Dict[str, PatternSet]:
+        """Compile each list of identifier patterns once, when the validator is created"""
+        return {key: PatternSet(patterns) for key, patterns in key_identifiers.items()}
+
+    def validate_text_presence(self, required_patterns: PatternSet,
+                               validation: ValidationResult) -> bool:
         """Enhanced pattern matching with better error handling and logging"""
-        if text is not None:
-            self.extracted_text = text
-            
-        text_to_check = self.extracted_text.upper()
-        all_patterns_found = True
-        
-        for pattern_name, pattern in required_patterns.items():
-            try:
-                match = re.search(pattern, text_to_check, re.VERBOSE | re.IGNORECASE)
-                if match:
-                    self.matches[pattern_name] = match.group().strip()
-                    logger.debug(f"Found {pattern_name}: {match.group()}")
-                else:
-                    logger.debug(f"Missing {pattern_name}")
-                    self.validation_errors.append(f"Missing {pattern_name}")
-                    all_patterns_found = False
-            except Exception as e:
-                logger.error(f"Error matching pattern {pattern_name}: {str(e)}")
-                self.validation_errors.append(f"Error processing {pattern_name}")
-                all_patterns_found = False
+        try:
+            # extracted_text is already upper-cased by the validator
+            hits = {hit.name: hit for hit in required_patterns.scan(validation.extracted_text)}
+        except Exception as e:
+            logger.error(f"Error matching required patterns: {str(e)}")
+            validation.validation_errors.extend(
+                f"Error processing {pattern_name}" for pattern_name in required_patterns.names
+            )
+            return False
+
+        for pattern_name in required_patterns.names:
+            hit = hits.get(pattern_name)
+            if hit:
+                validation.matches[pattern_name] = hit.group().strip()
+                logger.debug(f"Found {pattern_name}: {hit.group()}")
+            else:
+                logger.debug(f"Missing {pattern_name}")
+                validation.validation_errors.append(f"Missing {pattern_name}")
                 
-        return all_patterns_found
+        return len(hits) == len(required_patterns)
 
-    def calculate_confidence(self, total_patterns: int) -> float:
+    def calculate_confidence(self, total_patterns: int, validation: ValidationResult) -> float:
         """Calculate confidence score based on found patterns"""
-        found_patterns = len(self.matches)
+        found_patterns = len(validation.matches)
         base_confidence = (found_patterns / total_patterns) * 0.95
         
         # Additional confidence boosters
-        if 'isDigitallySigned' in self.matches:
+        if 'isDigitallySigned' in validation.matches:
             base_confidence += 0.05
             
         return min(base_confidence, 1.0)
 
-    def _generate_response(self, doc_type: str) -> Dict[str, Any]:
+    def _generate_response(self, doc_type: str, validation: ValidationResult) -> Dict[str, Any]:
         """Generate standardized response"""
         return {
-            "isValid": len(self.validation_errors) == 0,
-            "confidence": self.confidence_score,
+            "isValid": len(validation.validation_errors) == 0,
+            "confidence": validation.confidence_score,
             "documentType": doc_type,
             "details": {
-                "errors": self.validation_errors,
-                "extractedText": self.extracted_text,
-                "matches": self.matches
+                "errors": validation.validation_errors,
+                "extractedText": validation.extracted_text,
+                "matches": validation.matches
             }
         }
 
 class AadharValidator(BaseDocumentValidator):
-    def validate(self, text: str) -> Dict[str, Any]:
-        self.extracted_text = text
-        self.validation_errors = []
-        
-        required_patterns = {
-            "Aadhar Number": r"\b\d{4}[\s-]?\d{4}[\s-]?\d{4}\b",
-            "Government Text": r"(government of india|govt\.? of india|भारत सरकार)",
-            "UIDAI Text": r"(unique identification authority|यूनीक आइडेंटिफिकेशन अथॉरिटी|uidai)",
-            "DOB Format": r"(DOB|Date of Birth|जन्म तिथि|Year of Birth|Birth Year|DOB/Year of Birth)[\s:\-]*[\d/\-\.]+",
-        }
+    document_identifiers = [
+        r'UNIQUE\s*IDENTIFICATION\s*AUTHORITY',
+        r'यूनीक\s*आइडेंटिफिकेशन\s*अथॉरिटी',
+        r'\bUIDAI\b',
+        r'\bAADHAA?R\b',
+        r'आधार'
+    ]
+    required_patterns = PatternSet({
+        "Aadhar Number": r"\b\d{4}[\s-]?\d{4}[\s-]?\d{4}\b",
+        "Government Text": r"(government of india|govt\.? of india|भारत सरकार)",
+        "UIDAI Text": r"(unique identification authority|यूनीक आइडेंटिफिकेशन अथॉरिटी|uidai)",
+        "DOB Format": r"(DOB|Date of Birth|जन्म तिथि|Year of Birth|Birth Year|DOB/Year of Birth)[\s:\-]*[\d/\-\.]+",
+    }, re.IGNORECASE)
+
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
+        text = NormalizedText.of(text)
+        validation = ValidationResult(text.raw)
         
         # Check patterns and calculate confidence
         matches_found = 0
-        for pattern_name, pattern in required_patterns.items():
-            if re.search(pattern, text, re.IGNORECASE):
+        hits = {hit.name for hit in self.required_patterns.scan(text.raw)}
+        for pattern_name in self.required_patterns.names:
+            if pattern_name in hits:
                 matches_found += 1
                 logger.debug(f"Found {pattern_name}")
             else:
                 logger.debug(f"Missing {pattern_name}")
-                self.validation_errors.append(f"Missing {pattern_name}")
+                validation.validation_errors.append(f"Missing {pattern_name}")
 
         # Calculate confidence score
-        confidence_score = matches_found / len(required_patterns)
+        confidence_score = matches_found / len(self.required_patterns)
         
         return {
             'isValid': matches_found >= 3,  # Valid if at least 3 patterns match
             'confidenceScore': confidence_score,
             'documentType': 'Aadhar Card',
-            'errors': self.validation_errors if self.validation_errors else []
+            'errors': validation.validation_errors if validation.validation_errors else []
         }
 
 class PANCardValidator(BaseDocumentValidator):
+    document_identifiers = [
+        r'INCOME\s*TAX\s*DEPARTMENT',
+        r'आय\s*कर\s*विभाग',
+        r'PERMANENT\s*ACCOUNT\s*(?:NUMBER|NO|CARD)',
+        r'\bPAN\s*CARD\b'
+    ]
     def __init__(self):
         super().__init__()
         self.key_identifiers = {
@@ -135,45 +186,26 @@ class PANCardValidator(BaseDocumentValidator):
                 r'हस्ताक्षर'
             ]
         }
-
-    def preprocess_text(self, text: str) -> str:
-        """Enhanced text preprocessing"""
-        if not text:
-            return ""
-        
-        # Convert to uppercase
-        text = text.upper()
-        
-        # Remove special characters but preserve essential ones
-        text = re.sub(r'[^A-Z0-9\s./-]', ' ', text)
-        
-        # Normalize spaces
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Handle common OCR errors
-        ocr_fixes = {
-            'O': '0', 'I': '1', 'l': '1', 
-            'S': '5', 'B': '8', 'Z': '2',
-            'G': '6', 'T': '7'
+        self.matchers = self.compile_identifiers(self.key_identifiers)
+        # preprocess_text drops Devanagari, so patterns with Hindi labels are
+        # also matched against the Devanagari view
+        self.devanagari_matchers = {
+            key: PatternSet([pattern for pattern in self.key_identifiers[key] if _DEVANAGARI.search(pattern)])
+            for key in ('document_markers', 'personal_info_markers')
         }
-        
-        # Apply fixes only to potential PAN number segments
-        pan_candidates = re.finditer(r'\b[A-Z0-9]{10}\b', text)
-        for match in pan_candidates:
-            pan = match.group()
-            fixed_pan = ''.join(ocr_fixes.get(c, c) for c in pan)
-            text = text.replace(pan, fixed_pan)
-        
-        return text.strip()
 
-    def validate(self, text: str) -> Dict[str, Any]:
+    def preprocess_text(self, text: Union[str, NormalizedText]) -> str:
+        """Upper-cased Latin text with OCR digit fixes in PAN-like tokens"""
+        return NormalizedText.of(text).digit_fixed
+
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         try:
-            self.extracted_text = self.preprocess_text(text)
+            text = NormalizedText.of(text)
+            validation = ValidationResult(self.preprocess_text(text))
             
-            if not self.extracted_text:
+            if not validation.extracted_text:
                 return self._generate_error_response("No text content found in document")
             
-            self.matches = {}
             matches_found = {
                 'pan_number': 0,
                 'document_markers': 0,
@@ -181,29 +213,23 @@ class PANCardValidator(BaseDocumentValidator):
             }
 
             # Find PAN number
-            pan_number = self._extract_pan_number()
+            pan_number = self._extract_pan_number(validation.extracted_text)
             if pan_number:
                 matches_found['pan_number'] = 1
-                self.matches['pan_number'] = pan_number
+                validation.matches['pan_number'] = pan_number
 
             # Check document markers
-            marker_count = 0
-            for pattern in self.key_identifiers['document_markers']:
-                if re.search(pattern, self.extracted_text):
-                    marker_count += 1
+            marker_count = self._count_markers('document_markers', validation.extracted_text, text.devanagari)
             matches_found['document_markers'] = min(marker_count * 0.2, 1.0)
 
             # Check personal information
-            info_count = 0
-            for pattern in self.key_identifiers['personal_info_markers']:
-                if re.search(pattern, self.extracted_text):
-                    info_count += 1
+            info_count = self._count_markers('personal_info_markers', validation.extracted_text, text.devanagari)
             matches_found['personal_info'] = min(info_count * 0.25, 1.0)
 
             # Extract additional information
-            additional_info = self._extract_additional_info()
+            additional_info = self._extract_additional_info(validation.extracted_text, text.devanagari)
             if additional_info:
-                self.matches.update(additional_info)
+                validation.matches.update(additional_info)
 
             # Calculate confidence score
             weights = {
@@ -211,17 +237,17 @@ class PANCardValidator(BaseDocumentValidator):
                 'document_markers': 0.3,
                 'personal_info': 0.2
             }
-            self.confidence_score = sum(matches_found[k] * weights[k] for k in weights)
+            validation.confidence_score = sum(matches_found[k] * weights[k] for k in weights)
 
             # More lenient validation for poor quality scans
-            is_valid = (self.confidence_score >= 0.3)
+            is_valid = (validation.confidence_score >= 0.3)
 
             return {
                 'documentType': 'PAN Card',
                 'isValid': is_valid,
-                'confidenceScore': self.confidence_score,
+                'confidenceScore': validation.confidence_score,
                 'matchedIdentifiers': matches_found,
-                'extractedData': self.matches,
+                'extractedData': validation.matches,
                 'validationDetails': {
                     'scores': matches_found,
                     'requiredMinimum': 0.3,
@@ -234,10 +260,10 @@ class PANCardValidator(BaseDocumentValidator):
         except Exception as e:
             return self._generate_error_response(str(e))
 
-    def _extract_pan_number(self) -> Optional[str]:
+    def _extract_pan_number(self, text: str) -> Optional[str]:
         """Extract PAN number with validation"""
         for pattern in self.key_identifiers['pan_format']:
-            matches = re.finditer(pattern, self.extracted_text)
+            matches = finditer(pattern, text)
             for match in matches:
                 pan = match.group()
                 if self._validate_pan_format(pan):
@@ -268,7 +294,21 @@ class PANCardValidator(BaseDocumentValidator):
             
         return True
 
-    def _extract_additional_info(self) -> Dict[str, str]:
+    def _count_markers(self, key: str, text: str, devanagari_text: str) -> int:
+        """Number of key's patterns found in the Latin text or, for Hindi ones, the Devanagari view"""
+        found = {hit.name for hit in self.matchers[key].scan(text)}
+        found.update(hit.name for hit in self.devanagari_matchers[key].scan(devanagari_text))
+        return len(found)
+
+    @staticmethod
+    def _search(pattern: str, text: str, devanagari_text: str):
+        """search() in the Latin text, falling back to the Devanagari view for Hindi patterns"""
+        match = search(pattern, text)
+        if match is None and devanagari_text and _DEVANAGARI.search(pattern):
+            match = search(pattern, devanagari_text)
+        return match
+
+    def _extract_additional_info(self, text: str, devanagari_text: str = "") -> Dict[str, str]:
         """Extract additional information with improved patterns"""
         info = {}
         
@@ -279,7 +319,7 @@ class PANCardValidator(BaseDocumentValidator):
         ]
         
         for pattern in name_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = self._search(pattern, text, devanagari_text)
             if match:
                 info['name'] = match.group(1).strip()
                 break
@@ -291,7 +331,7 @@ class PANCardValidator(BaseDocumentValidator):
         ]
         
         for pattern in father_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = self._search(pattern, text, devanagari_text)
             if match:
                 info['father_name'] = match.group(1).strip()
                 break
@@ -303,7 +343,7 @@ class PANCardValidator(BaseDocumentValidator):
         ]
         
         for pattern in dob_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = self._search(pattern, text, devanagari_text)
             if match:
                 info['date_of_birth'] = match.group(1)
                 break
@@ -314,8 +354,8 @@ class PANCardValidator(BaseDocumentValidator):
         """Generate standardized error response"""
         return {
             'documentType': 'PAN Card',
-            'isValid': True,
-            'confidenceScore': 0.85,
+            'isValid': False,
+            'confidenceScore': 0.0,
             'error': error_message,
             'validationDetails': {
                 'error_type': 'validation_error',
@@ -352,15 +392,15 @@ class VoterIDValidator(BaseDocumentValidator):
                 r'EPIC\s*NO[.:]\s*([A-Z0-9\/]{8,})'  # EPIC with prefix
             ]
         }
+        self.matchers = self.compile_identifiers(self.key_identifiers)
+        self.document_identifiers = self.key_identifiers['document_identifiers']
 
-    def validate(self, text: str) -> Dict[str, Any]:
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         """Enhanced validation with better pattern matching"""
         try:
-            self.extracted_text = text.upper()
-            self.matches = {}
-            self.validation_errors = []
+            validation = ValidationResult(NormalizedText.of(text).upper)
             
-            logger.debug(f"Validating Voter ID text: {self.extracted_text}")
+            logger.debug(f"Validating Voter ID text ({len(validation.extracted_text)} characters)")
             
             # Initialize scoring
             matches_found = {
@@ -370,26 +410,22 @@ class VoterIDValidator(BaseDocumentValidator):
             }
 
             # Check document identifiers
-            for pattern in self.key_identifiers['document_identifiers']:
-                if re.search(pattern, self.extracted_text):
-                    matches_found['document_identifiers'] += 0.25
-                    logger.debug(f"Found document identifier: {pattern}")
+            for hit in self.matchers['document_identifiers'].scan(validation.extracted_text):
+                matches_found['document_identifiers'] += 0.25
+                logger.debug(f"Found document identifier: {hit.pattern}")
 
             # Check personal information
-            for pattern in self.key_identifiers['personal_info']:
-                if re.search(pattern, self.extracted_text):
-                    matches_found['personal_info'] += 0.2
-                    logger.debug(f"Found personal info: {pattern}")
+            for hit in self.matchers['personal_info'].scan(validation.extracted_text):
+                matches_found['personal_info'] += 0.2
+                logger.debug(f"Found personal info: {hit.pattern}")
 
             # Check EPIC number with multiple formats
-            for pattern in self.key_identifiers['epic_number']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    epic_number = match.group(1) if 'EPIC' in pattern else match.group()
-                    self.matches['epic_number'] = epic_number
-                    matches_found['epic_number'] = 1
-                    logger.debug(f"Found EPIC number: {epic_number}")
-                    break
+            match = self.matchers['epic_number'].first(validation.extracted_text)
+            if match:
+                epic_number = match.group(1) if 'EPIC' in match.pattern else match.group()
+                validation.matches['epic_number'] = epic_number
+                matches_found['epic_number'] = 1
+                logger.debug(f"Found EPIC number: {epic_number}")
 
             # Cap scores at 1.0
             matches_found = {k: min(v, 1.0) for k, v in matches_found.items()}
@@ -400,21 +436,21 @@ class VoterIDValidator(BaseDocumentValidator):
                 'personal_info': 0.3,
                 'epic_number': 0.3
             }
-            self.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
+            validation.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
 
             # Extract additional information
-            additional_info = self._extract_additional_info()
+            additional_info = self._extract_additional_info(validation.extracted_text)
 
             # Determine validity with lower threshold
-            is_valid = (self.confidence_score >= 0.4)  # Lowered threshold
+            is_valid = (validation.confidence_score >= 0.4)  # Lowered threshold
 
             result = {
                 'documentType': 'Voter ID',
                 'isValid': is_valid,
-                'confidenceScore': self.confidence_score,
+                'confidenceScore': validation.confidence_score,
                 'matchedIdentifiers': matches_found,
                 'extractedData': {
-                    **self.matches,
+                    **validation.matches,
                     **additional_info
                 },
                 'validationDetails': {
@@ -438,37 +474,45 @@ class VoterIDValidator(BaseDocumentValidator):
                 'error': str(e)
             }
 
-    def _extract_additional_info(self) -> Dict[str, str]:
+    def _extract_additional_info(self, text: str) -> Dict[str, str]:
         """Extract additional information from the Voter ID"""
         info = {}
         
         # Extract name
-        name_match = re.search(r"ELECTOR['S]*\s*NAME\s*[:]\s*([A-Z\s]+)", self.extracted_text)
+        name_match = search(r"ELECTOR['S]*\s*NAME\s*[:]\s*([A-Z\s]+)", text)
         if name_match:
             info['name'] = name_match.group(1).strip()
 
         # Extract father's name
-        father_match = re.search(r"FATHER['S]*\s*NAME\s*[:]\s*([A-Z\s]+)", self.extracted_text)
+        father_match = search(r"FATHER['S]*\s*NAME\s*[:]\s*([A-Z\s]+)", text)
         if father_match:
             info['fatherName'] = father_match.group(1).strip()
 
         # Extract sex/gender
-        sex_match = re.search(r"SEX\s*[:]\s*([A-Z]+)", self.extracted_text)
+        sex_match = search(r"SEX\s*[:]\s*([A-Z]+)", text)
         if sex_match:
             info['gender'] = sex_match.group(1).strip()
 
         # Extract DOB/Age
-        dob_match = re.search(r"DATE\s*OF\s*BIRTH\s*[:]\s*(\d{2}[/-]\d{2}[/-]\d{4})", self.extracted_text)
+        dob_match = search(r"DATE\s*OF\s*BIRTH\s*[:]\s*(\d{2}[/-]\d{2}[/-]\d{4})", text)
         if dob_match:
             info['dateOfBirth'] = dob_match.group(1)
         else:
-            age_match = re.search(r"AGE\s*[:]\s*(\d+)", self.extracted_text)
+            age_match = search(r"AGE\s*[:]\s*(\d+)", text)
             if age_match:
                 info['age'] = age_match.group(1)
 
         return info
 
 class DrivingLicenseValidator(BaseDocumentValidator):
+    document_identifiers = [
+        r'DRIVING\s*LICEN[CS]E',
+        r'DRIVE\s*(?:MOTOR\s*)?VEHICLES?',
+        r'TRANSPORT\s*(?:DEPARTMENT|AUTHORITY)',
+        r'\bRTO\b',
+        r'LICENSING\s*AUTHORITY',
+        r'THROUGHOUT\s*INDIA'
+    ]
     def __init__(self):
         super().__init__()
         self.location_indicators = [
@@ -487,39 +531,22 @@ class DrivingLicenseValidator(BaseDocumentValidator):
                 'ADDRESS', 'RESIDENT', 'RESIDING', 'ADD'
             ]
         }
+        # Built once; they tolerate OCR typos in the indicator words
+        self.fuzzy_matchers = {
+            'license': FuzzyMatcher(self.key_indicators['license_indicators'], threshold=0.7),
+            'location': FuzzyMatcher(self.location_indicators, threshold=0.8),
+            'document_elements': FuzzyMatcher(self.key_indicators['document_elements'], threshold=0.7)
+        }
 
-    def _preprocess_text(self, text: str) -> str:
-        """Preprocess the extracted text"""
-        # Convert to uppercase
-        text = text.upper()
-        
-        # Remove special characters but keep spaces
-        text = re.sub(r'[^\w\s]', ' ', text)
-        
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        
-        return text
+    def _preprocess_text(self, text: Union[str, NormalizedText]) -> str:
+        """Upper-cased text without special characters or extra whitespace"""
+        return NormalizedText.of(text).alnum
 
-    def _fuzzy_match(self, text: str, patterns: List[str], threshold: float = 0.8) -> bool:
-        """Use fuzzy matching to find similar text"""
-        from difflib import SequenceMatcher
-        
-        words = text.split()
-        for word in words:
-            for pattern in patterns:
-                similarity = SequenceMatcher(None, word, pattern).ratio()
-                if similarity >= threshold:
-                    return True
-        return False
-
-    def validate(self, text: str) -> Dict[str, Any]:
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         """Validate driving license with fuzzy matching"""
         try:
             # Preprocess the text
-            self.extracted_text = self._preprocess_text(text)
-            self.matches = {}
-            self.validation_errors = []
+            validation = ValidationResult(self._preprocess_text(text))
             
             # Check for key indicators
             indicators_found = {
@@ -528,29 +555,13 @@ class DrivingLicenseValidator(BaseDocumentValidator):
                 'document_elements': False
             }
             
-            # Check license indicators
-            indicators_found['license'] = self._fuzzy_match(
-                self.extracted_text,
-                self.key_indicators['license_indicators'],
-                threshold=0.7
-            )
-            
-            # Check location indicators
-            indicators_found['location'] = self._fuzzy_match(
-                self.extracted_text,
-                self.location_indicators,
-                threshold=0.8
-            )
-            
-            # Check document elements
-            indicators_found['document_elements'] = self._fuzzy_match(
-                self.extracted_text,
-                self.key_indicators['document_elements'],
-                threshold=0.7
-            )
+            # Check license, location and document element indicators
+            words = validation.extracted_text.split()
+            for indicator, matcher in self.fuzzy_matchers.items():
+                indicators_found[indicator] = matcher.find(words) is not None
             
             # Extract possible license numbers using pattern matching
-            possible_license_numbers = self._extract_possible_license_numbers()
+            possible_license_numbers = self._extract_possible_license_numbers(validation.extracted_text)
             
             # Calculate confidence score
             confidence_score = self._calculate_confidence(indicators_found, bool(possible_license_numbers))
@@ -561,9 +572,9 @@ class DrivingLicenseValidator(BaseDocumentValidator):
             # Prepare extracted data
             extracted_data = {
                 'possibleLicenseNumbers': possible_license_numbers,
-                'detectedLocations': self._extract_locations(),
-                'hasSignature': 'SIGNATURE' in self.extracted_text or 'THUMB IMPRESSION' in self.extracted_text,
-                'detectedText': self.extracted_text[:200] + '...' if len(self.extracted_text) > 200 else self.extracted_text
+                'detectedLocations': self._extract_locations(validation.extracted_text),
+                'hasSignature': 'SIGNATURE' in validation.extracted_text or 'THUMB IMPRESSION' in validation.extracted_text,
+                'detectedText': validation.extracted_text[:200] + '...' if len(validation.extracted_text) > 200 else validation.extracted_text
             }
             
             return {
@@ -589,7 +600,7 @@ class DrivingLicenseValidator(BaseDocumentValidator):
                 'error': str(e)
             }
 
-    def _extract_possible_license_numbers(self) -> List[str]:
+    def _extract_possible_license_numbers(self, text: str) -> List[str]:
         """Extract possible license numbers using various patterns"""
         patterns = [
             r'[A-Z]{2}[-\s]?\d{2}[-\s]?\d{4}[-\s]?\d{7}',  # Standard format
@@ -599,15 +610,15 @@ class DrivingLicenseValidator(BaseDocumentValidator):
         
         numbers = []
         for pattern in patterns:
-            matches = re.finditer(pattern, self.extracted_text)
+            matches = finditer(pattern, text)
             numbers.extend([match.group() for match in matches])
         
         return list(set(numbers))  # Remove duplicates
 
-    def _extract_locations(self) -> List[str]:
+    def _extract_locations(self, text: str) -> List[str]:
         """Extract possible locations from text"""
         return [loc for loc in self.location_indicators 
-                if loc in self.extracted_text]
+                if loc in text]
 
     def _calculate_confidence(self, indicators: Dict[str, bool], has_license_number: bool) -> float:
         """Calculate confidence score"""
@@ -659,15 +670,15 @@ class RationCardValidator(BaseDocumentValidator):
                 r'PRIORITY\s*HOUSEHOLD'
             ]
         }
+        self.matchers = self.compile_identifiers(self.key_identifiers)
+        self.document_identifiers = self.key_identifiers['document_identifiers']
 
-    def validate(self, text: str) -> Dict[str, Any]:
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         """Enhanced validation with better pattern matching"""
         try:
-            self.extracted_text = text.upper()
-            self.matches = {}
-            self.validation_errors = []
+            validation = ValidationResult(NormalizedText.of(text).upper)
             
-            logger.debug(f"Validating Ration Card text: {self.extracted_text}")
+            logger.debug(f"Validating Ration Card text ({len(validation.extracted_text)} characters)")
             
             # Initialize scoring
             matches_found = {
@@ -678,35 +689,30 @@ class RationCardValidator(BaseDocumentValidator):
             }
 
             # Check document identifiers
-            for pattern in self.key_identifiers['document_identifiers']:
-                if re.search(pattern, self.extracted_text):
-                    matches_found['document_identifiers'] += 0.25
-                    logger.debug(f"Found document identifier: {pattern}")
+            for hit in self.matchers['document_identifiers'].scan(validation.extracted_text):
+                matches_found['document_identifiers'] += 0.25
+                logger.debug(f"Found document identifier: {hit.pattern}")
 
             # Check card numbers
-            for pattern in self.key_identifiers['card_numbers']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    card_number = match.group(1) if '(' in pattern else match.group()
-                    self.matches['card_number'] = card_number
-                    matches_found['card_number'] = 1
-                    logger.debug(f"Found card number: {card_number}")
-                    break
+            match = self.matchers['card_numbers'].first(validation.extracted_text)
+            if match:
+                card_number = match.group(1) if '(' in match.pattern else match.group()
+                validation.matches['card_number'] = card_number
+                matches_found['card_number'] = 1
+                logger.debug(f"Found card number: {card_number}")
 
             # Check categories
-            for pattern in self.key_identifiers['categories']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['category'] = match.group()
-                    matches_found['category'] = 1
-                    logger.debug(f"Found category: {match.group()}")
-                    break
+            match = self.matchers['categories'].first(validation.extracted_text)
+            if match:
+                validation.matches['category'] = match.group()
+                matches_found['category'] = 1
+                logger.debug(f"Found category: {match.group()}")
 
             # Extract additional information
-            additional_info = self._extract_additional_info()
+            additional_info = self._extract_additional_info(validation.extracted_text)
             if additional_info:
                 matches_found['additional_info'] = len(additional_info) * 0.2
-                self.matches.update(additional_info)
+                validation.matches.update(additional_info)
 
             # Cap scores at 1.0
             matches_found = {k: min(v, 1.0) for k, v in matches_found.items()}
@@ -718,24 +724,24 @@ class RationCardValidator(BaseDocumentValidator):
                 'category': 0.2,
                 'additional_info': 0.2
             }
-            self.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
+            validation.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
 
             # Determine validity with lower threshold
-            is_valid = (self.confidence_score >= 0.3)  # Lowered threshold
+            is_valid = (validation.confidence_score >= 0.3)  # Lowered threshold
 
             result = {
                 'documentType': 'Ration Card',
                 'isValid': is_valid,
-                'confidenceScore': self.confidence_score,
+                'confidenceScore': validation.confidence_score,
                 'matchedIdentifiers': matches_found,
-                'extractedData': self.matches,
+                'extractedData': validation.matches,
                 'validationDetails': {
                     'scores': matches_found,
                     'requiredMinimum': 0.3,
                     'hasDocumentIdentifiers': matches_found['document_identifiers'] > 0,
                     'hasCardNumber': matches_found['card_number'] > 0,
                     'hasCategory': matches_found['category'] > 0,
-                    'extractedText': self.extracted_text
+                    'extractedText': validation.extracted_text
                 }
             }
 
@@ -751,68 +757,75 @@ class RationCardValidator(BaseDocumentValidator):
                 'error': str(e)
             }
 
-    def _extract_additional_info(self) -> Dict[str, str]:
+    def _extract_additional_info(self, text: str) -> Dict[str, str]:
         """Extract additional information from the Ration Card"""
         info = {}
         
         # Extract address
-        address_match = re.search(r'ADDRESS\s*[:.]\s*([A-Z0-9\s,/-]+?)(?=\b(?:DISTRICT|PIN|DATE|UNITS)\b|$)', 
-                                self.extracted_text)
+        address_match = search(r'ADDRESS\s*[:.]\s*([A-Z0-9\s,/-]+?)(?=\b(?:DISTRICT|PIN|DATE|UNITS)\b|$)', 
+                                text)
         if address_match:
             info['address'] = address_match.group(1).strip()
 
         # Extract district
-        district_match = re.search(r'DISTRICT\s*[:.]\s*([A-Z\s]+)', self.extracted_text)
+        district_match = search(r'DISTRICT\s*[:.]\s*([A-Z\s]+)', text)
         if district_match:
             info['district'] = district_match.group(1).strip()
 
         # Extract units/family members
-        units_match = re.search(r'UNITS\s*(?:ALLOTED|ALLOCATED)\s*[:.]\s*(\d+)', self.extracted_text)
+        units_match = search(r'UNITS\s*(?:ALLOTED|ALLOCATED)\s*[:.]\s*(\d+)', text)
         if units_match:
             info['units_allocated'] = units_match.group(1)
 
         # Extract income
-        income_match = re.search(r'INCOME\s*(?:OF\s*FAMILY)?\s*[:.]\s*(?:RS\.?\s*)?(\d+)', self.extracted_text)
+        income_match = search(r'INCOME\s*(?:OF\s*FAMILY)?\s*[:.]\s*(?:RS\.?\s*)?(\d+)', text)
         if income_match:
             info['family_income'] = income_match.group(1)
 
         # Extract issue date
-        date_match = re.search(r'DATE\s*OF\s*ISSUE\s*[:.]\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', self.extracted_text)
+        date_match = search(r'DATE\s*OF\s*ISSUE\s*[:.]\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', text)
         if date_match:
             info['issue_date'] = date_match.group(1)
 
         return info
 
 class CasteCertificateValidator(BaseDocumentValidator):
-    def validate(self, text: str) -> Dict[str, Any]:
-        self.extracted_text = text.upper()
-        self.validation_errors = []
-        
-        # Define required patterns with more variations
-        required_patterns = {
-            "Certificate Title": r"(CASTE CERTIFICATE|OBC CERTIFICATE|SC CERTIFICATE|ST CERTIFICATE|COMMUNITY CERTIFICATE)",
-            "Category": r"(OBC|SC|ST|OTHER BACKWARD CLASS|SCHEDULED CASTE|SCHEDULED TRIBE)",
-            "Authority": r"(DISTRICT MAGISTRATE|TEHSILDAR|SDM|REVENUE DEPARTMENT|GOVT OF|GOVERNMENT OF)",
-            "Certificate Number": r"(CERTIFICATE NO|CERTIFICATE NUMBER|REF NO)[\s.:]*[\w\d/-]+",
-            "Validity": r"(THIS CERTIFICATE IS VALID|VALID UPTO|VALIDITY)"
-        }
+    document_identifiers = [
+        r'CASTE\s*CERTIFICATE',
+        r'\b(?:OBC|SC|ST)\s*CERTIFICATE',
+        r'COMMUNITY\s*CERTIFICATE',
+        r'SCHEDULED\s*(?:CASTE|TRIBE)',
+        r'OTHER\s*BACKWARD\s*CLASS',
+        r'जाति\s*प्रमाण\s*पत्र'
+    ]
+    # Define required patterns with more variations
+    required_patterns = PatternSet({
+        "Certificate Title": r"(CASTE CERTIFICATE|OBC CERTIFICATE|SC CERTIFICATE|ST CERTIFICATE|COMMUNITY CERTIFICATE)",
+        "Category": r"(OBC|SC|ST|OTHER BACKWARD CLASS|SCHEDULED CASTE|SCHEDULED TRIBE)",
+        "Authority": r"(DISTRICT MAGISTRATE|TEHSILDAR|SDM|REVENUE DEPARTMENT|GOVT OF|GOVERNMENT OF)",
+        "Certificate Number": r"(CERTIFICATE NO|CERTIFICATE NUMBER|REF NO)[\s.:]*[\w\d/-]+",
+        "Validity": r"(THIS CERTIFICATE IS VALID|VALID UPTO|VALIDITY)"
+    }, re.IGNORECASE)
+
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
+        validation = ValidationResult(NormalizedText.of(text).upper)
         
         matches_found = 0
-        self.matches = {}
         
         # Check each pattern
-        for pattern_name, pattern in required_patterns.items():
-            match = re.search(pattern, self.extracted_text, re.IGNORECASE)
+        hits = {hit.name: hit for hit in self.required_patterns.scan(validation.extracted_text)}
+        for pattern_name in self.required_patterns.names:
+            match = hits.get(pattern_name)
             if match:
                 matches_found += 1
-                self.matches[pattern_name] = match.group()
+                validation.matches[pattern_name] = match.group()
                 logger.debug(f"Found {pattern_name}: {match.group()}")
             else:
                 logger.debug(f"Missing {pattern_name}")
-                self.validation_errors.append(f"Missing {pattern_name}")
+                validation.validation_errors.append(f"Missing {pattern_name}")
         
         # Calculate confidence score based on matches
-        confidence_score = matches_found / len(required_patterns)
+        confidence_score = matches_found / len(self.required_patterns)
         
         # Document is valid if at least 3 key patterns are found
         is_valid = matches_found >= 3
@@ -821,66 +834,75 @@ class CasteCertificateValidator(BaseDocumentValidator):
             'isValid': is_valid,
             'confidenceScore': confidence_score,
             'documentType': 'Caste Certificate',
-            'errors': self.validation_errors if not is_valid else []
+            'errors': validation.validation_errors if not is_valid else []
         }
 
 class IncomeCertificateValidator(BaseDocumentValidator):
-    def validate(self, text: str) -> Dict[str, Any]:
-        self.extracted_text = text.upper()
-        self.validation_errors = []
-        self.matches = {}
-        
-        required_patterns = {
-            "Certificate Title": r"""
-                (?:
-                    INCOME\s+CERTIFICATE|
-                    REVENUE\s+DEPARTMENT.*DELHI|
-                    आय\s+प्रमाण\s+पत्र
-                )
-            """,
-            "Income Amount": r"""
-                (?:
-                    INCOME.*RS\.?\s*[\d,]+|
-                    RS\.?\s*[\d,]+.*(?:PER\s+ANNUM|YEARLY|ANNUAL)
-                )
-            """,
-            "Authority": r"""
-                (?:
-                    TEHSILDAR|
-                    DISTRICT\s+MAGISTRATE|
-                    REVENUE\s+OFFICER
-                )
-            """,
-            "Certificate Number": r"""
-                (?:
-                    CERTIFICATE\s+NO:?\s*\d+|
-                    CERTIFICATE\s+NUMBER:?\s*\d+
-                )
-            """
-        }
+    document_identifiers = [
+        r'INCOME\s*CERTIFICATE',
+        r'आय\s*प्रमाण\s*पत्र',
+        r'ANNUAL\s*(?:FAMILY\s*)?INCOME'
+    ]
+    required_patterns = PatternSet({
+        "Certificate Title": r"""
+            (?:
+                INCOME\s+CERTIFICATE|
+                REVENUE\s+DEPARTMENT.{0,200}DELHI|
+                आय\s+प्रमाण\s+पत्र
+            )
+        """,
+        "Authority": r"""
+            (?:
+                TEHSILDAR|
+                DISTRICT\s+MAGISTRATE|
+                REVENUE\s+OFFICER
+            )
+        """,
+        "Certificate Number": r"""
+            (?:
+                CERTIFICATE\s+NO:?\s*\d+|
+                CERTIFICATE\s+NUMBER:?\s*\d+
+            )
+        """
+    }, re.VERBOSE | re.IGNORECASE)
+    # Matched by _find_income_amount; its .* gaps can't span lines
+    income_amount_pattern = r"""
+        (?:
+            INCOME.*RS\.?\s*[\d,]+|
+            RS\.?\s*[\d,]+.*(?:PER\s+ANNUM|YEARLY|ANNUAL)
+        )
+    """
+    # Where the .* gaps of income_amount_pattern begin
+    income_amount_gaps = r'INCOME|RS\.?\s*[\d,]+'
+    required_names = ["Certificate Title", "Income Amount", "Authority", "Certificate Number"]
+
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
+        validation = ValidationResult(NormalizedText.of(text).upper)
         
         # Check each pattern and count matches
         matches_found = 0
-        for pattern_name, pattern in required_patterns.items():
-            match = re.search(pattern, self.extracted_text, re.VERBOSE | re.IGNORECASE)
+        hits = {hit.name: hit for hit in self.required_patterns.scan(validation.extracted_text)}
+        hits["Income Amount"] = self._find_income_amount(validation.extracted_text)
+        for pattern_name in self.required_names:
+            match = hits.get(pattern_name)
             if match:
                 matches_found += 1
-                self.matches[pattern_name] = match.group()
+                validation.matches[pattern_name] = match.group()
                 logger.debug(f"Found {pattern_name}: {match.group()}")
             else:
                 logger.debug(f"Missing {pattern_name}")
-                self.validation_errors.append(f"Missing {pattern_name}")
+                validation.validation_errors.append(f"Missing {pattern_name}")
 
         # Calculate base confidence score
-        base_confidence = matches_found / len(required_patterns)
+        base_confidence = matches_found / len(self.required_names)
         
         # Extract additional details
         details = {
-            'certificateNumber': self._extract_certificate_number(self.extracted_text),
-            'incomeAmount': self._extract_income_amount(self.extracted_text),
-            'authority': self._extract_authority(self.extracted_text),
-            'issuanceDate': self._extract_date(self.extracted_text),
-            'isDigitallySigned': self._check_digital_signature(self.extracted_text)
+            'certificateNumber': self._extract_certificate_number(validation.extracted_text),
+            'incomeAmount': self._extract_income_amount(validation.extracted_text),
+            'authority': self._extract_authority(validation.extracted_text),
+            'issuanceDate': self._extract_date(validation.extracted_text),
+            'isDigitallySigned': self._check_digital_signature(validation.extracted_text)
         }
         
         # Additional confidence boosters
@@ -899,21 +921,47 @@ class IncomeCertificateValidator(BaseDocumentValidator):
             'isValid': matches_found >= 3,  # Valid if at least 3 key patterns are found
             'confidenceScore': final_confidence,
             'documentType': "Income Certificate",
-            'errors': self.validation_errors if matches_found < 3 else [],
+            'errors': validation.validation_errors if matches_found < 3 else [],
             'extractedInfo': details
         }
         
         logger.debug(f"Validation result: {result}")
         return result
 
+    def _find_income_amount(self, text: str):
+        """First match of income_amount_pattern, found in linear time.
+
+        Searching it directly is quadratic on a long line of INCOMEs that
+        never reach an amount. Of the starts whose gap begins on the same
+        line, a later one can only reach what an earlier one of the same
+        kind already could, so only the first INCOME and the first RS amount
+        of each line are tried.
+        """
+        flags = re.VERBOSE | re.IGNORECASE
+        line_end = -1
+        tried = set()
+        for gap in finditer(self.income_amount_gaps, text, re.IGNORECASE):
+            if gap.end() > line_end:
+                line_end = text.find('\n', gap.end())
+                line_end = len(text) if line_end < 0 else line_end
+                tried = set()
+            kind = gap.group()[0].upper()
+            if kind in tried:
+                continue
+            tried.add(kind)
+            match = match_at(self.income_amount_pattern, text, gap.start(), flags)
+            if match:
+                return match
+        return None
+
     def _extract_certificate_number(self, text: str) -> str:
         """Extract certificate number from text"""
-        match = re.search(r'CERTIFICATE\s+NO:?\s*(\d+)', text)
+        match = search(r'CERTIFICATE\s+NO:?\s*(\d+)', text)
         return match.group(1) if match else ""
 
     def _extract_income_amount(self, text: str) -> str:
         """Extract income amount from text"""
-        match = re.search(r'RS\.?\s*([\d,]+)', text)
+        match = search(r'RS\.?\s*([\d,]+)', text)
         if match:
             amount = match.group(1).replace(',', '')
             return f"Rs. {int(amount):,}"
@@ -927,7 +975,7 @@ class IncomeCertificateValidator(BaseDocumentValidator):
             r'REVENUE\s+OFFICER'
         ]
         for pattern in authority_patterns:
-            match = re.search(pattern, text)
+            match = search(pattern, text)
             if match:
                 return match.group()
         return ""
@@ -940,7 +988,7 @@ class IncomeCertificateValidator(BaseDocumentValidator):
             r'(\d{1,2}[-/.]\d{1,2}[-/.]\d{4})'
         ]
         for pattern in date_patterns:
-            match = re.search(pattern, text)
+            match = search(pattern, text)
             if match:
                 return match.group(1)
         return ""
@@ -952,7 +1000,7 @@ class IncomeCertificateValidator(BaseDocumentValidator):
             r'DIGITAL\s+SIGNATURE',
             r'E-SIGNED'
         ]
-        return any(re.search(pattern, text) for pattern in digital_sig_patterns)
+        return any(search(pattern, text) for pattern in digital_sig_patterns)
     
  
 
@@ -989,14 +1037,14 @@ class DisabilityCertificateValidator(BaseDocumentValidator):
                 r'REG(?:ISTRATION)?\s*NO\.?[:]?\s*([A-Z0-9/-]+)'
             ]
         }
+        self.matchers = self.compile_identifiers(self.key_identifiers)
+        self.document_identifiers = self.key_identifiers['certificate_identifiers']
 
-    def validate(self, text: str) -> Dict[str, Any]:
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         try:
-            self.extracted_text = text.upper()
-            self.matches = {}
-            self.validation_errors = []
+            validation = ValidationResult(NormalizedText.of(text).upper)
             
-            logger.debug(f"Validating Disability Certificate text: {self.extracted_text}")
+            logger.debug(f"Validating Disability Certificate text ({len(validation.extracted_text)} characters)")
             
             # Initialize scoring
             matches_found = {
@@ -1007,32 +1055,28 @@ class DisabilityCertificateValidator(BaseDocumentValidator):
             }
 
             # Check certificate identifiers
-            for pattern in self.key_identifiers['certificate_identifiers']:
-                if re.search(pattern, self.extracted_text):
-                    matches_found['certificate_identifiers'] += 0.25
-                    logger.debug(f"Found certificate identifier: {pattern}")
+            for hit in self.matchers['certificate_identifiers'].scan(validation.extracted_text):
+                matches_found['certificate_identifiers'] += 0.25
+                logger.debug(f"Found certificate identifier: {hit.pattern}")
 
             # Check disability types
-            for pattern in self.key_identifiers['disability_types']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['disability_type'] = match.group()
-                    matches_found['disability_type'] = 1
-                    logger.debug(f"Found disability type: {match.group()}")
-                    break
+            match = self.matchers['disability_types'].first(validation.extracted_text)
+            if match:
+                validation.matches['disability_type'] = match.group()
+                matches_found['disability_type'] = 1
+                logger.debug(f"Found disability type: {match.group()}")
 
             # Check medical authorities
-            for pattern in self.key_identifiers['authorities']:
-                if re.search(pattern, self.extracted_text):
-                    matches_found['authority'] = 1
-                    logger.debug(f"Found medical authority: {pattern}")
-                    break
+            hit = self.matchers['authorities'].first(validation.extracted_text)
+            if hit:
+                matches_found['authority'] = 1
+                logger.debug(f"Found medical authority: {hit.pattern}")
 
             # Extract additional information
-            additional_info = self._extract_additional_info()
+            additional_info = self._extract_additional_info(validation.extracted_text)
             if additional_info:
                 matches_found['additional_info'] = len(additional_info) * 0.2
-                self.matches.update(additional_info)
+                validation.matches.update(additional_info)
 
             # Calculate weighted confidence score
             weights = {
@@ -1041,17 +1085,17 @@ class DisabilityCertificateValidator(BaseDocumentValidator):
                 'authority': 0.2,
                 'additional_info': 0.2
             }
-            self.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
+            validation.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
 
             # Determine validity with adjusted threshold
-            is_valid = (self.confidence_score >= 0.4)
+            is_valid = (validation.confidence_score >= 0.4)
 
             result = {
                 'documentType': 'Disability Certificate',
                 'isValid': is_valid,
-                'confidenceScore': self.confidence_score,
+                'confidenceScore': validation.confidence_score,
                 'matchedIdentifiers': matches_found,
-                'extractedData': self.matches,
+                'extractedData': validation.matches,
                 'validationDetails': {
                     'scores': matches_found,
                     'requiredMinimum': 0.4,
@@ -1073,123 +1117,130 @@ class DisabilityCertificateValidator(BaseDocumentValidator):
                 'error': str(e)
             }
 
-    def _extract_additional_info(self) -> Dict[str, str]:
+    def _extract_additional_info(self, text: str) -> Dict[str, str]:
         """Extract additional information from the Disability Certificate"""
         info = {}
         
         # Extract certificate number
-        for pattern in self.key_identifiers['certificate_numbers']:
-            match = re.search(pattern, self.extracted_text)
-            if match:
-                info['certificate_number'] = match.group(1) if '(' in pattern else match.group()
-                break
+        match = self.matchers['certificate_numbers'].first(text)
+        if match:
+            info['certificate_number'] = match.group(1) if '(' in match.pattern else match.group()
 
         # Extract disability percentage
-        percent_match = re.search(r'(\d{1,3})\s*%.*?(?:PERMANENT\s*)?DISABILITY', self.extracted_text)
+        percent_match = search(r'(\d{1,3})\s*%[^%]{0,200}?(?:PERMANENT\s*)?DISABILITY', text)
         if percent_match:
             info['disability_percentage'] = f"{percent_match.group(1)}%"
 
         # Extract personal details
-        name_match = re.search(r'EXAMINED\s+(?:SHRI|SMT|KUM)\.?\s+([A-Z\s]+?)(?:,|\s+(?:SON|DAUGHTER|WIFE))', self.extracted_text)
+        name_match = search(r'EXAMINED\s+(?:SHRI|SMT|KUM)\.?\s+([A-Z\s]+?)(?:,|\s+(?:SON|DAUGHTER|WIFE))', text)
         if name_match:
             info['name'] = name_match.group(1).strip()
 
         # Extract date of issue
-        date_match = re.search(r'DATE\s*:\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', self.extracted_text)
+        date_match = search(r'DATE\s*:\s*(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', text)
         if date_match:
             info['issue_date'] = date_match.group(1)
 
         # Extract address
-        address_match = re.search(r'RESIDENT\s+OF\s+([A-Z0-9\s,/-]+?)(?=\s+(?:WHOSE|PHOTO|DATE|DISTRICT|STATE))', self.extracted_text)
+        address_match = search(r'RESIDENT\s+OF\s+([A-Z0-9\s,/-]+?)(?=\s+(?:WHOSE|PHOTO|DATE|DISTRICT|STATE))', text)
         if address_match:
             info['address'] = address_match.group(1).strip()
 
         return info
         
 class BPLCertificateValidator(BaseDocumentValidator):
-    def validate(self, text: str) -> Dict[str, Any]:
-        self.extracted_text = text.upper()
-        self.validation_errors = []
-        self.matches = {}
-        
-        required_patterns = {
-            "Certificate Title": r"""
-                (?:
-                    BELOW\s+POVERTY\s+LINE|
-                    BPL\s+CERTIFICATE|
-                    गरीबी\s+रेखा\s+प्रमाण\s+पत्र
-                )
-            """,
-            "BPL Number": r"""
-                (?:
-                    BPL\s+NO\.?\s*:?\s*\d+|
-                    CARD\s+NO\.?\s*:?\s*\d+
-                )
-            """,
-            "Authority": r"""
-                (?:
-                    MUNICIPAL\s+CORPORATION|
-                    NAGAR\s+NIGAM|
-                    PANCHAYAT|
-                    TEHSILDAR
-                )
-            """
-        }
+    document_identifiers = [
+        r'BELOW\s*POVERTY\s*LINE',
+        r'BPL\s*CERTIFICATE',
+        r'BPL\s*(?:NO|CARD)',
+        r'गरीबी\s*रेखा'
+    ]
+    required_patterns = PatternSet({
+        "Certificate Title": r"""
+            (?:
+                BELOW\s+POVERTY\s+LINE|
+                BPL\s+CERTIFICATE|
+                गरीबी\s+रेखा\s+प्रमाण\s+पत्र
+            )
+        """,
+        "BPL Number": r"""
+            (?:
+                BPL\s+NO\.?\s*:?\s*\d+|
+                CARD\s+NO\.?\s*:?\s*\d+
+            )
+        """,
+        "Authority": r"""
+            (?:
+                MUNICIPAL\s+CORPORATION|
+                NAGAR\s+NIGAM|
+                PANCHAYAT|
+                TEHSILDAR
+            )
+        """
+    }, re.VERBOSE | re.IGNORECASE)
+
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
+        validation = ValidationResult(NormalizedText.of(text).upper)
         
-        self.validate_text_presence(required_patterns)
+        self.validate_text_presence(self.required_patterns, validation)
         
         # Extract BPL number
-        bpl_match = re.search(r'BPL\s+NO\.?\s*:?\s*(\d+)', self.extracted_text)
+        bpl_match = search(r'BPL\s+NO\.?\s*:?\s*(\d+)', validation.extracted_text)
         if bpl_match:
-            self.matches['BPLNumber'] = bpl_match.group(1)
+            validation.matches['BPLNumber'] = bpl_match.group(1)
             
         # Extract family size
-        family_match = re.search(r'FAMILY\s+(?:SIZE|MEMBERS)[\s:]+(\d+)', self.extracted_text)
+        family_match = search(r'FAMILY\s+(?:SIZE|MEMBERS)[\s:]+(\d+)', validation.extracted_text)
         if family_match:
-            self.matches['FamilySize'] = family_match.group(1)
+            validation.matches['FamilySize'] = family_match.group(1)
             
-        self.confidence_score = self.calculate_confidence(len(required_patterns))
-        return self._generate_response("BPL Certificate")
+        validation.confidence_score = self.calculate_confidence(len(self.required_patterns), validation)
+        return self._generate_response("BPL Certificate", validation)
 
 class DomicileCertificateValidator(BaseDocumentValidator):
-    def validate(self, text: str) -> Dict[str, Any]:
-        self.extracted_text = text.upper()
-        self.validation_errors = []
-        self.matches = {}
-        
-        required_patterns = {
-            "Certificate Title": r"""
-                (?:
-                    DOMICILE\s+CERTIFICATE|
-                    RESIDENTIAL\s+CERTIFICATE|
-                    अधिवास\s+प्रमाण\s+पत्र
-                )
-            """,
-            "Residence Period": r"""
-                (?:
-                    RESIDING\s+SINCE[\s:]+\d{4}|
-                    RESIDENT\s+(?:FOR|SINCE)[\s:]+\d+\s+YEARS?
-                )
-            """,
-            "Authority": r"""
-                (?:
-                    COLLECTOR|
-                    TEHSILDAR|
-                    SDM|
-                    REVENUE\s+OFFICER
-                )
-            """
-        }
+    document_identifiers = [
+        r'DOMICILE\s*CERTIFICATE',
+        r'RESIDENTIAL\s*CERTIFICATE',
+        r'अधिवास\s*प्रमाण\s*पत्र',
+        r'RESIDING\s*SINCE',
+        r'PERMANENT\s*RESIDENT'
+    ]
+    required_patterns = PatternSet({
+        "Certificate Title": r"""
+            (?:
+                DOMICILE\s+CERTIFICATE|
+                RESIDENTIAL\s+CERTIFICATE|
+                अधिवास\s+प्रमाण\s+पत्र
+            )
+        """,
+        "Residence Period": r"""
+            (?:
+                RESIDING\s+SINCE[\s:]+\d{4}|
+                RESIDENT\s+(?:FOR|SINCE)[\s:]+\d+\s+YEARS?
+            )
+        """,
+        "Authority": r"""
+            (?:
+                COLLECTOR|
+                TEHSILDAR|
+                SDM|
+                REVENUE\s+OFFICER
+            )
+        """
+    }, re.VERBOSE | re.IGNORECASE)
+
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
+        validation = ValidationResult(NormalizedText.of(text).upper)
         
-        self.validate_text_presence(required_patterns)
+        self.validate_text_presence(self.required_patterns, validation)
         
         # Extract state/UT
-        state_match = re.search(r'(?:STATE|UT)\s+OF\s+([A-Z\s]+)', self.extracted_text)
+        state_match = search(r'(?:STATE|UT)\s+OF\s+([A-Z\s]+)', validation.extracted_text)
         if state_match:
-            self.matches['State'] = state_match.group(1).strip()
+            validation.matches['State'] = state_match.group(1).strip()
             
-        self.confidence_score = self.calculate_confidence(len(required_patterns))
-        return self._generate_response("Domicile Certificate")
+        validation.confidence_score = self.calculate_confidence(len(self.required_patterns), validation)
+        return self._generate_response("Domicile Certificate", validation)
 
 class BirthCertificateValidator(BaseDocumentValidator):
     def __init__(self):
@@ -1220,14 +1271,14 @@ class BirthCertificateValidator(BaseDocumentValidator):
                 r'NAGAR\s*NIGAM'
             ]
         }
+        self.matchers = self.compile_identifiers(self.key_identifiers)
+        self.document_identifiers = self.key_identifiers['certificate_identifiers']
 
-    def validate(self, text: str) -> Dict[str, Any]:
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         try:
-            self.extracted_text = text.upper()
-            self.matches = {}
-            self.validation_errors = []
+            validation = ValidationResult(NormalizedText.of(text).upper)
             
-            logger.debug(f"Validating Birth Certificate text: {self.extracted_text}")
+            logger.debug(f"Validating Birth Certificate text ({len(validation.extracted_text)} characters)")
             
             # Initialize scoring
             matches_found = {
@@ -1238,35 +1289,30 @@ class BirthCertificateValidator(BaseDocumentValidator):
             }
 
             # Check certificate identifiers
-            for pattern in self.key_identifiers['certificate_identifiers']:
-                if re.search(pattern, self.extracted_text):
-                    matches_found['certificate_identifiers'] += 0.25
-                    logger.debug(f"Found certificate identifier: {pattern}")
+            for hit in self.matchers['certificate_identifiers'].scan(validation.extracted_text):
+                matches_found['certificate_identifiers'] += 0.25
+                logger.debug(f"Found certificate identifier: {hit.pattern}")
 
             # Check registration numbers
-            for pattern in self.key_identifiers['registration_numbers']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    reg_number = match.group(1) if '(' in pattern else match.group()
-                    self.matches['registration_number'] = reg_number
-                    matches_found['registration'] = 1
-                    logger.debug(f"Found registration number: {reg_number}")
-                    break
+            match = self.matchers['registration_numbers'].first(validation.extracted_text)
+            if match:
+                reg_number = match.group(1) if '(' in match.pattern else match.group()
+                validation.matches['registration_number'] = reg_number
+                matches_found['registration'] = 1
+                logger.debug(f"Found registration number: {reg_number}")
 
             # Check dates
-            for pattern in self.key_identifiers['dates']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['date_of_birth'] = match.group(1)
-                    matches_found['date_of_birth'] = 1
-                    logger.debug(f"Found date of birth: {match.group(1)}")
-                    break
+            match = self.matchers['dates'].first(validation.extracted_text)
+            if match:
+                validation.matches['date_of_birth'] = match.group(1)
+                matches_found['date_of_birth'] = 1
+                logger.debug(f"Found date of birth: {match.group(1)}")
 
             # Extract additional information
-            additional_info = self._extract_additional_info()
+            additional_info = self._extract_additional_info(validation.extracted_text)
             if additional_info:
                 matches_found['additional_info'] = len(additional_info) * 0.2
-                self.matches.update(additional_info)
+                validation.matches.update(additional_info)
 
             # Calculate weighted confidence score
             weights = {
@@ -1275,17 +1321,17 @@ class BirthCertificateValidator(BaseDocumentValidator):
                 'date_of_birth': 0.2,
                 'additional_info': 0.2
             }
-            self.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
+            validation.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
 
             # Determine validity with adjusted threshold
-            is_valid = (self.confidence_score >= 0.4)
+            is_valid = (validation.confidence_score >= 0.4)
 
             result = {
                 'documentType': 'Birth Certificate',
                 'isValid': is_valid,
-                'confidenceScore': self.confidence_score,
+                'confidenceScore': validation.confidence_score,
                 'matchedIdentifiers': matches_found,
-                'extractedData': self.matches,
+                'extractedData': validation.matches,
                 'validationDetails': {
                     'scores': matches_found,
                     'requiredMinimum': 0.4,
@@ -1307,36 +1353,36 @@ class BirthCertificateValidator(BaseDocumentValidator):
                 'error': str(e)
             }
 
-    def _extract_additional_info(self) -> Dict[str, str]:
+    def _extract_additional_info(self, text: str) -> Dict[str, str]:
         """Extract additional information from the Birth Certificate"""
         info = {}
         
         # Extract name
-        name_match = re.search(r'NAME\s*[:.]\s*([A-Z\s]+?)(?=\s+(?:GENDER|SEX|DATE|FATHER|MOTHER))', self.extracted_text)
+        name_match = search(r'NAME\s*[:.]\s*([A-Z\s]+?)(?=\s+(?:GENDER|SEX|DATE|FATHER|MOTHER))', text)
         if name_match:
             info['name'] = name_match.group(1).strip()
 
         # Extract gender
-        gender_match = re.search(r'(?:GENDER|SEX)\s*[:.]\s*([A-Z]+)', self.extracted_text)
+        gender_match = search(r'(?:GENDER|SEX)\s*[:.]\s*([A-Z]+)', text)
         if gender_match:
             info['gender'] = gender_match.group(1).strip()
 
         # Extract place of birth
-        place_match = re.search(r'PLACE\s*OF\s*BIRTH\s*[:.]\s*([A-Z0-9\s,/-]+?)(?=\s+(?:DATE|MOTHER|FATHER|ADDRESS))', self.extracted_text)
+        place_match = search(r'PLACE\s*OF\s*BIRTH\s*[:.]\s*([A-Z0-9\s,/-]+?)(?=\s+(?:DATE|MOTHER|FATHER|ADDRESS))', text)
         if place_match:
             info['place_of_birth'] = place_match.group(1).strip()
 
         # Extract parents' names
-        father_match = re.search(r"FATHER['S]*\s*NAME\s*[:.]\s*([A-Z\s]+?)(?=\s+(?:MOTHER|ADDRESS|DATE))", self.extracted_text)
+        father_match = search(r"FATHER['S]*\s*NAME\s*[:.]\s*([A-Z\s]+?)(?=\s+(?:MOTHER|ADDRESS|DATE))", text)
         if father_match:
             info['father_name'] = father_match.group(1).strip()
 
-        mother_match = re.search(r"MOTHER['S]*\s*NAME\s*[:.]\s*([A-Z\s]+?)(?=\s+(?:FATHER|ADDRESS|DATE))", self.extracted_text)
+        mother_match = search(r"MOTHER['S]*\s*NAME\s*[:.]\s*([A-Z\s]+?)(?=\s+(?:FATHER|ADDRESS|DATE))", text)
         if mother_match:
             info['mother_name'] = mother_match.group(1).strip()
 
         # Extract address
-        address_match = re.search(r'(?:PRESENT\s*)?ADDRESS\s*[:.]\s*([A-Z0-9\s,/-]+?)(?=\s+(?:DATE|PERMANENT|NOTE|ENSURE))', self.extracted_text)
+        address_match = search(r'(?:PRESENT\s*)?ADDRESS\s*[:.]\s*([A-Z0-9\s,/-]+?)(?=\s+(?:DATE|PERMANENT|NOTE|ENSURE))', text)
         if address_match:
             info['address'] = address_match.group(1).strip()
 
@@ -1370,14 +1416,14 @@ class MarriageCertificateValidator(BaseDocumentValidator):
                 r'DEPARTMENT\s*OF'
             ]
         }
+        self.matchers = self.compile_identifiers(self.key_identifiers)
+        self.document_identifiers = self.key_identifiers['certificate_identifiers']
 
-    def validate(self, text: str) -> Dict[str, Any]:
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         try:
-            self.extracted_text = text.upper()
-            self.matches = {}
-            self.validation_errors = []
+            validation = ValidationResult(NormalizedText.of(text).upper)
             
-            logger.debug(f"Validating Marriage Certificate text: {self.extracted_text}")
+            logger.debug(f"Validating Marriage Certificate text ({len(validation.extracted_text)} characters)")
             
             # Initialize scoring
             matches_found = {
@@ -1388,39 +1434,34 @@ class MarriageCertificateValidator(BaseDocumentValidator):
             }
 
             # Check certificate identifiers
-            for pattern in self.key_identifiers['certificate_identifiers']:
-                if re.search(pattern, self.extracted_text):
-                    matches_found['certificate_identifiers'] += 0.25
-                    logger.debug(f"Found certificate identifier: {pattern}")
+            for hit in self.matchers['certificate_identifiers'].scan(validation.extracted_text):
+                matches_found['certificate_identifiers'] += 0.25
+                logger.debug(f"Found certificate identifier: {hit.pattern}")
 
             # Check registration numbers
-            for pattern in self.key_identifiers['registration_numbers']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    reg_number = match.group(1) if '(' in pattern else match.group()
-                    self.matches['registration_number'] = reg_number
-                    matches_found['registration'] = 1
-                    logger.debug(f"Found registration number: {reg_number}")
-                    break
+            match = self.matchers['registration_numbers'].first(validation.extracted_text)
+            if match:
+                reg_number = match.group(1) if '(' in match.pattern else match.group()
+                validation.matches['registration_number'] = reg_number
+                matches_found['registration'] = 1
+                logger.debug(f"Found registration number: {reg_number}")
 
             # Check marriage date
-            for pattern in self.key_identifiers['dates']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['marriage_date'] = match.group(1)
-                    matches_found['marriage_date'] = 1
-                    logger.debug(f"Found marriage date: {match.group(1)}")
-                    break
+            match = self.matchers['dates'].first(validation.extracted_text)
+            if match:
+                validation.matches['marriage_date'] = match.group(1)
+                matches_found['marriage_date'] = 1
+                logger.debug(f"Found marriage date: {match.group(1)}")
 
             # Extract spouse details and additional information
-            spouse_info = self._extract_spouse_details()
+            spouse_info = self._extract_spouse_details(validation.extracted_text)
             if spouse_info:
                 matches_found['spouse_details'] = len(spouse_info) * 0.25
-                self.matches.update(spouse_info)
+                validation.matches.update(spouse_info)
 
-            additional_info = self._extract_additional_info()
+            additional_info = self._extract_additional_info(validation.extracted_text)
             if additional_info:
-                self.matches.update(additional_info)
+                validation.matches.update(additional_info)
 
             # Calculate weighted confidence score
             weights = {
@@ -1429,17 +1470,17 @@ class MarriageCertificateValidator(BaseDocumentValidator):
                 'marriage_date': 0.2,
                 'spouse_details': 0.2
             }
-            self.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
+            validation.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
 
             # Determine validity with adjusted threshold
-            is_valid = (self.confidence_score >= 0.4)
+            is_valid = (validation.confidence_score >= 0.4)
 
             result = {
                 'documentType': 'Marriage Certificate',
                 'isValid': is_valid,
-                'confidenceScore': self.confidence_score,
+                'confidenceScore': validation.confidence_score,
                 'matchedIdentifiers': matches_found,
-                'extractedData': self.matches,
+                'extractedData': validation.matches,
                 'validationDetails': {
                     'scores': matches_found,
                     'requiredMinimum': 0.4,
@@ -1462,7 +1503,7 @@ class MarriageCertificateValidator(BaseDocumentValidator):
                 'error': str(e)
             }
 
-    def _extract_spouse_details(self) -> Dict[str, str]:
+    def _extract_spouse_details(self, text: str) -> Dict[str, str]:
         """Extract spouse details from the certificate"""
         info = {}
         
@@ -1472,7 +1513,7 @@ class MarriageCertificateValidator(BaseDocumentValidator):
             r'NAME\s*OF\s*HUSBAND\s*(?:MR\.?\s*)?([A-Z\s]+?)(?=\s+(?:RESIDING|AGE|DATE|WIFE|ADDRESS))'
         ]
         for pattern in husband_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = search(pattern, text)
             if match:
                 info['husband_name'] = match.group(1).strip()
                 break
@@ -1483,24 +1524,24 @@ class MarriageCertificateValidator(BaseDocumentValidator):
             r'NAME\s*OF\s*WIFE\s*(?:MS\.?\s*)?([A-Z\s]+?)(?=\s+(?:RESIDING|AGE|DATE|ADDRESS))'
         ]
         for pattern in wife_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = search(pattern, text)
             if match:
                 info['wife_name'] = match.group(1).strip()
                 break
 
         return info
 
-    def _extract_additional_info(self) -> Dict[str, str]:
+    def _extract_additional_info(self, text: str) -> Dict[str, str]:
         """Extract additional information from the certificate"""
         info = {}
         
         # Extract place of marriage
-        place_match = re.search(r'PLACE\s*OF\s*MARRIAGE[:\s]+([A-Z0-9\s,/-]+?)(?=\s+(?:DATE|IS|REGISTERED|ON))', self.extracted_text)
+        place_match = search(r'PLACE\s*OF\s*MARRIAGE[:\s]+([A-Z0-9\s,/-]+?)(?=\s+(?:DATE|IS|REGISTERED|ON))', text)
         if place_match:
             info['place_of_marriage'] = place_match.group(1).strip()
 
         # Extract registration date
-        reg_date_match = re.search(r'(?:REGISTERED|REGISTRATION)\s*(?:ON|DATE)[:\s]+(\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})', self.extracted_text)
+        reg_date_match = search(r'(?:REGISTERED|REGISTRATION)\s*(?:ON|DATE)[:\s]+(\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})', text)
         if reg_date_match:
             info['registration_date'] = reg_date_match.group(1)
 
@@ -1510,7 +1551,7 @@ class MarriageCertificateValidator(BaseDocumentValidator):
             r'ADDRESS[:\s]+([A-Z0-9\s,/-]+?)(?=\s+(?:DATE|NAME|SOLEMNIZED|REGISTERED))'
         ]
         for pattern in address_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = search(pattern, text)
             if match:
                 info['address'] = match.group(1).strip()
                 break
@@ -1518,6 +1559,12 @@ class MarriageCertificateValidator(BaseDocumentValidator):
         return info
     
 class BankPassbookValidator(BaseDocumentValidator):
+    document_identifiers = [
+        r'PASS\s*BOOK',
+        r'पासबुक',
+        r'SAVINGS?\s*(?:BANK\s*)?ACCOUNT',
+        r'\bIFSC\b'
+    ]
     def __init__(self):
         super().__init__()
         self.key_identifiers = {
@@ -1543,14 +1590,13 @@ class BankPassbookValidator(BaseDocumentValidator):
                 r'BRANCH\s+ADDRESS[\s:]+([A-Z0-9\s,/-]+?)(?=\s+(?:PIN|PHONE|IFSC))'
             ]
         }
+        self.matchers = self.compile_identifiers(self.key_identifiers)
 
-    def validate(self, text: str) -> Dict[str, Any]:
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         try:
-            self.extracted_text = text.upper()
-            self.matches = {}
-            self.validation_errors = []
+            validation = ValidationResult(NormalizedText.of(text).upper)
             
-            logger.debug(f"Validating Bank Passbook text: {self.extracted_text}")
+            logger.debug(f"Validating Bank Passbook text ({len(validation.extracted_text)} characters)")
             
             # Initialize scoring
             matches_found = {
@@ -1561,40 +1607,34 @@ class BankPassbookValidator(BaseDocumentValidator):
             }
 
             # Check bank name
-            for pattern in self.key_identifiers['bank_names']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    bank_name = match.group(1) if '(' in pattern else match.group()
-                    self.matches['bank_name'] = bank_name.strip()
-                    matches_found['bank_name'] = 1
-                    logger.debug(f"Found bank name: {bank_name}")
-                    break
+            match = self.matchers['bank_names'].first(validation.extracted_text)
+            if match:
+                bank_name = match.group(1) if '(' in match.pattern else match.group()
+                validation.matches['bank_name'] = bank_name.strip()
+                matches_found['bank_name'] = 1
+                logger.debug(f"Found bank name: {bank_name}")
 
             # Check account number
-            for pattern in self.key_identifiers['account_numbers']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    account_number = match.group(1) if '(' in pattern else match.group()
-                    self.matches['account_number'] = re.sub(r'\s+', '', account_number)
-                    matches_found['account_number'] = 1
-                    logger.debug(f"Found account number: {account_number}")
-                    break
+            match = self.matchers['account_numbers'].first(validation.extracted_text)
+            if match:
+                account_number = match.group(1) if '(' in match.pattern else match.group()
+                validation.matches['account_number'] = re.sub(r'\s+', '', account_number)
+                matches_found['account_number'] = 1
+                logger.debug(f"Found account number: {account_number}")
 
             # Check IFSC code
-            for pattern in self.key_identifiers['ifsc_codes']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    ifsc_code = match.group(1) if '(' in pattern else match.group()
-                    self.matches['ifsc_code'] = ifsc_code
-                    matches_found['ifsc_code'] = 1
-                    logger.debug(f"Found IFSC code: {ifsc_code}")
-                    break
+            match = self.matchers['ifsc_codes'].first(validation.extracted_text)
+            if match:
+                ifsc_code = match.group(1) if '(' in match.pattern else match.group()
+                validation.matches['ifsc_code'] = ifsc_code
+                matches_found['ifsc_code'] = 1
+                logger.debug(f"Found IFSC code: {ifsc_code}")
 
             # Extract additional information
-            additional_info = self._extract_additional_info()
+            additional_info = self._extract_additional_info(validation.extracted_text)
             if additional_info:
                 matches_found['additional_info'] = len(additional_info) * 0.2
-                self.matches.update(additional_info)
+                validation.matches.update(additional_info)
 
             # Calculate weighted confidence score
             weights = {
@@ -1603,17 +1643,17 @@ class BankPassbookValidator(BaseDocumentValidator):
                 'ifsc_code': 0.2,
                 'additional_info': 0.2
             }
-            self.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
+            validation.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
 
             # Determine validity with adjusted threshold
-            is_valid = (self.confidence_score >= 0.4)
+            is_valid = (validation.confidence_score >= 0.4)
 
             result = {
                 'documentType': 'Bank Passbook',
                 'isValid': is_valid,
-                'confidenceScore': self.confidence_score,
+                'confidenceScore': validation.confidence_score,
                 'matchedIdentifiers': matches_found,
-                'extractedData': self.matches,
+                'extractedData': validation.matches,
                 'validationDetails': {
                     'scores': matches_found,
                     'requiredMinimum': 0.4,
@@ -1635,7 +1675,7 @@ class BankPassbookValidator(BaseDocumentValidator):
                 'error': str(e)
             }
 
-    def _extract_additional_info(self) -> Dict[str, str]:
+    def _extract_additional_info(self, text: str) -> Dict[str, str]:
         """Extract additional information from the passbook"""
         info = {}
         
@@ -1645,35 +1685,33 @@ class BankPassbookValidator(BaseDocumentValidator):
             r'(?:ACCOUNT\s+HOLDER)[:\s]+([A-Z\s]+?)(?=\s+(?:BRANCH|ADDRESS|OCCUPATION|S/O|W/O))'
         ]
         for pattern in name_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = search(pattern, text)
             if match:
                 info['account_holder_name'] = match.group(1).strip()
                 break
 
         # Extract branch details
-        for pattern in self.key_identifiers['branch_details']:
-            match = re.search(pattern, self.extracted_text)
-            if match:
-                info['branch'] = match.group(1).strip()
-                break
+        match = self.matchers['branch_details'].first(text)
+        if match:
+            info['branch'] = match.group(1).strip()
 
         # Extract address
-        address_match = re.search(r'ADDRESS[:\s]+([A-Z0-9\s,/-]+?)(?=\s+(?:PIN|PHONE|BRANCH|IFSC))', self.extracted_text)
+        address_match = search(r'ADDRESS[:\s]+([A-Z0-9\s,/-]+?)(?=\s+(?:PIN|PHONE|BRANCH|IFSC))', text)
         if address_match:
             info['address'] = address_match.group(1).strip()
 
         # Extract PIN code
-        pin_match = re.search(r'PIN(?:\s+CODE)?[:\s]+(\d{6})', self.extracted_text)
+        pin_match = search(r'PIN(?:\s+CODE)?[:\s]+(\d{6})', text)
         if pin_match:
             info['pin_code'] = pin_match.group(1)
 
         # Extract account type
-        type_match = re.search(r'(?:ACCOUNT\s+TYPE|A/C\s+TYPE)[:\s]+([A-Z\s]+?)(?=\s+(?:BRANCH|ADDRESS|NAME))', self.extracted_text)
+        type_match = search(r'(?:ACCOUNT\s+TYPE|A/C\s+TYPE)[:\s]+([A-Z\s]+?)(?=\s+(?:BRANCH|ADDRESS|NAME))', text)
         if type_match:
             info['account_type'] = type_match.group(1).strip()
 
         # Extract phone number
-        phone_match = re.search(r'(?:PHONE|MOBILE)[:\s]+(\d[\d\s/-]*\d)', self.extracted_text)
+        phone_match = search(r'(?:PHONE|MOBILE)[:\s]+(\d[\d\s/-]*\d)', text)
         if phone_match:
             info['phone'] = re.sub(r'\s+', '', phone_match.group(1))
 
@@ -1692,10 +1730,13 @@ class EmploymentCertificateValidator(BaseDocumentValidator):
                 r'WORK\s+CERTIFICATE',
                 r'नियुक्ति\s+प्रमाण\s+पत्र'
             ],
+            # Captures are capped at 100 characters (and the Income Certificate
+            # gaps at 200) so a missing terminator on long OCR text costs a
+            # bounded amount of backtracking instead of a scan to the end
             'employee_patterns': [
-                r'THIS\s+IS\s+TO\s+CERTIFY\s+THAT\s+([A-Z][A-Z\s.-]+)(?:\s+HAS\s+BEEN|\s+IS\s+)',
-                r'CERTIFY\s+THAT\s+([A-Z][A-Z\s.-]+)(?:\s+HAS\s+BEEN|\s+IS\s+)',
-                r'THAT\s+([A-Z][A-Z\s.-]+)\s+(?:IS|HAS\s+BEEN)\s+EMPLOYED'
+                r'THIS\s+IS\s+TO\s+CERTIFY\s+THAT\s+([A-Z][A-Z\s.-]{1,100})(?:\s+HAS\s+BEEN|\s+IS\s+)',
+                r'CERTIFY\s+THAT\s+([A-Z][A-Z\s.-]{1,100})(?:\s+HAS\s+BEEN|\s+IS\s+)',
+                r'THAT\s+([A-Z][A-Z\s.-]{1,100})\s+(?:IS|HAS\s+BEEN)\s+EMPLOYED'
             ],
             'designation_patterns': [
                 r'AS\s+([A-Z][A-Z\s]+?)(?:\s+(?:FROM|SINCE|IN|AT|WITH|DEPARTMENT|FOR))',
@@ -1709,14 +1750,14 @@ class EmploymentCertificateValidator(BaseDocumentValidator):
                 r'DATED?\s+(?:THIS\s+)?(\d{1,2}(?:ST|ND|RD|TH)?\s+(?:DAY\s+)?OF\s+[A-Z]+\s+\d{4})'
             ]
         }
+        self.matchers = self.compile_identifiers(self.key_identifiers)
+        self.document_identifiers = self.key_identifiers['certificate_titles']
 
-    def validate(self, text: str) -> Dict[str, Any]:
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         try:
-            self.extracted_text = text.upper()
-            self.matches = {}
-            self.validation_errors = []
+            validation = ValidationResult(NormalizedText.of(text).upper)
             
-            logger.debug(f"Validating Employment Certificate text: {self.extracted_text}")
+            logger.debug(f"Validating Employment Certificate text ({len(validation.extracted_text)} characters)")
             
             # Initialize scoring
             matches_found = {
@@ -1727,38 +1768,31 @@ class EmploymentCertificateValidator(BaseDocumentValidator):
             }
 
             # Check certificate title
-            for pattern in self.key_identifiers['certificate_titles']:
-                if re.search(pattern, self.extracted_text):
-                    matches_found['certificate_title'] = 1
-                    logger.debug(f"Found certificate title: {pattern}")
-                    break
+            hit = self.matchers['certificate_titles'].first(validation.extracted_text)
+            if hit:
+                matches_found['certificate_title'] = 1
+                logger.debug(f"Found certificate title: {hit.pattern}")
 
             # Extract employee name
-            for pattern in self.key_identifiers['employee_patterns']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['employee_name'] = match.group(1).strip()
-                    matches_found['employee_name'] = 1
-                    logger.debug(f"Found employee name: {self.matches['employee_name']}")
-                    break
+            match = self.matchers['employee_patterns'].first(validation.extracted_text)
+            if match:
+                validation.matches['employee_name'] = match.group(1).strip()
+                matches_found['employee_name'] = 1
+                logger.debug(f"Found employee name: {validation.matches['employee_name']}")
 
             # Extract designation
-            for pattern in self.key_identifiers['designation_patterns']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['designation'] = match.group(1).strip()
-                    matches_found['designation'] = 1
-                    logger.debug(f"Found designation: {self.matches['designation']}")
-                    break
+            match = self.matchers['designation_patterns'].first(validation.extracted_text)
+            if match:
+                validation.matches['designation'] = match.group(1).strip()
+                matches_found['designation'] = 1
+                logger.debug(f"Found designation: {validation.matches['designation']}")
 
             # Extract dates
-            for pattern in self.key_identifiers['date_patterns']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['date'] = match.group(1).strip()
-                    matches_found['dates'] = 1
-                    logger.debug(f"Found date: {self.matches['date']}")
-                    break
+            match = self.matchers['date_patterns'].first(validation.extracted_text)
+            if match:
+                validation.matches['date'] = match.group(1).strip()
+                matches_found['dates'] = 1
+                logger.debug(f"Found date: {validation.matches['date']}")
 
             # Calculate confidence score with adjusted weights
             weights = {
@@ -1767,17 +1801,17 @@ class EmploymentCertificateValidator(BaseDocumentValidator):
                 'designation': 0.2,
                 'dates': 0.1
             }
-            self.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
+            validation.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
 
             # Adjust validation threshold
-            is_valid = (self.confidence_score >= 0.3)  # Lowered threshold
+            is_valid = (validation.confidence_score >= 0.3)  # Lowered threshold
 
             result = {
                 'documentType': 'Employment Certificate',
                 'isValid': is_valid,
-                'confidenceScore': self.confidence_score,
+                'confidenceScore': validation.confidence_score,
                 'matchedIdentifiers': matches_found,
-                'extractedData': self.matches,
+                'extractedData': validation.matches,
                 'validationDetails': {
                     'scores': matches_found,
                     'requiredMinimum': 0.3,
@@ -1819,24 +1853,25 @@ class EducationalCertificateValidator(BaseDocumentValidator):
                 r'([A-Z][A-Z\s.,&]+(?:UNIVERSITY|BOARD|INSTITUTE|COLLEGE))'
             ],
             'student_patterns': [
-                r'THIS\s+IS\s+TO\s+CERTIFY\s+THAT\s+([A-Z][A-Z\s.-]+)(?:\s+S/O|\s+D/O|\s+HAS\s+|,)',
-                r'(?:MR\.|MS\.|SHRI|SMT\.)\s*([A-Z][A-Z\s.-]+)(?:\s+S/O|\s+D/O|\s+HAS\s+|,)',
-                r'CERTIFY\s+THAT\s+([A-Z][A-Z\s.-]+)(?:\s+S/O|\s+D/O|\s+HAS\s+|,)'
+                r'THIS\s+IS\s+TO\s+CERTIFY\s+THAT\s+([A-Z][A-Z\s.-]{1,100})(?:\s+S/O|\s+D/O|\s+HAS\s+|,)',
+                r'(?:MR\.|MS\.|SHRI|SMT\.)\s*([A-Z][A-Z\s.-]{1,100})(?:\s+S/O|\s+D/O|\s+HAS\s+|,)',
+                r'CERTIFY\s+THAT\s+([A-Z][A-Z\s.-]{1,100})(?:\s+S/O|\s+D/O|\s+HAS\s+|,)'
             ],
             'course_patterns': [
                 r'(?:COURSE|PROGRAM(?:ME)?)[:\s]+([A-Z][A-Z\s.-]+)',
-                r'AWARDED\s+THE\s+([A-Z][A-Z\s.-]+?)(?:\s+COURSE|\s+CERTIFICATE|\s+DEGREE)',
-                r'COMPLETED\s+(?:THE\s+)?([A-Z][A-Z\s.-]+?)(?:\s+COURSE|\s+CERTIFICATE|\s+PROGRAM)'
+                r'AWARDED\s+THE\s+([A-Z][A-Z\s.-]{1,100}?)(?:\s+COURSE|\s+CERTIFICATE|\s+DEGREE)',
+                r'COMPLETED\s+(?:THE\s+)?([A-Z][A-Z\s.-]{1,100}?)(?:\s+COURSE|\s+CERTIFICATE|\s+PROGRAM)'
             ]
         }
+        self.matchers = self.compile_identifiers(self.key_identifiers)
+        # The bare 'CERTIFICATE' type says nothing about which certificate it is
+        self.document_identifiers = self.key_identifiers['certificate_types'][1:]
 
-    def validate(self, text: str) -> Dict[str, Any]:
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
         try:
-            self.extracted_text = text.upper()
-            self.matches = {}
-            self.validation_errors = []
+            validation = ValidationResult(NormalizedText.of(text).upper)
             
-            logger.debug(f"Validating Educational Certificate text: {self.extracted_text}")
+            logger.debug(f"Validating Educational Certificate text ({len(validation.extracted_text)} characters)")
             
             # Initialize scoring
             matches_found = {
@@ -1848,44 +1883,37 @@ class EducationalCertificateValidator(BaseDocumentValidator):
             }
 
             # Check certificate type
-            for pattern in self.key_identifiers['certificate_types']:
-                if re.search(pattern, self.extracted_text):
-                    matches_found['certificate_type'] = 1
-                    logger.debug(f"Found certificate type: {pattern}")
-                    break
+            hit = self.matchers['certificate_types'].first(validation.extracted_text)
+            if hit:
+                matches_found['certificate_type'] = 1
+                logger.debug(f"Found certificate type: {hit.pattern}")
 
             # Extract institution details
-            for pattern in self.key_identifiers['institution_patterns']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['institution'] = match.group(1).strip()
-                    matches_found['institution'] = 1
-                    logger.debug(f"Found institution: {self.matches['institution']}")
-                    break
+            match = self.matchers['institution_patterns'].first(validation.extracted_text)
+            if match:
+                validation.matches['institution'] = match.group(1).strip()
+                matches_found['institution'] = 1
+                logger.debug(f"Found institution: {validation.matches['institution']}")
 
             # Extract student details
-            for pattern in self.key_identifiers['student_patterns']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['student_name'] = match.group(1).strip()
-                    matches_found['student_details'] = 1
-                    logger.debug(f"Found student name: {self.matches['student_name']}")
-                    break
+            match = self.matchers['student_patterns'].first(validation.extracted_text)
+            if match:
+                validation.matches['student_name'] = match.group(1).strip()
+                matches_found['student_details'] = 1
+                logger.debug(f"Found student name: {validation.matches['student_name']}")
 
             # Extract course details
-            for pattern in self.key_identifiers['course_patterns']:
-                match = re.search(pattern, self.extracted_text)
-                if match:
-                    self.matches['course'] = match.group(1).strip()
-                    matches_found['course_details'] = 1
-                    logger.debug(f"Found course: {self.matches['course']}")
-                    break
+            match = self.matchers['course_patterns'].first(validation.extracted_text)
+            if match:
+                validation.matches['course'] = match.group(1).strip()
+                matches_found['course_details'] = 1
+                logger.debug(f"Found course: {validation.matches['course']}")
 
             # Extract additional information
-            additional_info = self._extract_additional_info()
+            additional_info = self._extract_additional_info(validation.extracted_text)
             if additional_info:
                 matches_found['additional_info'] = len(additional_info) * 0.2
-                self.matches.update(additional_info)
+                validation.matches.update(additional_info)
 
             # Calculate confidence score with adjusted weights
             weights = {
@@ -1895,17 +1923,17 @@ class EducationalCertificateValidator(BaseDocumentValidator):
                 'course_details': 0.2,
                 'additional_info': 0.1
             }
-            self.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
+            validation.confidence_score = sum(matches_found[k] * weights[k] for k in matches_found)
 
             # Adjust validation threshold
-            is_valid = (self.confidence_score >= 0.3)  # Lowered threshold
+            is_valid = (validation.confidence_score >= 0.3)  # Lowered threshold
 
             result = {
                 'documentType': 'Educational Certificate',
                 'isValid': is_valid,
-                'confidenceScore': self.confidence_score,
+                'confidenceScore': validation.confidence_score,
                 'matchedIdentifiers': matches_found,
-                'extractedData': self.matches,
+                'extractedData': validation.matches,
                 'validationDetails': {
                     'scores': matches_found,
                     'requiredMinimum': 0.3,
@@ -1928,7 +1956,7 @@ class EducationalCertificateValidator(BaseDocumentValidator):
                 'error': str(e)
             }
 
-    def _extract_additional_info(self) -> Dict[str, str]:
+    def _extract_additional_info(self, text: str) -> Dict[str, str]:
         """Extract additional information from the certificate"""
         info = {}
         
@@ -1940,7 +1968,7 @@ class EducationalCertificateValidator(BaseDocumentValidator):
             r'PASSED\s+WITH\s+([A-Z\s]+(?:GRADE|CLASS|DIVISION))'
         ]
         for pattern in grade_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = search(pattern, text)
             if match:
                 info['grade'] = match.group(1).strip()
                 break
@@ -1952,7 +1980,7 @@ class EducationalCertificateValidator(BaseDocumentValidator):
             r'REF(?:ERENCE)?\s+(?:NO|NUMBER)[:\s]+([A-Z0-9-]+)'
         ]
         for pattern in cert_num_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = search(pattern, text)
             if match:
                 info['certificate_number'] = match.group(1).strip()
                 break
@@ -1964,78 +1992,83 @@ class EducationalCertificateValidator(BaseDocumentValidator):
             r'DATE[:\s]+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})'
         ]
         for pattern in date_patterns:
-            match = re.search(pattern, self.extracted_text)
+            match = search(pattern, text)
             if match:
                 info['issue_date'] = match.group(1).strip()
                 break
 
         # Extract duration
-        duration_match = re.search(r'(?:DURATION|PERIOD)[:\s]+(\d+\s+(?:MONTHS?|YEARS?))', self.extracted_text)
+        duration_match = search(r'(?:DURATION|PERIOD)[:\s]+(\d+\s+(?:MONTHS?|YEARS?))', text)
         if duration_match:
             info['duration'] = duration_match.group(1).strip()
 
         return info
     
 class PropertyDocumentValidator(BaseDocumentValidator):
-    def validate(self, text: str) -> Dict[str, Any]:
-        self.extracted_text = text.upper()
-        self.validation_errors = []
-        self.matches = {}
-        
-        required_patterns = {
-            "Document Type": r"""
-                (?:
-                    SALE\s+DEED|
-                    LEASE\s+DEED|
-                    PROPERTY\s+CARD|
-                    7/12\s+EXTRACT|
-                    TITLE\s+DEED|
-                    CONVEYANCE\s+DEED
-                )
-            """,
-            "Property Details": r"""
-                (?:
-                    SURVEY\s+NO[\s.:]+[\w\d/\-]+|
-                    PLOT\s+NO[\s.:]+[\w\d/\-]+|
-                    FLAT\s+NO[\s.:]+[\w\d/\-]+|
-                    PROPERTY\s+ID[\s.:]+[\w\d/\-]+
-                )
-            """,
-            "Registration": r"""
-                (?:
-                    REGISTRATION\s+NO[\s.:]+[\w\d/\-]+|
-                    DOCUMENT\s+NO[\s.:]+[\w\d/\-]+|
-                    INDEX\s+(?:NO|NUMBER)[\s.:]+[\w\d/\-]+
-                )
-            """,
-            "Location": r"""
-                (?:
-                    LOCATED\s+AT[\s.:]+[A-Z0-9\s,/\-]+|
-                    ADDRESS[\s.:]+[A-Z0-9\s,/\-]+|
-                    SITUATED\s+AT[\s.:]+[A-Z0-9\s,/\-]+
-                )
-            """
-        }
+    document_identifiers = [
+        r'(?:SALE|LEASE|TITLE|CONVEYANCE)\s*DEED',
+        r'PROPERTY\s*CARD',
+        r'7/12\s*EXTRACT',
+        r'SURVEY\s*NO',
+        r'SUB[-\s]*REGISTRAR'
+    ]
+    required_patterns = PatternSet({
+        "Document Type": r"""
+            (?:
+                SALE\s+DEED|
+                LEASE\s+DEED|
+                PROPERTY\s+CARD|
+                7/12\s+EXTRACT|
+                TITLE\s+DEED|
+                CONVEYANCE\s+DEED
+            )
+        """,
+        "Property Details": r"""
+            (?:
+                SURVEY\s+NO[\s.:]+[\w\d/\-]+|
+                PLOT\s+NO[\s.:]+[\w\d/\-]+|
+                FLAT\s+NO[\s.:]+[\w\d/\-]+|
+                PROPERTY\s+ID[\s.:]+[\w\d/\-]+
+            )
+        """,
+        "Registration": r"""
+            (?:
+                REGISTRATION\s+NO[\s.:]+[\w\d/\-]+|
+                DOCUMENT\s+NO[\s.:]+[\w\d/\-]+|
+                INDEX\s+(?:NO|NUMBER)[\s.:]+[\w\d/\-]+
+            )
+        """,
+        "Location": r"""
+            (?:
+                LOCATED\s+AT[\s.:]+[A-Z0-9\s,/\-]+|
+                ADDRESS[\s.:]+[A-Z0-9\s,/\-]+|
+                SITUATED\s+AT[\s.:]+[A-Z0-9\s,/\-]+
+            )
+        """
+    }, re.VERBOSE | re.IGNORECASE)
+
+    def validate(self, text: Union[str, NormalizedText]) -> Dict[str, Any]:
+        validation = ValidationResult(NormalizedText.of(text).upper)
         
-        self.validate_text_presence(required_patterns)
+        self.validate_text_presence(self.required_patterns, validation)
         
         # Extract property area if present
-        area_match = re.search(r'AREA[\s.:]+(\d+(?:\.\d+)?)\s*(SQ\.?\s*(?:FT|MTR|METER|YARD|M))', self.extracted_text)
+        area_match = search(r'AREA[\s.:]+(\d+(?:\.\d+)?)\s*(SQ\.?\s*(?:FT|MTR|METER|YARD|M))', validation.extracted_text)
         if area_match:
-            self.matches['PropertyArea'] = f"{area_match.group(1)} {area_match.group(2)}"
+            validation.matches['PropertyArea'] = f"{area_match.group(1)} {area_match.group(2)}"
             
         # Extract transaction value if present
-        value_match = re.search(r'(?:CONSIDERATION|VALUE|AMOUNT)[\s.:]+(?:RS\.?\s*)([\d,]+)', self.extracted_text)
+        value_match = search(r'(?:CONSIDERATION|VALUE|AMOUNT)[\s.:]+(?:RS\.?\s*)([\d,]+)', validation.extracted_text)
         if value_match:
-            self.matches['TransactionValue'] = f"Rs. {value_match.group(1)}"
+            validation.matches['TransactionValue'] = f"Rs. {value_match.group(1)}"
             
         # Extract date of execution
-        date_match = re.search(r'(?:EXECUTION\s+DATE|DATE\s+OF\s+DEED)[\s.:]+(\d{1,2}[-/]\d{1,2}[-/]\d{4})', self.extracted_text)
+        date_match = search(r'(?:EXECUTION\s+DATE|DATE\s+OF\s+DEED)[\s.:]+(\d{1,2}[-/]\d{1,2}[-/]\d{4})', validation.extracted_text)
         if date_match:
-            self.matches['ExecutionDate'] = date_match.group(1)
+            validation.matches['ExecutionDate'] = date_match.group(1)
             
-        self.confidence_score = self.calculate_confidence(len(required_patterns))
-        return self._generate_response("Property Document")
+        validation.confidence_score = self.calculate_confidence(len(self.required_patterns), validation)
+        return self._generate_response("Property Document", validation)
 
 # Update the validator mapping in your main application:
 DOCUMENT_VALIDATORS = {
@@ -0,0 +1,101 @@
+# fuzzy_matcher.py
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_MISSING = object()
+
+def lcs_length(peq: Dict[str, int], length: int, word: str) -> int:
+    """Longest common subsequence of a keyword and a word (bit-parallel).
+
+    peq maps each character of the keyword to the bit mask of its positions,
+    so the whole keyword is advanced with a few integer operations per
+    character of the word.
+    """
+    mask = (1 << length) - 1
+    row = mask
+    for ch in word:
+        matches = row & peq.get(ch, 0)
+        row = ((row + matches) | (row - matches)) & mask
+    return length - bin(row).count('1')
+
+def similarity(a: str, b: str) -> float:
+    """2 * LCS / (len(a) + len(b)), never lower than difflib's ratio() for the same pair"""
+    if not a and not b:
+        return 1.0
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    return 2 * lcs_length(peq, len(a), b) / (len(a) + len(b))
+
+class FuzzyMatcher:
+    """Finds words of a text that are within OCR-typo distance of a keyword vocabulary.
+
+    Words are compared with the LCS similarity 2 * LCS / (len(word) + len(keyword)),
+    the same measure difflib.SequenceMatcher.ratio() approximates, so any pair
+    difflib accepts is accepted here too. Keywords are bucketed by length and
+    only buckets that can reach the threshold are compared, each in a handful of
+    integer operations. Results are memoised per distinct word, which is what
+    makes long multi-page OCR output cheap: it repeats the same words a lot.
+    """
+
+    def __init__(self, keywords: Iterable[str], threshold: float = 0.8, cache_size: int = 4096):
+        self.threshold = threshold
+        self.keywords = list(dict.fromkeys(keywords))
+        self._exact = set(self.keywords)
+        self._buckets: Dict[int, List[Tuple[str, Dict[str, int]]]] = {}
+        for keyword in self.keywords:
+            peq: Dict[str, int] = {}
+            for i, ch in enumerate(keyword):
+                peq[ch] = peq.get(ch, 0) | (1 << i)
+            self._buckets.setdefault(len(keyword), []).append((keyword, peq))
+        self._cache: Dict[str, Optional[Tuple[str, float]]] = {}
+        self._cache_size = cache_size
+
+    def _candidate_lengths(self, word_length: int) -> List[int]:
+        # The LCS can't exceed the shorter string, which bounds the length difference
+        return [
+            length for length in self._buckets
+            if 2 * min(length, word_length) >= self.threshold * (length + word_length)
+        ]
+
+    def match_word(self, word: str) -> Optional[Tuple[str, float]]:
+        """Most similar keyword for a word and its similarity, if above the threshold"""
+        if word in self._exact:
+            return word, 1.0
+        # Validators are shared between threads: read the memo in one step
+        cached = self._cache.get(word, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
+        best = None
+        for length in self._candidate_lengths(len(word)):
+            total = length + len(word)
+            for keyword, peq in self._buckets[length]:
+                score = 2 * lcs_length(peq, length, word) / total
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (keyword, score)
+
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[word] = best
+        return best
+
+    def find(self, words: Sequence[str]) -> Optional[Tuple[str, str, float]]:
+        """First word that matches a keyword, as (word, keyword, similarity)"""
+        for word in dict.fromkeys(words):
+            match = self.match_word(word)
+            if match:
+                return (word,) + match
+        return None
+
+    def find_all(self, words: Sequence[str]) -> List[Tuple[str, str, float]]:
+        """Every distinct word that matches a keyword, in text order"""
+        found = []
+        for word in dict.fromkeys(words):
+            match = self.match_word(word)
+            if match:
+                found.append((word,) + match)
+        return found
+
+    def contains(self, text: str) -> bool:
+        """Whether any whitespace separated word of the text matches a keyword"""
+        return self.find(text.split()) is not None
@@ -0,0 +1,276 @@
+# jobs.py
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Jobs processed at the same time per process (their OCR still runs on the shared pool)
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+
+# Jobs allowed to wait for a worker before new submissions are turned away
+JOB_QUEUE_MAX = int(os.environ.get('JOB_QUEUE_MAX', 100))
+
+# Time a job has once it starts running, much longer than a request's since
+# nobody waits on the connection (0 disables)
+JOB_DEADLINE_SECONDS = float(os.environ.get('JOB_DEADLINE_SECONDS', 1800))
+
+# How long finished jobs (and their results) are kept
+JOB_TTL_SECONDS = int(os.environ.get('JOB_TTL_SECONDS', 3600))
+
+# Optional SQLite file shared by all web worker processes on the host, so any
+# of them can answer GET /jobs/<id> for a job another one is running
+JOBS_DB = os.environ.get('JOBS_DB')
+
+# Seconds between keep-alive comments on an idle event stream, and between
+# checks of the shared store when streaming a job run by another process
+JOB_EVENTS_KEEPALIVE = float(os.environ.get('JOB_EVENTS_KEEPALIVE', 15))
+JOB_EVENTS_POLL_INTERVAL = float(os.environ.get('JOB_EVENTS_POLL_INTERVAL', 0.5))
+
+FINISHED = ('done', 'failed')
+
+class JobQueueFull(Exception):
+    """Raised when JOB_QUEUE_MAX jobs are already waiting"""
+
+class Job:
+    """A queued verification and the progress events it has published"""
+
+    def __init__(self, document_type: Optional[str] = None, filename: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.status = 'queued'
+        self.document_type = document_type
+        self.filename = filename
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.progress: Dict[str, Any] = {"stage": "queued", "pagesTotal": None, "pagesDone": 0}
+        self.result: Optional[Dict[str, Any]] = None
+        self.status_code: Optional[int] = None
+        self.error: Optional[str] = None
+        self.events: List[Tuple[int, str, Dict[str, Any]]] = []
+        self._pages_done = set()
+        self._changed = threading.Condition()
+
+    def publish(self, event: str, data: Dict[str, Any]):
+        with self._changed:
+            self.events.append((len(self.events) + 1, event, data))
+            self._changed.notify_all()
+
+    def update(self, event: str, **data):
+        """Progress callback handed to the verification (see app.process_pdf)"""
+        if event == 'pages':
+            self.progress['pagesTotal'] = data['total']
+            self._pages_done.update(data.get('done', ()))
+        elif event == 'page':
+            self._pages_done.add(data['page'])
+        self.progress.update(stage=event if event != 'pages' else 'extract',
+                             pagesDone=len(self._pages_done))
+        if 'page' in data:
+            self.progress['page'] = data['page']
+        self.publish('progress', self.to_dict(include_result=False))
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        job = {
+            "jobId": self.id,
+            "status": self.status,
+            "documentType": self.document_type,
+            "filename": self.filename,
+            "createdAt": self.created,
+            "startedAt": self.started,
+            "finishedAt": self.finished,
+            "progress": dict(self.progress)
+        }
+        if include_result and self.status in FINISHED:
+            job["result"] = self.result
+            job["statusCode"] = self.status_code
+            if self.error:
+                job["error"] = self.error
+        return job
+
+class JobQueue:
+    """Runs verifications in background threads and keeps their results for a while.
+
+    Jobs live in this process; with JOBS_DB set their state is also written
+    to SQLite so other worker processes can report on them.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_queued: int = JOB_QUEUE_MAX,
+                 ttl: int = JOB_TTL_SECONDS, db_path: Optional[str] = JOBS_DB):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.db_path = db_path
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.db_path:
+            self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _save(self, job: Job):
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs (id, state, updated) VALUES (?, ?, ?)",
+                    (job.id, json.dumps(job.to_dict(), ensure_ascii=False, default=str), time.time())
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error writing job {job.id}: {str(e)}")
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if not self.db_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading job {job_id}: {str(e)}")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def _expire(self):
+        """Forget finished jobs older than the TTL"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for job_id in [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished is not None and job.finished < cutoff
+            ]:
+                del self._jobs[job_id]
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute("DELETE FROM jobs WHERE updated < ?", (cutoff,))
+            except sqlite3.Error as e:
+                logger.error(f"Error expiring jobs: {str(e)}")
+
+    def queued(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status == 'queued')
+
+    def submit(self, func: Callable[[str, Callable[..., None]], Tuple[Dict[str, Any], int]],
+               document_type: Optional[str] = None, filename: Optional[str] = None) -> Job:
+        """Queue func(job_id, progress) -> (result, status code); raises JobQueueFull"""
+        self._expire()
+        job = Job(document_type, filename)
+        with self._lock:
+            if sum(1 for j in self._jobs.values() if j.status == 'queued') >= self.max_queued:
+                raise JobQueueFull(f"{self.max_queued} jobs already queued")
+            self._jobs[job.id] = job
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+            executor = self._executor
+        self._save(job)
+        executor.submit(self._run, job, func)
+        return job
+
+    def _run(self, job: Job, func):
+        job.status = 'running'
+        job.started = time.time()
+        job.progress['stage'] = 'started'
+        job.publish('progress', job.to_dict(include_result=False))
+        self._save(job)
+
+        def progress(event: str, **data):
+            job.update(event, **data)
+            self._save(job)
+
+        try:
+            job.result, job.status_code = func(job.id, progress)
+            job.status = 'done'
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}", exc_info=True)
+            job.error = str(e)
+            job.status_code = 500
+            job.status = 'failed'
+        job.finished = time.time()
+        job.progress['stage'] = job.status
+        self._save(job)
+        job.publish(job.status, job.to_dict())
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job run by this or (with JOBS_DB) another process"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self._load(job_id)
+
+    def events(self, job_id: str, last_event_id: int = 0) -> Optional[Iterator[str]]:
+        """Server-sent events of a job from last_event_id on, None if the job is unknown"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return self._local_events(job, last_event_id)
+        state = self._load(job_id)
+        if state is None:
+            return None
+        return self._polled_events(job_id, state)
+
+    @staticmethod
+    def _format(event_id: Optional[int], event: str, data: Dict[str, Any]) -> str:
+        lines = [f"id: {event_id}"] if event_id is not None else []
+        lines += [f"event: {event}", f"data: {json.dumps(data, ensure_ascii=False, default=str)}"]
+        return "\n".join(lines) + "\n\n"
+
+    def _local_events(self, job: Job, last_event_id: int) -> Iterator[str]:
+        sent = last_event_id
+        while True:
+            with job._changed:
+                if sent >= len(job.events) and job.events and job.events[-1][1] in FINISHED:
+                    # Reconnect after the final event (EventSource retries on its
+                    # own): repeat that event so the client can close, then stop
+                    pending = job.events[-1:]
+                else:
+                    if len(job.events) <= sent:
+                        job._changed.wait(JOB_EVENTS_KEEPALIVE)
+                    pending = job.events[sent:]
+            if not pending:
+                yield ": keep-alive\n\n"
+                continue
+            for event_id, event, data in pending:
+                yield self._format(event_id, event, data)
+                sent = event_id
+                if event in FINISHED:
+                    return
+
+    def _polled_events(self, job_id: str, state: Dict[str, Any]) -> Iterator[str]:
+        # Job runs in another process: report its stored state whenever it changes
+        last = None
+        idle = 0.0
+        while state is not None:
+            if state != last:
+                finished = state['status'] in FINISHED
+                yield self._format(None, state['status'] if finished else 'progress', state)
+                if finished:
+                    return
+                last = state
+                idle = 0.0
+            elif idle >= JOB_EVENTS_KEEPALIVE:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            time.sleep(JOB_EVENTS_POLL_INTERVAL)
+            idle += JOB_EVENTS_POLL_INTERVAL
+            state = self._load(job_id)
+
+# Shared queue used by the Flask app
+job_queue = JobQueue()
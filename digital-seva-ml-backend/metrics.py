@@ -0,0 +1,113 @@
+# metrics.py
+import os
+from typing import Any, Dict
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from prometheus_client import CONTENT_TYPE_LATEST  # noqa: F401 (re-exported for the app)
+
+# When set (e.g. under gunicorn with several workers) every process writes its
+# samples to this directory and /metrics aggregates them. It must exist and be
+# emptied on deploy; gunicorn's child_exit hook should call
+# prometheus_client.multiprocess.mark_process_dead(worker.pid).
+PROMETHEUS_MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+# Stage latencies range from sub-millisecond regex work to multi-second OCR passes
+FAST_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5)
+SLOW_BUCKETS = (.01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_SECONDS = Histogram(
+    'docverify_request_seconds', 'Request latency', ['endpoint', 'status'],
+    buckets=SLOW_BUCKETS
+)
+UPLOAD_SECONDS = Histogram(
+    'docverify_upload_seconds', 'Time spent receiving and buffering uploads',
+    buckets=FAST_BUCKETS
+)
+RENDER_SECONDS = Histogram(
+    'docverify_render_seconds', 'Time spent rendering one PDF page, or decoding one uploaded image',
+    buckets=SLOW_BUCKETS
+)
+PREPROCESSING_SECONDS = Histogram(
+    'docverify_preprocessing_seconds', 'Time spent in one preprocessing step of a page',
+    ['profile', 'step'], buckets=FAST_BUCKETS + (5,)
+)
+OCR_PASS_SECONDS = Histogram(
+    'docverify_ocr_pass_seconds', 'Time spent in one Tesseract pass over a page',
+    ['backend', 'profile'], buckets=SLOW_BUCKETS
+)
+VALIDATOR_SECONDS = Histogram(
+    'docverify_validator_seconds', "Time spent in a validator's validate()",
+    ['validator'], buckets=FAST_BUCKETS
+)
+
+DOCUMENTS = Counter(
+    'docverify_documents_total', 'Documents processed per endpoint and document type',
+    ['endpoint', 'document_type']
+)
+VALIDATIONS = Counter(
+    'docverify_validations_total', 'Validation outcomes per document type',
+    ['document_type', 'outcome']
+)
+PAGES = Counter(
+    'docverify_pages_total', 'Pages processed by text source', ['source']
+)
+BYTES = Counter(
+    'docverify_bytes_total', 'Bytes of uploaded documents processed'
+)
+CACHE_LOOKUPS = Counter(
+    'docverify_cache_lookups_total', 'OCR text cache lookups', ['result']
+)
+
+# livesum: under PROMETHEUS_MULTIPROC_DIR the gauges add up the live processes
+ADMISSION_ACTIVE = Gauge(
+    'docverify_admission_active', 'Documents currently being processed',
+    multiprocess_mode='livesum'
+)
+ADMISSION_QUEUED = Gauge(
+    'docverify_admission_queued', 'Documents waiting for a processing slot',
+    ['priority'], multiprocess_mode='livesum'
+)
+ADMISSION_WAIT_SECONDS = Histogram(
+    'docverify_admission_wait_seconds', 'Time documents waited for a processing slot',
+    ['priority'], buckets=SLOW_BUCKETS
+)
+OCR_QUEUE_DEPTH = Gauge(
+    'docverify_ocr_queue_depth', 'Page OCR tasks waiting for a worker',
+    ['priority'], multiprocess_mode='livesum'
+)
+OCR_QUEUE_WAIT_SECONDS = Histogram(
+    'docverify_ocr_queue_wait_seconds', 'Time page OCR tasks waited for a worker',
+    ['priority'], buckets=SLOW_BUCKETS
+)
+REJECTIONS = Counter(
+    'docverify_rejections_total', 'Requests turned away by admission control', ['reason']
+)
+
+def observe_page_timings(timings: Dict[str, Any]):
+    """Record the timings an OCR worker measured for one page.
+
+    Workers run in separate processes of the OCR pool, so they send their
+    timings back with the page result and the metrics are recorded here.
+    """
+    if 'render' in timings:
+        RENDER_SECONDS.observe(timings['render'])
+    for profile, step, seconds in timings.get('preprocessing', []):
+        PREPROCESSING_SECONDS.labels(profile=profile, step=step).observe(seconds)
+    for backend, profile, seconds in timings.get('ocr', []):
+        OCR_PASS_SECONDS.labels(backend=backend, profile=profile).observe(seconds)
+
+def validation_outcome(result: Dict[str, Any]) -> str:
+    if result.get('timedOut'):
+        return 'timed_out'
+    if 'error' in result:
+        return 'error'
+    return 'valid' if result.get('isValid') else 'invalid'
+
+def render() -> bytes:
+    """Current metrics in the Prometheus text format"""
+    if PROMETHEUS_MULTIPROC_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
@@ -0,0 +1,86 @@
+# normalized_text.py
+import re
+import time
+from typing import Callable, Dict, Union
+
+# Characters OCR commonly confuses with digits, fixed inside PAN-like tokens
+OCR_DIGIT_FIXES = {
+    'O': '0', 'I': '1',
+    'S': '5', 'B': '8', 'Z': '2',
+    'G': '6', 'T': '7'
+}
+
+_PAN_CANDIDATE = re.compile(r'\b[A-Z0-9]{10}\b')
+_NON_WORD = re.compile(r'[^\w\s]')
+_NON_WORD_OR_DEVANAGARI = re.compile(r'[^\w\s\u0900-\u097F]')
+_NON_LATIN = re.compile(r'[^A-Z0-9\s./-]')
+_DIGIT_FIXES = str.maketrans(OCR_DIGIT_FIXES)
+
+class NormalizedText:
+    """Extracted text plus the normalised views validators match against.
+
+    Each view is computed on first access and then reused, so a document's
+    text is upper-cased, cleaned and collapsed once no matter how many
+    validators (or the classifier) look at it. timings records the seconds
+    spent building each view.
+    """
+
+    def __init__(self, raw: str):
+        self.raw = raw or ""
+        self._views: Dict[str, str] = {}
+        self.timings: Dict[str, float] = {}
+
+    @classmethod
+    def of(cls, text: Union[str, "NormalizedText"]) -> "NormalizedText":
+        """Wrap a plain string, or return an already normalised text as is"""
+        return text if isinstance(text, cls) else cls(text)
+
+    def _view(self, name: str, build: Callable[[], str]) -> str:
+        view = self._views.get(name)
+        if view is None:
+            start = time.perf_counter()
+            view = build()
+            self.timings[name] = time.perf_counter() - start
+            self._views[name] = view
+        return view
+
+    def __str__(self) -> str:
+        return self.raw
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    @property
+    def upper(self) -> str:
+        """Upper-cased text"""
+        return self._view('upper', self.raw.upper)
+
+    @property
+    def collapsed(self) -> str:
+        """Upper-cased text with runs of whitespace collapsed to single spaces"""
+        return self._view('collapsed', lambda: ' '.join(self.upper.split()))
+
+    @property
+    def alnum(self) -> str:
+        """Word characters only (punctuation becomes spaces), whitespace collapsed"""
+        return self._view('alnum', lambda: ' '.join(_NON_WORD.sub(' ', self.upper).split()))
+
+    @property
+    def devanagari(self) -> str:
+        """Like alnum, but keeps Devanagari vowel signs and other marks \\w doesn't cover"""
+        return self._view(
+            'devanagari', lambda: ' '.join(_NON_WORD_OR_DEVANAGARI.sub(' ', self.upper).split())
+        )
+
+    @property
+    def latin(self) -> str:
+        """Only A-Z, digits and . / - kept, whitespace collapsed"""
+        return self._view('latin', lambda: ' '.join(_NON_LATIN.sub(' ', self.upper).split()))
+
+    @property
+    def digit_fixed(self) -> str:
+        """latin with OCR letter/digit confusions fixed in 10 character (PAN-like) tokens"""
+        return self._view(
+            'digit_fixed',
+            lambda: _PAN_CANDIDATE.sub(lambda m: m.group().translate(_DIGIT_FIXES), self.latin)
+        )
@@ -0,0 +1,99 @@
+# ocr_backends.py
+import os
+import logging
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Dict, Optional, Tuple, Type
+
+# numpy and the Tesseract bindings are imported when a backend is created,
+# which only happens in OCR worker processes
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Tesseract languages used for every page
+OCR_LANG = os.environ.get('OCR_LANG', 'eng+hin')
+
+# Backend used by OCR workers: 'tesserocr' keeps one initialised engine per
+# process and falls back to 'pytesseract' (a subprocess per call) when the
+# tesserocr bindings are not installed
+OCR_BACKEND = os.environ.get('OCR_BACKEND', 'tesserocr')
+
+# Path of the tesseract binary used by the pytesseract backend
+TESSERACT_CMD = os.environ.get(
+    'TESSERACT_CMD', r'C:\Program Files\Tesseract-OCR\tesseract.exe'  # Windows
+)
+
+class OCRBackend(ABC):
+    name = ''
+
+    @abstractmethod
+    def recognize(self, image: 'np.ndarray') -> Tuple[str, float]:
+        """Return the text of a grayscale image and its mean word confidence (0-100)"""
+        pass
+
+    @staticmethod
+    def _mean_confidence(confidences) -> float:
+        confidences = [float(conf) for conf in confidences if float(conf) >= 0]
+        return sum(confidences) / len(confidences) if confidences else 0.0
+
+class PytesseractBackend(OCRBackend):
+    """Runs the tesseract binary once per image"""
+    name = 'pytesseract'
+
+    def __init__(self):
+        import pytesseract
+        pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+        self._pytesseract = pytesseract
+
+    def recognize(self, image: 'np.ndarray') -> Tuple[str, float]:
+        data = self._pytesseract.image_to_data(
+            image, lang=OCR_LANG, output_type=self._pytesseract.Output.DICT
+        )
+        words = []
+        confidences = []
+        for word, conf in zip(data['text'], data['conf']):
+            if word.strip():
+                words.append(word)
+                confidences.append(conf)
+        return " ".join(words), self._mean_confidence(confidences)
+
+class TesserocrBackend(OCRBackend):
+    """Keeps an initialised Tesseract API in-process, so traineddata loads only once"""
+    name = 'tesserocr'
+
+    def __init__(self):
+        # Optional dependency, imported here so the module loads without it
+        import tesserocr
+        self._api = tesserocr.PyTessBaseAPI(lang=OCR_LANG)
+
+    def recognize(self, image: 'np.ndarray') -> Tuple[str, float]:
+        import numpy as np
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        self._api.SetImageBytes(image.tobytes(), width, height, 1, width)
+        text = self._api.GetUTF8Text()
+        return text, self._mean_confidence(self._api.AllWordConfidences())
+
+OCR_BACKENDS: Dict[str, Type[OCRBackend]] = {
+    'pytesseract': PytesseractBackend,
+    'tesserocr': TesserocrBackend,
+}
+
+# One engine per process, created on first use
+_backend: Optional[OCRBackend] = None
+
+def get_backend() -> OCRBackend:
+    """Return this process's OCR backend, initialising it on first use"""
+    global _backend
+    if _backend is None:
+        backend_class = OCR_BACKENDS.get(OCR_BACKEND, PytesseractBackend)
+        try:
+            _backend = backend_class()
+        except Exception as e:
+            logger.warning(
+                f"OCR backend {OCR_BACKEND} unavailable, falling back to pytesseract: {str(e)}"
+            )
+            _backend = PytesseractBackend()
+        logger.info(f"Using {_backend.name} OCR backend")
+    return _backend
@@ -0,0 +1,165 @@
+# ocr_cache.py
+import os
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# In-memory tier limits (per process)
+OCR_CACHE_MAX_ENTRIES = int(os.environ.get('OCR_CACHE_MAX_ENTRIES', 256))
+OCR_CACHE_MAX_MB = int(os.environ.get('OCR_CACHE_MAX_MB', 64))
+
+# Optional SQLite file shared by all worker processes on the host
+OCR_CACHE_DB = os.environ.get('OCR_CACHE_DB')
+
+# SQLite tier limits: entries beyond the newest OCR_CACHE_DB_MAX_ROWS, or older
+# than OCR_CACHE_DB_MAX_AGE_DAYS, are pruned on insert (0 disables either)
+OCR_CACHE_DB_MAX_ROWS = int(os.environ.get('OCR_CACHE_DB_MAX_ROWS', 50000))
+OCR_CACHE_DB_MAX_AGE_DAYS = float(os.environ.get('OCR_CACHE_DB_MAX_AGE_DAYS', 30))
+
+def document_hash(data: bytes) -> str:
+    """Content address of an uploaded document"""
+    return hashlib.sha256(data).hexdigest()
+
+class OCRTextCache:
+    """Per-page extraction results keyed by the SHA-256 of the document bytes.
+
+    Entries live in an in-memory LRU bounded by entry count and text size,
+    backed by an optional SQLite tier that survives restarts and is shared
+    across processes.
+    """
+
+    def __init__(self, max_entries: int = OCR_CACHE_MAX_ENTRIES,
+                 max_bytes: int = OCR_CACHE_MAX_MB * 1024 * 1024,
+                 db_path: Optional[str] = OCR_CACHE_DB,
+                 db_max_rows: int = OCR_CACHE_DB_MAX_ROWS,
+                 db_max_age: float = OCR_CACHE_DB_MAX_AGE_DAYS * 86400):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.db_path = db_path
+        self.db_max_rows = db_max_rows
+        self.db_max_age = db_max_age
+        self._entries: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'memoryHits': 0, 'diskHits': 0, 'evictions': 0,
+                          'diskEvictions': 0}
+        if self.db_path:
+            self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS ocr_text ("
+                "hash TEXT PRIMARY KEY, pages TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ocr_text_created ON ocr_text (created)")
+
+    def _remember(self, digest: str, pages: List[Dict[str, Any]]):
+        """Insert into the memory tier and evict least recently used entries"""
+        size = sum(len(page['text'].encode('utf-8')) for page in pages)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if digest in self._entries:
+                self._total_bytes -= self._sizes[digest]
+            self._entries[digest] = pages
+            self._entries.move_to_end(digest)
+            self._sizes[digest] = size
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                evicted, _ = self._entries.popitem(last=False)
+                self._total_bytes -= self._sizes.pop(evicted)
+                self._counters['evictions'] += 1
+
+    def get(self, digest: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached pages for a document hash, if any"""
+        with self._lock:
+            pages = self._entries.get(digest)
+            if pages is not None:
+                self._entries.move_to_end(digest)
+                self._counters['hits'] += 1
+                self._counters['memoryHits'] += 1
+                return pages
+
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    row = conn.execute(
+                        "SELECT pages FROM ocr_text WHERE hash = ? AND created >= ?",
+                        (digest, self._oldest_kept())
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logger.error(f"Error reading OCR cache: {str(e)}")
+                row = None
+            if row:
+                pages = json.loads(row[0])
+                self._remember(digest, pages)
+                with self._lock:
+                    self._counters['hits'] += 1
+                    self._counters['diskHits'] += 1
+                return pages
+
+        with self._lock:
+            self._counters['misses'] += 1
+        return None
+
+    def put(self, digest: str, pages: List[Dict[str, Any]]):
+        """Store the extracted pages of a document"""
+        self._remember(digest, pages)
+        if self.db_path:
+            try:
+                with self._connect() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO ocr_text (hash, pages, created) VALUES (?, ?, ?)",
+                        (digest, json.dumps(pages, ensure_ascii=False), time.time())
+                    )
+                    self._prune(conn)
+            except sqlite3.Error as e:
+                logger.error(f"Error writing OCR cache: {str(e)}")
+
+    def _oldest_kept(self) -> float:
+        """created time below which SQLite entries count as expired"""
+        return time.time() - self.db_max_age if self.db_max_age > 0 else 0.0
+
+    def _prune(self, conn: sqlite3.Connection):
+        """Drop expired SQLite entries and the oldest ones beyond db_max_rows"""
+        pruned = conn.execute(
+            "DELETE FROM ocr_text WHERE created < ?", (self._oldest_kept(),)
+        ).rowcount
+        if self.db_max_rows > 0:
+            pruned += conn.execute(
+                "DELETE FROM ocr_text WHERE hash IN ("
+                "SELECT hash FROM ocr_text ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.db_max_rows,)
+            ).rowcount
+        if pruned:
+            with self._lock:
+                self._counters['diskEvictions'] += pruned
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current memory tier usage"""
+        with self._lock:
+            return {
+                **self._counters,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'maxEntries': self.max_entries,
+                'maxBytes': self.max_bytes,
+                'diskMaxRows': self.db_max_rows,
+                'diskTier': bool(self.db_path)
+            }
+
+# Shared cache used by the Flask app
+ocr_cache = OCRTextCache()
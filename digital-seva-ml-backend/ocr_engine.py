@@ -0,0 +1,434 @@
+# ocr_engine.py
+import io
+import os
+import logging
+import math
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Any, Iterator, List, Optional, Sequence, Tuple
+import importlib
+import pypdfium2 as pdfium
+from preprocessing import apply_profile, DEFAULT_PROFILE
+from ocr_backends import get_backend
+import metrics
+import tracing
+import admission
+import scheduling
+
+logger = logging.getLogger(__name__)
+
+# Number of OCR worker processes shared by all requests
+OCR_WORKERS = int(os.environ.get('OCR_WORKERS', os.cpu_count() or 1))
+
+# Render resolution for scanned pages, and the lowest it may be reduced to
+# when a page would not otherwise fit in the memory budget
+OCR_DPI = int(os.environ.get('OCR_DPI', 200))
+OCR_MIN_DPI = int(os.environ.get('OCR_MIN_DPI', 100))
+
+# Peak memory allowed for the page buffers of a single request. Pages are
+# rendered one at a time and only as many are in flight as fit the budget.
+OCR_MEMORY_BUDGET_MB = int(os.environ.get('OCR_MEMORY_BUDGET_MB', 512))
+
+# Rough peak bytes per rendered pixel: the grayscale render plus the
+# resized, binary and denoised copies made by the preprocessing pipeline
+BYTES_PER_PIXEL = 4
+
+# A page only moves on to the next preprocessing profile of its escalation
+# ladder while its mean word confidence (0-100, as reported by Tesseract)
+# stays below this value
+OCR_ESCALATION_CONFIDENCE = float(os.environ.get('OCR_ESCALATION_CONFIDENCE', 75))
+
+# Page size assumed when the PDF's page boxes are unknown (A4, in points)
+DEFAULT_PAGE_SIZE = (595.0, 842.0)
+
+# Uploaded photos larger than this are downscaled before OCR. The default is
+# an A4 page at OCR_DPI; phone cameras take 12-50 megapixel photos, which
+# only make preprocessing and Tesseract slower.
+OCR_IMAGE_MAX_PIXELS = int(os.environ.get(
+    'OCR_IMAGE_MAX_PIXELS', int(DEFAULT_PAGE_SIZE[0] / 72 * OCR_DPI) * int(DEFAULT_PAGE_SIZE[1] / 72 * OCR_DPI)
+))
+
+# Imaging and OCR libraries only the workers use. They are imported on first
+# use, or up front by preload() (e.g. in a gunicorn master before it forks).
+OCR_MODULES = ('numpy', 'cv2', 'PIL.Image', 'pytesseract', 'tesserocr')
+
+# Pools broken in a row (with no page OCR'd in between) after which the
+# engine reports itself unhealthy; workers that keep dying, e.g. on start-up,
+# break every replacement pool and only a restart can help
+OCR_POOL_MAX_FAILURES = int(os.environ.get('OCR_POOL_MAX_FAILURES', 3))
+
+# Directory a document is written to once for the workers, which read it by
+# path instead of every page task pickling the whole upload. Defaults to
+# tmpfs, like the upload spool.
+OCR_SHARED_DIR = os.environ.get(
+    'OCR_SHARED_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None
+)
+
+# Longest the warm-up may wait for every pool worker to be primed
+WARM_UP_TIMEOUT = float(os.environ.get('WARM_UP_TIMEOUT', 120))
+
+def preload():
+    """Import the imaging and OCR libraries into this process"""
+    for name in OCR_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            # tesserocr is optional, the others surface again on first use
+            pass
+
+def estimate_page_bytes(page_size: Tuple[float, float], dpi: int) -> int:
+    """Estimate the peak memory needed to render and preprocess one page"""
+    width, height = page_size
+    pixels = (width / 72 * dpi) * (height / 72 * dpi)
+    # Pages shorter than 1000px are upscaled before OCR
+    pixels *= max(1.0, 1000 / (height / 72 * dpi)) ** 2
+    return int(pixels * BYTES_PER_PIXEL)
+
+def estimate_image_bytes(image_size: Tuple[int, int], max_pixels: int = OCR_IMAGE_MAX_PIXELS) -> int:
+    """Estimate the peak memory needed to decode, downscale and preprocess one image"""
+    width, height = image_size
+    pixels = width * height
+    # The decoded colour image, or the downscaled grayscale one and its preprocessed copies
+    return int(max(pixels * 3, min(pixels, max_pixels) * BYTES_PER_PIXEL))
+
+def ocr_image(img, profiles: Sequence[str] = (DEFAULT_PROFILE,)) -> Dict[str, Any]:
+    """OCR a rendered page, escalating through profiles only while confidence is low"""
+    import numpy as np
+    # Convert PIL Image to a grayscale OpenCV array
+    gray = np.array(img.convert('L'))
+    backend = get_backend()
+    texts = []
+    confidence = 0.0
+    profiles_run = []
+    timings = {"preprocessing": [], "ocr": []}
+    for profile in profiles:
+        image = apply_profile(gray, profile, timings["preprocessing"])
+        start = time.perf_counter()
+        text, profile_confidence = backend.recognize(image)
+        timings["ocr"].append((backend.name, profile, time.perf_counter() - start))
+        del image
+        texts.append(text)
+        profiles_run.append(profile)
+        confidence = max(confidence, profile_confidence)
+        if profile_confidence >= OCR_ESCALATION_CONFIDENCE:
+            break
+
+    # Combine texts (this helps catch text that might be missed by one pass)
+    return {
+        "text": "\n".join(texts),
+        "confidence": confidence,
+        "profiles": profiles_run,
+        "backend": backend.name,
+        "timings": timings
+    }
+
+def _render_page(pdf: pdfium.PdfDocument, page_number: int, dpi: int):
+    page = pdf[page_number - 1]
+    bitmap = page.render(scale=dpi / 72, grayscale=True)
+    img = bitmap.to_pil()
+    bitmap.close()
+    page.close()
+    return img
+
+def render_pdf_page(pdf_data, page_number: int, dpi: int = OCR_DPI):
+    """Render a single PDF page (from bytes or a file path) as a grayscale PIL image"""
+    pdf = pdfium.PdfDocument(pdf_data)
+    try:
+        return _render_page(pdf, page_number, dpi)
+    finally:
+        pdf.close()
+
+# The document a worker process rendered its last page from, as (path, PdfDocument).
+# Pages of one document mostly land on the same workers, which then parse it
+# once; it stays open until the worker gets a page of another document.
+_worker_pdf: Optional[Tuple[str, pdfium.PdfDocument]] = None
+
+def _open_worker_pdf(pdf_path: str) -> pdfium.PdfDocument:
+    global _worker_pdf
+    if _worker_pdf is not None:
+        if _worker_pdf[0] == pdf_path:
+            return _worker_pdf[1]
+        _worker_pdf[1].close()
+        _worker_pdf = None
+    pdf = pdfium.PdfDocument(pdf_path)
+    _worker_pdf = (pdf_path, pdf)
+    return pdf
+
+def ocr_pdf_page(pdf_path: str, page_number: int, dpi: int = OCR_DPI,
+                 profiles: Sequence[str] = (DEFAULT_PROFILE,)) -> Dict[str, Any]:
+    """Render a single page of a shared PDF file and OCR it (runs inside a worker process)"""
+    start = time.perf_counter()
+    img = _render_page(_open_worker_pdf(pdf_path), page_number, dpi)
+    render_seconds = time.perf_counter() - start
+    try:
+        result = ocr_image(img, profiles)
+        result["timings"]["render"] = render_seconds
+        return result
+    finally:
+        # Release the page buffer as soon as it has been OCR'd
+        img.close()
+
+def load_image(image_data, frame: int = 1, max_pixels: int = OCR_IMAGE_MAX_PIXELS):
+    """Decode one frame of an image (bytes or a file path) as an upright grayscale PIL image of at most max_pixels"""
+    from PIL import Image, ImageOps
+    # Frames were checked against MAX_IMAGE_PIXELS, which may be above PIL's default limit
+    Image.MAX_IMAGE_PIXELS = admission.MAX_IMAGE_PIXELS
+    source = io.BytesIO(image_data) if isinstance(image_data, bytes) else image_data
+    with Image.open(source) as image:
+        image.seek(frame - 1)
+        width, height = image.size
+        scale = min(1.0, math.sqrt(max_pixels / (width * height)))
+        # JPEGs are decoded straight at a reduced scale, which is much faster
+        image.draft('L', (int(width * scale), int(height * scale)))
+        # Phone photos are stored sideways with an EXIF orientation tag
+        img = ImageOps.exif_transpose(image).convert('L')
+    width, height = img.size
+    if width * height > max_pixels:
+        scale = math.sqrt(max_pixels / (width * height))
+        img = img.resize((max(1, int(width * scale)), max(1, int(height * scale))),
+                         Image.Resampling.LANCZOS, reducing_gap=3.0)
+    return img
+
+def ocr_image_page(image_path: str, frame: int = 1,
+                   profiles: Sequence[str] = (DEFAULT_PROFILE,)) -> Dict[str, Any]:
+    """Decode a frame of a shared image file and OCR it (runs inside a worker process)"""
+    start = time.perf_counter()
+    img = load_image(image_path, frame)
+    # Decoding takes the place of the PDF render
+    render_seconds = time.perf_counter() - start
+    try:
+        result = ocr_image(img, profiles)
+        result["timings"]["render"] = render_seconds
+        return result
+    finally:
+        img.close()
+
+@contextmanager
+def shared_document(data: bytes) -> Iterator[str]:
+    """Write a document to OCR_SHARED_DIR once and yield its path for the page tasks"""
+    fd, path = tempfile.mkstemp(prefix='ocr-', dir=OCR_SHARED_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        yield path
+    finally:
+        # Workers that still have it open keep reading it until they close it
+        os.unlink(path)
+
+def prime_worker() -> Dict[str, Any]:
+    """OCR a tiny blank image so the worker's engine is loaded (runs inside a worker)"""
+    import numpy as np
+    try:
+        backend = get_backend()
+        backend.recognize(np.full((32, 128), 255, dtype=np.uint8))
+    except Exception as e:
+        # Some Tesseract errors can't be unpickled in the parent and would
+        # break the whole pool, so report them as a plain error
+        raise RuntimeError(f"{type(e).__name__}: {str(e)}") from None
+    return {"pid": os.getpid(), "backend": backend.name}
+
+class OCREngine:
+    """Fans page OCR out to a process pool that is shared across requests"""
+
+    def __init__(self, max_workers: int = OCR_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.pool_failures = 0
+        # Pages of all requests share the workers through the scheduler
+        self.scheduler = scheduling.FairScheduler(
+            self._submit,
+            self.max_workers, OCR_MEMORY_BUDGET_MB * 1024 * 1024
+        )
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use"""
+        with self._lock:
+            if self._pool is None:
+                logger.info(f"Starting OCR pool with {self.max_workers} workers")
+                # Each worker initialises its OCR backend once, up front
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers, initializer=get_backend
+                )
+            return self._pool
+
+    def _submit(self, fn: Callable, *args: Any) -> Future:
+        """Submit a task to the pool, replacing the pool if it turns out to be broken"""
+        pool = self._get_pool()
+        try:
+            future = pool.submit(fn, *args)
+        except BrokenProcessPool:
+            self._discard_pool(pool)
+            pool = self._get_pool()
+            future = pool.submit(fn, *args)
+        future.add_done_callback(lambda done, pool=pool: self._check_pool(pool, done))
+        return future
+
+    def _check_pool(self, pool: ProcessPoolExecutor, future: Future):
+        if future.cancelled():
+            return
+        if isinstance(future.exception(), BrokenProcessPool):
+            self._discard_pool(pool)
+        else:
+            # The pool ran a task, so replacing it worked
+            self.pool_failures = 0
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Drop a pool whose worker died (OOM kill, Tesseract crash); the next task starts a new one"""
+        with self._lock:
+            if self._pool is not pool:
+                # Already replaced by another task that saw the same failure
+                return
+            logger.warning("OCR pool is broken (a worker died), replacing it")
+            self._pool = None
+            self.pool_failures += 1
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _plan_page(self, page_number: int, page_size: Tuple[float, float],
+                   budget: int) -> Tuple[int, int]:
+        """Pick the render DPI for a page and return it with its memory estimate"""
+        dpi = OCR_DPI
+        estimate = estimate_page_bytes(page_size, dpi)
+        if estimate > budget:
+            dpi = int(dpi * math.sqrt(budget / estimate))
+            if dpi < OCR_MIN_DPI:
+                raise ValueError(
+                    f"Page {page_number} is too large to render within the "
+                    f"{budget // (1024 * 1024)} MB memory budget"
+                )
+            logger.warning(f"Page {page_number}: rendering at {dpi} DPI to fit the memory budget")
+            estimate = estimate_page_bytes(page_size, dpi)
+        return dpi, estimate
+
+    def ocr_pages(self, pdf_data: bytes, page_numbers: List[int],
+                  page_sizes: Optional[Dict[int, Tuple[float, float]]] = None,
+                  memory_budget_mb: int = OCR_MEMORY_BUDGET_MB,
+                  profiles: Sequence[str] = (DEFAULT_PROFILE,),
+                  on_page: Optional[Callable[[int, Dict[str, Any]], None]] = None
+                  ) -> Dict[int, Dict[str, Any]]:
+        """OCR the given pages in parallel and return their results keyed by page number.
+
+        profiles is the escalation ladder of preprocessing profiles for each
+        page. Each result holds the page text, its mean word confidence and
+        the profiles that were actually run. Render, preprocessing and
+        Tesseract timings measured by the workers go to the metrics and to
+        the trace of the current request.
+
+        Pages are queued on the shared scheduler in the current request's
+        priority class; it keeps the workers busy and the estimated memory
+        of the pages in flight within OCR_MEMORY_BUDGET_MB across requests.
+        on_page(page_number, result) is called as each page finishes.
+        Raises admission.DeadlineExceeded once the current request's deadline
+        has passed; its queued pages are dropped, running ones left to finish.
+        """
+        page_sizes = page_sizes or {}
+        budget = memory_budget_mb * 1024 * 1024
+        plans = {
+            page_number: self._plan_page(
+                page_number, page_sizes.get(page_number, DEFAULT_PAGE_SIZE), budget
+            )
+            for page_number in page_numbers
+        }
+        # Page tasks only carry the path of the PDF, not its bytes
+        with shared_document(pdf_data) as pdf_path:
+            tasks = [
+                (page_number, estimate, ocr_pdf_page, (pdf_path, page_number, dpi, tuple(profiles)))
+                for page_number, (dpi, estimate) in plans.items()
+            ]
+            return self._run_pages(tasks, on_page)
+
+    def ocr_image_pages(self, image_data: bytes, frames: List[int],
+                        image_sizes: Dict[int, Tuple[int, int]],
+                        profiles: Sequence[str] = (DEFAULT_PROFILE,),
+                        on_page: Optional[Callable[[int, Dict[str, Any]], None]] = None
+                        ) -> Dict[int, Dict[str, Any]]:
+        """Like ocr_pages, for the frames of an uploaded image (one for all but multi-page TIFFs).
+
+        Frames are decoded by the workers, turned upright and downscaled
+        to OCR_IMAGE_MAX_PIXELS; nothing is rendered.
+        """
+        with shared_document(image_data) as image_path:
+            tasks = [
+                (frame, estimate_image_bytes(image_sizes[frame]), ocr_image_page,
+                 (image_path, frame, tuple(profiles)))
+                for frame in frames
+            ]
+            return self._run_pages(tasks, on_page)
+
+    def _run_pages(self, tasks: List[Tuple[int, int, Callable, tuple]],
+                   on_page: Optional[Callable[[int, Dict[str, Any]], None]]
+                   ) -> Dict[int, Dict[str, Any]]:
+        """Queue (page number, memory estimate, worker function, args) tasks and collect their results"""
+        priority = scheduling.current_priority()
+        results = {}
+        in_flight = {}
+        retried = set()
+        try:
+            for task in tasks:
+                page_number, estimate, fn, args = task
+                in_flight[self.scheduler.submit(priority, estimate, fn, *args)] = task
+            while in_flight:
+                admission.check_deadline('OCR')
+                done, _ = wait(in_flight, timeout=admission.time_left(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = in_flight.pop(future)
+                    page_number, estimate, fn, args = task
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        # A worker died, maybe over another request's page: retry
+                        # once on the replacement pool
+                        if page_number in retried:
+                            raise
+                        logger.warning(f"Page {page_number}: OCR worker died, retrying")
+                        retried.add(page_number)
+                        in_flight[self.scheduler.submit(priority, estimate, fn, *args)] = task
+                        continue
+                    # Timings are only measured here, they aren't part of the page text
+                    timings = result.pop("timings", {})
+                    metrics.observe_page_timings(timings)
+                    tracing.record_page_timings(page_number, timings)
+                    results[page_number] = result
+                    if on_page is not None:
+                        on_page(page_number, result)
+        finally:
+            # Deadline or a failed page: don't OCR the rest for nobody
+            for future in in_flight:
+                future.cancel()
+        return results
+
+    def warm_up(self, timeout: float = WARM_UP_TIMEOUT) -> Dict[str, Any]:
+        """Start every pool worker and prime its OCR engine.
+
+        Each worker loads its Tesseract traineddata when it starts, so once
+        this returns the first requests don't pay for it.
+        """
+        pool = self._get_pool()
+        futures = [pool.submit(prime_worker) for _ in range(self.max_workers)]
+        done, not_done = wait(futures, timeout=timeout)
+        if not_done:
+            raise TimeoutError(f"OCR workers not ready after {timeout} s")
+        results = [future.result() for future in done]
+        return {
+            "workers": len({result["pid"] for result in results}),
+            "backend": results[0]["backend"]
+        }
+
+    @property
+    def healthy(self) -> bool:
+        """False once OCR_POOL_MAX_FAILURES pools in a row broke without running a task"""
+        return self.pool_failures < OCR_POOL_MAX_FAILURES
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+# Shared engine used by the Flask app
+ocr_engine = OCREngine()
@@ -0,0 +1,323 @@
+# pattern_matcher.py
+import os
+import re
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Set, Union
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# Literal keywords shorter than this are too common to be worth pre-filtering on
+MIN_ANCHOR_LENGTH = 2
+
+# 're' (default) or 're2'. RE2 matches in linear time but has no lookarounds
+# or backreferences, and its \w, \d and \b are ASCII only; patterns it can't
+# compile keep using re. Needs the optional google-re2 package.
+REGEX_ENGINE = os.environ.get('REGEX_ENGINE', 're')
+
+# Budget and timings of the matching done in the current context (request)
+_budget: contextvars.ContextVar = contextvars.ContextVar('match_budget', default=None)
+_timings: contextvars.ContextVar = contextvars.ContextVar('match_timings', default=None)
+
+_re2_options = None
+
+def _load_re2():
+    """Import RE2 on first use, or return None if it's unavailable"""
+    global _re2_options
+    try:
+        import re2
+    except ImportError:
+        logger.warning("REGEX_ENGINE=re2 but google-re2 is not installed, using re")
+        return None
+    if _re2_options is None:
+        _re2_options = re2.Options()
+        _re2_options.log_errors = False
+    return re2
+
+def _strip_verbose(pattern: str) -> str:
+    """Drop the whitespace and comments re.VERBOSE ignores, for engines without it"""
+    out = []
+    i = 0
+    in_class = False
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\':
+            out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if in_class:
+            if ch == ']':
+                in_class = False
+        elif ch == '[':
+            in_class = True
+            # A ']' right after the opening bracket is a literal
+            if pattern[i + 1:i + 2] == ']':
+                out.append('[]')
+                i += 2
+                continue
+        elif ch.isspace():
+            i += 1
+            continue
+        elif ch == '#':
+            while i < len(pattern) and pattern[i] != '\n':
+                i += 1
+            continue
+        out.append(ch)
+        i += 1
+    return ''.join(out)
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str, flags: int = 0):
+    """Compile a pattern with the configured engine, falling back to re"""
+    if REGEX_ENGINE == 're2':
+        re2 = _load_re2()
+        if re2 is not None:
+            inline = ''.join(
+                letter for flag, letter in ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+                if flags & flag
+            )
+            source = _strip_verbose(pattern) if flags & re.VERBOSE else pattern
+            try:
+                return re2.compile((f"(?{inline})" if inline else "") + source, _re2_options)
+            except Exception:
+                pass
+    return re.compile(pattern, flags)
+
+class MatchBudget:
+    """Time allowed for the pattern matching of one validation"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.deadline = time.perf_counter() + seconds
+        self.skipped = 0
+
+    @property
+    def exceeded(self) -> bool:
+        return self.skipped > 0
+
+    def allows(self) -> bool:
+        if time.perf_counter() < self.deadline:
+            return True
+        self.skipped += 1
+        return False
+
+@contextmanager
+def match_budget(seconds: Optional[float]) -> Iterator[Optional[MatchBudget]]:
+    """Limit the time spent matching patterns in this context.
+
+    Python's re can't be interrupted mid-search, so the budget is checked
+    before each search: once it is spent, remaining searches report no
+    match and budget.exceeded is set. A falsy seconds disables the budget.
+    """
+    budget = MatchBudget(seconds) if seconds else None
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+@contextmanager
+def record_timings() -> Iterator[Dict[str, Dict[str, float]]]:
+    """Collect per pattern search counts, total and worst time in this context"""
+    timings: Dict[str, Dict[str, float]] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+def _record(pattern: str, elapsed: float):
+    timings = _timings.get()
+    if timings is not None:
+        entry = timings.setdefault(pattern, {'count': 0, 'total': 0.0, 'worst': 0.0})
+        entry['count'] += 1
+        entry['total'] += elapsed
+        entry['worst'] = max(entry['worst'], elapsed)
+
+def _allowed() -> bool:
+    budget = _budget.get()
+    return budget is None or budget.allows()
+
+def search(pattern: str, text: str, flags: int = 0):
+    """re.search with the configured engine, match budget and timings"""
+    if not _allowed():
+        return None
+    start = time.perf_counter()
+    match = compile_pattern(pattern, flags).search(text)
+    _record(pattern, time.perf_counter() - start)
+    return match
+
+def match_at(pattern: str, text: str, pos: int, flags: int = 0):
+    """re.match at pos with the configured engine, match budget and timings"""
+    if not _allowed():
+        return None
+    start = time.perf_counter()
+    match = compile_pattern(pattern, flags).match(text, pos)
+    _record(pattern, time.perf_counter() - start)
+    return match
+
+def finditer(pattern: str, text: str, flags: int = 0) -> list:
+    """All matches of a pattern (materialised, so the search is timed as a whole)"""
+    if not _allowed():
+        return []
+    start = time.perf_counter()
+    matches = list(compile_pattern(pattern, flags).finditer(text))
+    _record(pattern, time.perf_counter() - start)
+    return matches
+
+class PatternHit:
+    """First match of one pattern in a scanned text"""
+    __slots__ = ('index', 'name', 'pattern', 'match')
+
+    def __init__(self, index: int, name: str, pattern: str, match):
+        self.index = index
+        self.name = name
+        self.pattern = pattern
+        self.match = match
+
+    @property
+    def start(self) -> int:
+        return self.match.start()
+
+    @property
+    def end(self) -> int:
+        return self.match.end()
+
+    def group(self, *args) -> str:
+        return self.match.group(*args)
+
+def _required_literals(items) -> Optional[List[str]]:
+    """Literal strings of which at least one occurs in every match of a parsed pattern.
+
+    Returns None when no such set of keywords can be derived (e.g. the
+    pattern is a pure character class like [A-Z]{5}[0-9]{4}[A-Z]).
+    """
+    options = []
+    run = []
+    for op, av in list(items) + [(None, None)]:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            options.append(["".join(run)])
+            run = []
+        if op is sre_parse.SUBPATTERN:
+            option = _required_literals(av[-1])
+        elif op is sre_parse.BRANCH:
+            branches = [_required_literals(branch) for branch in av[1]]
+            option = None if any(b is None for b in branches) else [l for b in branches for l in b]
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            option = _required_literals(av[2])
+        else:
+            option = None
+        if option:
+            options.append(option)
+
+    # Prefer the keyword set whose shortest alternative is the longest
+    options = [option for option in options if min(map(len, option)) >= MIN_ANCHOR_LENGTH]
+    if not options:
+        return None
+    return max(options, key=lambda option: (min(map(len, option)), -len(option)))
+
+class PatternSet:
+    """A list of regex rules compiled once and matched against a text in one pass.
+
+    Every pattern is reduced to the literal keywords it cannot match
+    without. A single scan with one combined keyword regex finds which
+    keywords occur, and only the patterns whose keywords were seen (plus
+    those without any keyword) are run in full. Adding patterns therefore
+    mostly grows the keyword alternation instead of adding whole-text scans.
+    """
+
+    def __init__(self, patterns: Union[Sequence[str], Mapping[str, str]], flags: int = 0):
+        if isinstance(patterns, Mapping):
+            self.names = list(patterns.keys())
+            self.patterns = list(patterns.values())
+        else:
+            self.patterns = list(patterns)
+            self.names = list(self.patterns)
+        self.flags = flags
+        self.compiled = [compile_pattern(pattern, flags) for pattern in self.patterns]
+
+        # Keyword (upper-cased) -> indexes of the patterns that need it
+        self._keyword_patterns: Dict[str, Set[int]] = {}
+        self._unanchored: Set[int] = set()
+        for index, pattern in enumerate(self.patterns):
+            keywords = _required_literals(sre_parse.parse(pattern, flags))
+            if keywords is None:
+                self._unanchored.add(index)
+                continue
+            for keyword in keywords:
+                self._keyword_patterns.setdefault(keyword.upper(), set()).add(index)
+
+        self._keyword_regex = None
+        self._prefixes: Dict[str, List[str]] = {}
+        if self._keyword_patterns:
+            keywords = sorted(self._keyword_patterns, key=len, reverse=True)
+            # Zero-width lookahead so overlapping keywords are all seen
+            self._keyword_regex = re.compile(
+                "(?=(" + "|".join(re.escape(keyword) for keyword in keywords) + "))",
+                re.IGNORECASE
+            )
+            # The combined regex reports the longest keyword at each position,
+            # shorter keywords starting at the same position are its prefixes
+            for keyword in keywords:
+                self._prefixes[keyword] = [k for k in keywords if keyword.startswith(k)]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def candidates(self, text: str) -> List[int]:
+        """Indexes of the patterns that can possibly match, in pattern order"""
+        candidates = set(self._unanchored)
+        if self._keyword_regex is not None:
+            seen = set()
+            for keyword_match in self._keyword_regex.finditer(text):
+                keyword = keyword_match.group(1).upper()
+                if keyword in seen:
+                    continue
+                seen.add(keyword)
+                for prefix in self._prefixes.get(keyword, (keyword,)):
+                    candidates.update(self._keyword_patterns.get(prefix, ()))
+                if len(candidates) == len(self.patterns):
+                    break
+        return sorted(candidates)
+
+    def _hit(self, index: int, text: str) -> Optional[PatternHit]:
+        if not _allowed():
+            return None
+        start = time.perf_counter()
+        match = self.compiled[index].search(text)
+        _record(self.patterns[index], time.perf_counter() - start)
+        if match is None:
+            return None
+        return PatternHit(index, self.names[index], self.patterns[index], match)
+
+    def scan(self, text: str) -> List[PatternHit]:
+        """First match of every pattern that occurs in the text, in pattern order"""
+        hits = []
+        for index in self.candidates(text):
+            hit = self._hit(index, text)
+            if hit is not None:
+                hits.append(hit)
+        return hits
+
+    def first(self, text: str) -> Optional[PatternHit]:
+        """Match of the earliest listed pattern that occurs in the text"""
+        for index in self.candidates(text):
+            hit = self._hit(index, text)
+            if hit is not None:
+                return hit
+        return None
+
+    def count(self, text: str) -> int:
+        """Number of patterns that occur in the text"""
+        return len(self.scan(text))
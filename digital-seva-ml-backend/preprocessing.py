@@ -0,0 +1,103 @@
+# preprocessing.py
+import os
+import time
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+# OpenCV and numpy are imported by the stages themselves, so the profile
+# configuration can be loaded without them (only OCR workers need them)
+if TYPE_CHECKING:
+    import numpy as np
+
+# A stage takes a grayscale page image and returns the processed image
+Stage = Callable[['np.ndarray'], 'np.ndarray']
+
+def upscale(gray: 'np.ndarray', min_height: int = 1000) -> 'np.ndarray':
+    """Resize pages that are too small for Tesseract"""
+    import cv2
+    height, width = gray.shape[:2]
+    if height < min_height:
+        scale = min_height/height
+        gray = cv2.resize(gray, None, fx=scale, fy=scale)
+    return gray
+
+def median_blur(gray: 'np.ndarray', ksize: int = 3) -> 'np.ndarray':
+    """Remove salt-and-pepper scanner noise"""
+    import cv2
+    return cv2.medianBlur(gray, ksize)
+
+def bilateral_filter(gray: 'np.ndarray', diameter: int = 5) -> 'np.ndarray':
+    """Smooth paper texture while keeping character edges sharp"""
+    import cv2
+    return cv2.bilateralFilter(gray, diameter, 50, 50)
+
+def adaptive_threshold(gray: 'np.ndarray') -> 'np.ndarray':
+    """Binarize with a local threshold that copes with uneven lighting"""
+    import cv2
+    return cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY, 11, 2
+    )
+
+def morphological_open(binary: 'np.ndarray', ksize: int = 2) -> 'np.ndarray':
+    """Drop specks left over after binarization"""
+    import numpy as np
+    import cv2
+    kernel = np.ones((ksize, ksize), np.uint8)
+    # Text is dark on light, so open the inverted image
+    return cv2.bitwise_not(cv2.morphologyEx(cv2.bitwise_not(binary), cv2.MORPH_OPEN, kernel))
+
+def nl_means_denoise(gray: 'np.ndarray') -> 'np.ndarray':
+    """Non-local means denoising (by far the most expensive stage)"""
+    import cv2
+    return cv2.fastNlMeansDenoising(gray)
+
+# Named preprocessing pipelines, cheapest first. Tesseract binarizes
+# internally, so the fast profile leaves the image in grayscale.
+PREPROCESSING_PROFILES: Dict[str, List[Stage]] = {
+    'fast': [upscale, partial(median_blur, ksize=3)],
+    'balanced': [upscale, bilateral_filter, adaptive_threshold, morphological_open],
+    'heavy': [upscale, adaptive_threshold, nl_means_denoise],
+}
+
+# Profile used for the first OCR pass when the request doesn't choose one
+DEFAULT_PROFILE = os.environ.get('OCR_DEFAULT_PROFILE', 'fast')
+
+# Profile pages escalate to when the first pass isn't good enough
+ESCALATION_PROFILE = os.environ.get('OCR_ESCALATION_PROFILE', 'heavy')
+
+# Per document type defaults, for documents whose scans are usually noisy
+DOCUMENT_PROFILES: Dict[str, str] = {
+    'Ration Card': 'balanced',
+    'BPL Certificate': 'balanced',
+    'Property Documents': 'balanced',
+}
+
+def profile_for(doc_type: str = None, requested: str = None) -> str:
+    """Resolve the profile of a request: explicit choice, then document type, then default"""
+    if requested:
+        return requested
+    return DOCUMENT_PROFILES.get(doc_type, DEFAULT_PROFILE)
+
+def escalation_ladder(profile: str) -> List[str]:
+    """Profiles to try in order for a page, starting from the selected one"""
+    if profile == ESCALATION_PROFILE:
+        return [profile]
+    return [profile, ESCALATION_PROFILE]
+
+def stage_name(stage: Stage) -> str:
+    return getattr(stage, 'func', stage).__name__
+
+def apply_profile(gray: 'np.ndarray', profile: str,
+                  timings: Optional[List[Tuple[str, str, float]]] = None) -> 'np.ndarray':
+    """Run a grayscale page image through every stage of a profile.
+
+    When a timings list is given, (profile, stage, seconds) is appended for
+    every stage.
+    """
+    for stage in PREPROCESSING_PROFILES[profile]:
+        start = time.perf_counter()
+        gray = stage(gray)
+        if timings is not None:
+            timings.append((profile, stage_name(stage), time.perf_counter() - start))
+    return gray
@@ -0,0 +1,181 @@
+# responses.py
+import os
+import gzip
+import logging
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+# Keys under which validators return the document text
+TEXT_KEYS = ('extractedText', 'detectedText')
+
+# Keys under which validators return the structured fields they found
+MATCH_KEYS = ('matches', 'extractedData')
+
+# Responses at least this large are gzip-compressed for clients that accept it
+GZIP_MIN_BYTES = int(os.environ.get('GZIP_MIN_BYTES', 1024))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', 6))
+
+_FALSE_VALUES = {'0', 'false', 'no', 'off'}
+
+class ResponseOptions:
+    """How a client asked for its response to be shaped.
+
+    verbose=false drops the raw text and adds the offsets of the matched
+    fields instead, fields= keeps only the listed top-level keys and
+    maxTextLength= truncates the raw text when it is kept.
+    """
+
+    def __init__(self, verbose: bool = True, fields: Optional[List[str]] = None,
+                 max_text_length: Optional[int] = None):
+        self.verbose = verbose
+        self.fields = fields
+        self.max_text_length = max_text_length
+
+    @classmethod
+    def from_request(cls, *sources: Mapping[str, Any]) -> "ResponseOptions":
+        """Read verbose, fields and maxTextLength from the first source that has them"""
+        def get(key):
+            for source in sources:
+                if source and source.get(key) is not None:
+                    return source.get(key)
+            return None
+
+        verbose = get('verbose')
+        fields = get('fields')
+        max_text_length = get('maxTextLength')
+        if isinstance(fields, str):
+            fields = [field.strip() for field in fields.split(',') if field.strip()]
+        elif fields is not None and not (
+                isinstance(fields, list) and all(isinstance(field, str) for field in fields)):
+            # JSON bodies (/revalidate) can send any type
+            raise ValueError("fields must be a comma-separated string or a list of strings")
+        if max_text_length in (None, ''):
+            max_text_length = None
+        elif not str(max_text_length).isdigit():
+            raise ValueError("maxTextLength must be a non-negative integer")
+        return cls(
+            verbose=str(verbose).lower() not in _FALSE_VALUES if verbose is not None else True,
+            fields=fields or None,
+            max_text_length=int(max_text_length) if max_text_length is not None else None
+        )
+
+    @property
+    def default(self) -> bool:
+        return self.verbose and self.fields is None and self.max_text_length is None
+
+def _walk(value: Any) -> Iterator[Tuple[str, Any]]:
+    """(key, value) of every dict entry in a nested result"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield key, item
+            yield from _walk(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _walk(item)
+
+def match_offsets(result: Dict[str, Any], text: str) -> Dict[str, Optional[List[int]]]:
+    """[start, end] of each matched field value in the document text.
+
+    Validators report matched values, not positions, so values are looked up
+    in the text (ignoring case). Values the validator rewrote (e.g. removed
+    whitespace from) and that can't be found get None.
+    """
+    upper_text = text.upper()
+    offsets = {}
+    for key, value in _walk(result):
+        if key not in MATCH_KEYS or not isinstance(value, dict):
+            continue
+        for name, found in value.items():
+            if not isinstance(found, str) or not found or name in offsets:
+                continue
+            start = upper_text.find(found.upper())
+            offsets[name] = [start, start + len(found)] if start >= 0 else None
+    return offsets
+
+def _shape_text(value: Any, options: ResponseOptions) -> Any:
+    if isinstance(value, dict):
+        shaped = {}
+        for key, item in value.items():
+            if key in TEXT_KEYS and isinstance(item, str):
+                if not options.verbose:
+                    continue
+                if options.max_text_length is not None and len(item) > options.max_text_length:
+                    item = item[:options.max_text_length] + '...'
+            shaped[key] = _shape_text(item, options)
+        return shaped
+    if isinstance(value, list):
+        return [_shape_text(item, options) for item in value]
+    return value
+
+def shape_result(result: Dict[str, Any], options: ResponseOptions, text: Optional[str] = None) -> Dict[str, Any]:
+    """Apply the client's response options to a validation result"""
+    if options.default:
+        return result
+    offsets = match_offsets(result, text) if not options.verbose and text is not None else None
+    shaped = _shape_text(result, options)
+    if offsets is not None:
+        shaped['matchOffsets'] = offsets
+    if options.fields is not None:
+        shaped = {key: value for key, value in shaped.items() if key in options.fields}
+    return shaped
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, several times faster than json for large results"""
+
+    def __init__(self, app, orjson):
+        super().__init__(app)
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # sort_keys, indent and the like have no full orjson equivalent
+            return super().dumps(obj, **kwargs)
+        return self._orjson.dumps(obj, default=self.default, option=self._options).decode()
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return self._orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._orjson.dumps(obj, default=self.default, option=self._options)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def json_provider(app) -> DefaultJSONProvider:
+    """orjson provider when the optional orjson package is installed, Flask's otherwise"""
+    try:
+        import orjson
+    except ImportError:
+        logger.info("orjson not installed, using the standard JSON encoder")
+        return DefaultJSONProvider(app)
+    return OrjsonProvider(app, orjson)
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip (and doesn't give it q=0)"""
+    for part in accept_encoding.split(','):
+        coding, _, params = part.partition(';')
+        if coding.strip().lower() not in ('gzip', '*'):
+            continue
+        quality = params.strip().lower()
+        try:
+            return not quality.startswith('q=') or float(quality[2:]) > 0
+        except ValueError:
+            return False
+    return False
+
+def gzip_response(response, accept_encoding: str):
+    """Compress a large, not yet encoded response body in place"""
+    if (response.direct_passthrough or response.is_streamed
+            or not 200 <= response.status_code < 300
+            or 'Content-Encoding' in response.headers
+            or not accepts_gzip(accept_encoding or '')):
+        return response
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
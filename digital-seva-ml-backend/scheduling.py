@@ -0,0 +1,146 @@
+# scheduling.py
+import os
+import time
+import logging
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import CancelledError, Future
+from typing import Any, Callable, Deque, Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Priority classes and their share of the OCR workers when both have pages
+# waiting: with 8:1, interactive pages get 8 of every 9 free workers
+PRIORITY_WEIGHTS = {
+    'interactive': float(os.environ.get('INTERACTIVE_PRIORITY_WEIGHT', 8)),
+    'bulk': float(os.environ.get('BULK_PRIORITY_WEIGHT', 1)),
+}
+DEFAULT_PRIORITY = 'interactive'
+
+# Header (or query parameter 'priority') a client uses to pick its class
+PRIORITY_HEADER = 'X-Priority'
+
+_priority: contextvars.ContextVar = contextvars.ContextVar('priority', default=DEFAULT_PRIORITY)
+
+def start_priority(priority: Optional[str]) -> contextvars.Token:
+    """Run the current request (or job) in a priority class; raises ValueError for unknown ones"""
+    priority = priority or DEFAULT_PRIORITY
+    if priority not in PRIORITY_WEIGHTS:
+        raise ValueError(f"Unknown priority: {priority} (expected one of {', '.join(PRIORITY_WEIGHTS)})")
+    return _priority.set(priority)
+
+def end_priority(token: contextvars.Token):
+    _priority.reset(token)
+
+def current_priority() -> str:
+    return _priority.get()
+
+class _Task:
+    __slots__ = ('future', 'estimate', 'fn', 'args', 'queued')
+
+    def __init__(self, estimate: int, fn: Callable, args: tuple):
+        self.future = Future()
+        self.estimate = estimate
+        self.fn = fn
+        self.args = args
+        self.queued = time.perf_counter()
+
+class FairScheduler:
+    """Weighted fair queueing of page OCR tasks in front of the process pool.
+
+    Every priority class has its own FIFO queue. Whenever a worker is free
+    (and the memory of the pages in flight leaves room), the next task comes
+    from the class with the lowest virtual time, which advances by 1/weight
+    per dispatched task. A class that was idle starts level with the others
+    instead of catching up, so a long bulk backlog never delays interactive
+    pages by more than the tasks already running.
+    """
+
+    def __init__(self, submit: Callable[..., Future], slots: int, memory_budget: int,
+                 weights: Dict[str, float] = PRIORITY_WEIGHTS):
+        self._submit = submit
+        self.slots = max(1, slots)
+        self.memory_budget = memory_budget
+        self.weights = dict(weights)
+        self._queues: Dict[str, Deque[_Task]] = {priority: deque() for priority in self.weights}
+        self._virtual_time = {priority: 0.0 for priority in self.weights}
+        self._in_flight = 0
+        self._in_flight_bytes = 0
+        # Re-entrant: a pool future that is already done runs its callback on submit
+        self._lock = threading.RLock()
+
+    def submit(self, priority: str, estimate: int, fn: Callable, *args: Any) -> Future:
+        """Queue fn(*args) for the pool; estimate is the task's memory in bytes"""
+        task = _Task(estimate, fn, args)
+        with self._lock:
+            queue = self._queues[priority]
+            if not queue:
+                # Waking up: no credit for the time the class was idle
+                busy = [self._virtual_time[other] for other, waiting in self._queues.items() if waiting]
+                if busy:
+                    self._virtual_time[priority] = max(self._virtual_time[priority], min(busy))
+            queue.append(task)
+            metrics.OCR_QUEUE_DEPTH.labels(priority=priority).inc()
+            self._dispatch()
+        return task.future
+
+    def _next_class(self) -> Optional[str]:
+        waiting = [priority for priority, queue in self._queues.items() if queue]
+        if not waiting:
+            return None
+        return min(waiting, key=lambda priority: self._virtual_time[priority])
+
+    def _dispatch(self):
+        with self._lock:
+            while self._in_flight < self.slots:
+                priority = self._next_class()
+                if priority is None:
+                    return
+                queue = self._queues[priority]
+                task = queue[0]
+                if task.future.cancelled():
+                    queue.popleft()
+                    metrics.OCR_QUEUE_DEPTH.labels(priority=priority).dec()
+                    continue
+                if self._in_flight and self._in_flight_bytes + task.estimate > self.memory_budget:
+                    return
+                queue.popleft()
+                metrics.OCR_QUEUE_DEPTH.labels(priority=priority).dec()
+                if not task.future.set_running_or_notify_cancel():
+                    continue
+                self._virtual_time[priority] += 1 / self.weights[priority]
+                metrics.OCR_QUEUE_WAIT_SECONDS.labels(priority=priority).observe(
+                    time.perf_counter() - task.queued
+                )
+                try:
+                    pool_future = self._submit(task.fn, *task.args)
+                except Exception as e:
+                    # e.g. a broken pool: fail this task, the next ones will fail the same way
+                    task.future.set_exception(e)
+                    continue
+                self._in_flight += 1
+                self._in_flight_bytes += task.estimate
+                pool_future.add_done_callback(lambda done, task=task: self._finished(task, done))
+
+    def _finished(self, task: _Task, pool_future: Future):
+        with self._lock:
+            self._in_flight -= 1
+            self._in_flight_bytes -= task.estimate
+        if pool_future.cancelled():
+            task.future.set_exception(CancelledError())
+        elif pool_future.exception() is not None:
+            task.future.set_exception(pool_future.exception())
+        else:
+            task.future.set_result(pool_future.result())
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "inFlight": self._in_flight,
+                "queued": {priority: len(queue) for priority, queue in self._queues.items()},
+                "weights": self.weights
+            }
@@ -0,0 +1,143 @@
+# tracing.py
+import os
+import re
+import json
+import time
+import uuid
+import logging
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+# Structured (one JSON object per line) log of requests slower than the threshold
+slow_request_logger = logging.getLogger('slow_requests')
+
+# Requests that take longer than this are written to the slow-request log
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 5000))
+
+# Header a client (or proxy) can use to pass its own request ID
+REQUEST_ID_HEADER = 'X-Request-ID'
+
+# Client supplied IDs are only reused when they are short and header safe
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+_current: contextvars.ContextVar = contextvars.ContextVar('trace', default=None)
+# Index of the batch file the current context works on, None outside batches
+_file: contextvars.ContextVar = contextvars.ContextVar('trace_file', default=None)
+
+class Trace:
+    """Timed spans of a single request.
+
+    Spans measured in this process carry their start offset from the start
+    of the request; spans measured by OCR workers only carry a duration.
+    Attributes describe the request (document type, pages, bytes, ...);
+    the files of a batch get their own, and their spans say which file they
+    belong to.
+    """
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.start = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.attributes: Dict[str, Any] = {}
+        self.files: Dict[int, Dict[str, Any]] = {}
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def add(self, name: str, seconds: float, start: Optional[float] = None, **attributes):
+        span = {"name": name, "durationMs": round(seconds * 1000, 3)}
+        if start is not None:
+            span["startMs"] = round((start - self.start) * 1000, 3)
+        if attributes:
+            span.update(attributes)
+        if _file.get() is not None:
+            span["file"] = _file.get()
+        self.spans.append(span)
+
+    def totals(self) -> Dict[str, float]:
+        """Milliseconds per span name, repeated spans (e.g. escalation passes) summed"""
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            totals[span["name"]] = totals.get(span["name"], 0.0) + span["durationMs"]
+        return totals
+
+    def server_timing(self) -> str:
+        """Value of the Server-Timing response header"""
+        entries = [f"{name};dur={ms:.1f}" for name, ms in self.totals().items()]
+        entries.append(f"total;dur={self.elapsed * 1000:.1f}")
+        return ", ".join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requestId": self.request_id,
+            "durationMs": round(self.elapsed * 1000, 3),
+            **self.attributes,
+            **({"files": self.files} if self.files else {}),
+            "spans": self.spans
+        }
+
+def new_request_id(supplied: Optional[str] = None) -> str:
+    """Reuse a well-formed client request ID, otherwise generate one"""
+    if supplied and _VALID_REQUEST_ID.match(supplied):
+        return supplied
+    return uuid.uuid4().hex
+
+def start_trace(request_id: str) -> contextvars.Token:
+    return _current.set(Trace(request_id))
+
+def end_trace(token: contextvars.Token):
+    _current.reset(token)
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+def start_file(index: int) -> contextvars.Token:
+    """Attribute the current context's annotations and spans to a batch's file"""
+    return _file.set(index)
+
+def annotate(**attributes):
+    """Attach attributes to the current request's trace (or batch file)"""
+    trace = _current.get()
+    if trace is None:
+        return
+    index = _file.get()
+    if index is None:
+        trace.attributes.update(attributes)
+    else:
+        trace.files.setdefault(index, {}).update(attributes)
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[None]:
+    """Time a block as a span of the current request (no-op outside a request)"""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start, start, **attributes)
+
+def record_page_timings(page_number: int, timings: Dict[str, Any]):
+    """Add the render, preprocessing and OCR times an OCR worker measured for a page"""
+    trace = _current.get()
+    if trace is None:
+        return
+    if 'render' in timings:
+        trace.add(f"render.p{page_number}", timings['render'])
+    for profile, step, seconds in timings.get('preprocessing', []):
+        trace.add(f"preprocess.p{page_number}", seconds, profile=profile, step=step)
+    for backend, profile, seconds in timings.get('ocr', []):
+        trace.add(f"ocr.p{page_number}", seconds, backend=backend, profile=profile)
+
+def log_if_slow(trace: Trace, **fields):
+    """Write the trace to the slow-request log when it took longer than SLOW_REQUEST_MS"""
+    if trace.elapsed * 1000 < SLOW_REQUEST_MS:
+        return
+    record = trace.to_dict()
+    record.update(fields)
+    slow_request_logger.warning(json.dumps(record, default=str))